@@ -6,14 +6,30 @@ __version__ = "0.1.0"
 
 __all__ = [
     "ingest_text",
+    "ingest_texts",
+    "ingest_stream",
     "add_memory",
     "recall_memory",
+    "recall_many",
+    "recall_similar",
+    "recall_neighbourhood",
+    "index_entities",
     "consolidate_topics",
+    "archive_history",
+    "preload",
+    "is_ready",
+    "load_timings",
 ]
 
+_WARMUP = ("preload", "is_ready", "load_timings")
+
 
 def __getattr__(name):
     """Lazy import to keep 'import nimem' fast."""
+    if name in _WARMUP:
+        from . import warmup
+
+        return getattr(warmup, name)
     if name in __all__:
         from . import memory
 
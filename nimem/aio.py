@@ -0,0 +1,119 @@
+"""
+Asyncio API for nimem.
+
+Mirrors the blocking functions in ``nimem.memory``. Model inference is
+offloaded to a bounded thread pool, so one event loop can serve many agents
+while at most ``max_workers`` extractions run at once; graph reads and
+writes go through FalkorDB's asyncio client.
+"""
+
+import asyncio
+import functools
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable
+
+from returns.result import Failure, Result
+
+from . import memory
+from .core import graph_store
+from .core import text_processing
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_WORKERS = 4
+
+_executor: ThreadPoolExecutor | None = None
+_executor_lock = threading.Lock()
+
+
+def configure(max_workers: int = DEFAULT_MAX_WORKERS) -> None:
+    """Replaces the inference thread pool with one of ``max_workers`` threads."""
+    global _executor
+    with _executor_lock:
+        previous = _executor
+        _executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="nimem-aio"
+        )
+    if previous is not None:
+        previous.shutdown(wait=False)
+
+
+def shutdown(wait: bool = True) -> None:
+    """Shuts down the inference thread pool; it is recreated on next use."""
+    global _executor
+    with _executor_lock:
+        previous, _executor = _executor, None
+    if previous is not None:
+        previous.shutdown(wait=wait)
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=DEFAULT_MAX_WORKERS, thread_name_prefix="nimem-aio"
+            )
+        return _executor
+
+
+async def _run_blocking(func, *args, **kwargs):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _get_executor(), functools.partial(func, *args, **kwargs)
+    )
+
+
+async def ingest_text(text: str, use_coref: bool = False) -> Result[str, Exception]:
+    """Async variant of memory.ingest_text."""
+    processed = await _run_blocking(
+        text_processing.process_text_pipeline, text, use_coref=use_coref
+    )
+    if isinstance(processed, Failure):
+        return processed
+
+    resolved_text, triplets = processed.unwrap()
+    logger.info(f"Found Triplets: {len(triplets)}")
+
+    # Embedding lookups for entity resolution are inference too.
+    aliases = await _run_blocking(memory._similar_entity_aliases, triplets)
+    stored = await graph_store.aadd_facts(triplets, upsert=True, aliases=aliases)
+    count, errors = memory._batch_summaries([triplets], stored)[0]
+    return memory._ingest_summary(resolved_text, count, errors)
+
+
+async def add_memory(subject: str, relation: str, obj: str) -> Result[bool, Exception]:
+    """Async variant of memory.add_memory."""
+    return await graph_store.aadd_fact(subject, relation, obj, upsert=True)
+
+
+async def recall_memory(
+    subject: str, at_time: float | None = None, include_archive: bool = False
+) -> Result[list, Exception]:
+    """Async variant of memory.recall_memory."""
+    return await graph_store.aquery_valid_facts(
+        subject, at_time=at_time, include_archive=include_archive
+    )
+
+
+async def recall_many(
+    subjects: Iterable[str],
+    at_time: float | None = None,
+    include_archive: bool = False,
+) -> Result[dict, Exception]:
+    """Async variant of memory.recall_many."""
+    return await graph_store.aquery_valid_facts_many(
+        subjects, at_time=at_time, include_archive=include_archive
+    )
+
+
+async def consolidate_topics(**kwargs) -> Result[str, Exception]:
+    """
+    Async variant of memory.consolidate_topics.
+
+    Consolidation is dominated by embedding and clustering, so the whole job
+    runs in the inference pool rather than on the event loop.
+    """
+    return await _run_blocking(memory.consolidate_topics, **kwargs)
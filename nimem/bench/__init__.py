@@ -0,0 +1,89 @@
+"""
+Benchmarks for nimem.
+
+Runs ingestion, recall and consolidation scenarios on synthetic data and
+returns machine-readable results, so releases can be compared::
+
+    python -m nimem.bench --output bench.json
+    python -m nimem.bench --scenarios recall --recall-sizes 1000 100000
+
+By default extraction and embedding are stubbed, so the suite runs offline
+and measures nimem's own code. Pass ``--models`` to use the real models.
+"""
+
+import os
+import platform
+import tempfile
+import time
+from contextlib import nullcontext
+from typing import Any, Dict, Iterable
+
+from .. import __version__
+from ..core import graph_store
+from ..core.embedding_cache import EmbeddingCache
+from ..core.recall_cache import RecallCache
+from .scenarios import bench_consolidate, bench_ingest, bench_recall
+from .stubs import stubbed
+
+SCENARIOS = {
+    "ingest": bench_ingest,
+    "recall": bench_recall,
+    "consolidate": bench_consolidate,
+}
+
+
+def run(
+    scenarios: Iterable[str] = tuple(SCENARIOS),
+    options: Dict[str, Dict[str, Any]] | None = None,
+    use_models: bool = False,
+    workdir: str | None = None,
+) -> Dict[str, Any]:
+    """
+    Runs the named scenarios and returns a JSON-serialisable report.
+
+    Args:
+        scenarios: Names from SCENARIOS
+        options: Keyword arguments per scenario, e.g. {"recall": {"queries": 50}}
+        use_models: If True, use the real extraction and embedding models
+        workdir: Directory for the benchmark database and caches (a
+            temporary directory by default; the working directory is changed
+            to it while the benchmarks run)
+
+    Only the stores under ``workdir`` are closed afterwards, but the shared
+    embedding and recall caches are reset, so avoid running it alongside
+    live work in one process.
+    """
+    scenarios = list(scenarios)
+    unknown = [name for name in scenarios if name not in SCENARIOS]
+    if unknown:
+        raise ValueError(f"Unknown scenarios {unknown}; expected some of {list(SCENARIOS)}")
+    options = options or {}
+
+    scratch = tempfile.TemporaryDirectory(prefix="nimem-bench-") if workdir is None else None
+    workdir = os.path.abspath(workdir or scratch.name)
+    previous = os.getcwd()
+    os.chdir(workdir)
+    try:
+        results = {}
+        with nullcontext() if use_models else stubbed():
+            for name in scenarios:
+                start = time.perf_counter()
+                rows = SCENARIOS[name](**options.get(name, {}))
+                results[name] = {"seconds": time.perf_counter() - start, "rows": rows}
+    finally:
+        graph_store.close_stores(under=workdir)
+        EmbeddingCache.reset()
+        RecallCache.reset()
+        os.chdir(previous)
+        if scratch is not None:
+            scratch.cleanup()
+
+    return {
+        "nimem_version": __version__,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": time.time(),
+        "models": "real" if use_models else "stub",
+        "options": options,
+        "results": results,
+    }
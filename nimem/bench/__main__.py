@@ -0,0 +1,55 @@
+import argparse
+import json
+import logging
+import sys
+
+from . import SCENARIOS, run
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m nimem.bench", description=__doc__)
+    parser.add_argument("--scenarios", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    parser.add_argument("--models", action="store_true", help="Use the real models")
+    parser.add_argument("--workdir", help="Keep the benchmark database in this directory")
+    parser.add_argument("--texts", type=int, default=1000, help="Ingest corpus size")
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--workers", type=int, help="Also time a parallel IngestionEngine run")
+    parser.add_argument("--recall-sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--history-depths", type=int, nargs="+", default=[1, 10])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--entities", type=int, nargs="+", default=[100, 1000, 5000])
+    parser.add_argument("--verbose", action="store_true", help="Keep nimem's INFO logging")
+    args = parser.parse_args(argv)
+
+    if not args.verbose:
+        # Ingestion logs every fact, which would dominate the timings.
+        logging.getLogger("nimem").setLevel(logging.WARNING)
+
+    options = {
+        "ingest": {"n_texts": args.texts, "batch_size": args.batch_size, "workers": args.workers},
+        "recall": {
+            "graph_sizes": args.recall_sizes,
+            "history_depths": args.history_depths,
+            "queries": args.queries,
+        },
+        "consolidate": {"entity_counts": args.entities},
+    }
+    report = run(
+        args.scenarios,
+        options={name: options[name] for name in args.scenarios},
+        use_models=args.models,
+        workdir=args.workdir,
+    )
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,89 @@
+"""Synthetic corpora and graph histories for benchmarks."""
+
+import random
+from typing import Iterator, List, Tuple
+
+FIRST_NAMES = [
+    "Alice", "Bob", "Carol", "Dave", "Erin", "Frank", "Grace", "Heidi",
+    "Ivan", "Judy", "Mallory", "Niaj", "Olivia", "Peggy", "Rupert", "Sybil",
+]
+LAST_NAMES = [
+    "Zhang", "Smith", "Garcia", "Okafor", "Novak", "Tanaka", "Silva", "Kumar",
+    "Müller", "Dubois", "Rossi", "Hansen", "Cohen", "Larsen", "Moreau", "Ito",
+]
+ORGANIZATIONS = [
+    "Acme", "Globex", "Initech", "Umbrella", "Hooli", "Stark", "Wayne", "Tyrell",
+    "Cyberdyne", "Soylent", "Massive", "Vandelay", "Wonka", "Gringotts",
+]
+CITIES = [
+    "Paris", "London", "Berlin", "Tokyo", "Lagos", "Lima", "Oslo", "Seoul",
+    "Cairo", "Denver", "Madrid", "Mumbai", "Toronto", "Sydney",
+]
+
+# Sentence templates: relation -> the phrase joining subject and object.
+TEMPLATES = {
+    "works_for": " works for ",
+    "located_in": " lives in ",
+    "knows": " knows ",
+}
+
+
+def person_names(count: int) -> List[str]:
+    """``count`` distinct person names, numbered once the pairs run out."""
+    pairs = [f"{first} {last}" for last in LAST_NAMES for first in FIRST_NAMES]
+    return [
+        pairs[i % len(pairs)] + ("" if i < len(pairs) else f" {i // len(pairs)}")
+        for i in range(count)
+    ]
+
+
+def _objects(relation: str, people: List[str]) -> List[str]:
+    if relation == "works_for":
+        return [f"{org} Corp" for org in ORGANIZATIONS]
+    if relation == "located_in":
+        return CITIES
+    return people
+
+
+def synthetic_corpus(
+    n_texts: int,
+    n_entities: int = 500,
+    sentences_per_text: int = 5,
+    seed: int = 0,
+) -> List[str]:
+    """
+    Short documents of template sentences ("Alice Zhang works for Acme
+    Corp.") about ``n_entities`` people. The same seed gives the same corpus.
+    """
+    rng = random.Random(seed)
+    people = person_names(n_entities)
+    relations = list(TEMPLATES)
+    texts = []
+    for _ in range(n_texts):
+        sentences = []
+        for _ in range(sentences_per_text):
+            relation = rng.choice(relations)
+            subject = rng.choice(people)
+            obj = rng.choice(_objects(relation, people))
+            sentences.append(f"{subject}{TEMPLATES[relation]}{obj}.")
+        texts.append(" ".join(sentences))
+    return texts
+
+
+def synthetic_history(
+    n_subjects: int, history_depth: int, seed: int = 0
+) -> Iterator[Tuple[float, List[Tuple[str, str, str]]]]:
+    """
+    Yields (valid_at, triples) steps for ``n_subjects`` people. Every step
+    moves each person to a new city (a ONE relation, so the previous edge is
+    invalidated) and adds a new acquaintance. After all steps, each subject
+    has ``history_depth`` edges per relation.
+    """
+    rng = random.Random(seed)
+    people = person_names(n_subjects)
+    for step in range(history_depth):
+        triples = []
+        for person in people:
+            triples.append((person, "located_in", rng.choice(CITIES)))
+            triples.append((person, "knows", rng.choice(people)))
+        yield float(step + 1), triples
@@ -0,0 +1,180 @@
+"""
+Benchmark scenarios.
+
+Each scenario takes its sizes as arguments and returns one row (a plain
+dict) per configuration measured. Scenarios use the default store of the
+current working directory and clear it first; the runner points that at a
+scratch directory.
+"""
+
+import logging
+import os
+import random
+import shutil
+import time
+from itertools import batched
+from typing import Dict, List, Sequence
+
+import numpy as np
+from returns.result import Success
+
+from .. import memory, parallel
+from ..core import graph_store, text_processing
+from ..core.embedding_cache import DEFAULT_CACHE_DIR, EmbeddingCache
+from ..core.recall_cache import RecallCache
+from .corpus import person_names, synthetic_corpus, synthetic_history
+from .stubs import stub_extractor
+
+logger = logging.getLogger(__name__)
+
+
+def _reset_store() -> None:
+    graph_store.get_store().clear()
+    EmbeddingCache.reset()
+    shutil.rmtree(DEFAULT_CACHE_DIR, ignore_errors=True)
+
+
+def _latency_ms(samples: Sequence[float]) -> Dict[str, float]:
+    ms = np.asarray(samples) * 1000
+    return {
+        "p50_ms": float(np.percentile(ms, 50)),
+        "p99_ms": float(np.percentile(ms, 99)),
+        "mean_ms": float(ms.mean()),
+    }
+
+
+def _stage(seconds: float, texts: int, triples: int) -> Dict[str, float]:
+    return {
+        "seconds": seconds,
+        "texts_per_s": texts / seconds if seconds else 0.0,
+        "triples_per_s": triples / seconds if seconds else 0.0,
+    }
+
+
+def bench_ingest(
+    n_texts: int = 1000,
+    batch_size: int = 32,
+    n_entities: int = 500,
+    workers: int | None = None,
+) -> List[Dict]:
+    """
+    Times ingestion stage by stage. Extraction is batched through
+    process_texts_pipeline, writes go through the bulk upsert path, and
+    the new entities are then indexed. With ``workers``, an end-to-end
+    IngestionEngine run over the stub extractor is timed as well.
+    """
+    _reset_store()
+    corpus = synthetic_corpus(n_texts, n_entities=n_entities)
+
+    start = time.perf_counter()
+    extracted = []
+    for batch in batched(corpus, batch_size):
+        extracted.extend(text_processing.process_texts_pipeline(batch).unwrap())
+    extract_s = time.perf_counter() - start
+    triples = sum(len(triplets) for _, triplets in extracted)
+
+    start = time.perf_counter()
+    for batch in batched(extracted, batch_size):
+        memory._store_batch([triplets for _, triplets in batch])
+    write_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    indexed = memory.index_entities().unwrap()
+    index_s = time.perf_counter() - start
+
+    row = {
+        "n_texts": n_texts,
+        "batch_size": batch_size,
+        "triples": triples,
+        "entities": indexed,
+        "stages": {
+            "extract": _stage(extract_s, n_texts, triples),
+            "write": _stage(write_s, n_texts, triples),
+            "index": _stage(index_s, n_texts, triples),
+        },
+        "total": _stage(extract_s + write_s + index_s, n_texts, triples),
+    }
+
+    if workers:
+        _reset_store()
+        with parallel.IngestionEngine(
+            workers=workers, batch_size=batch_size, extractor=stub_extractor
+        ) as engine:
+            # Spawning the workers is start-up cost, not throughput.
+            engine.ingest(corpus[:batch_size])
+            _reset_store()
+            start = time.perf_counter()
+            engine.ingest(corpus)
+            row["parallel"] = {
+                "workers": workers,
+                **_stage(time.perf_counter() - start, n_texts, triples),
+            }
+    return [row]
+
+
+def bench_recall(
+    graph_sizes: Sequence[int] = (100, 1000, 10000),
+    history_depths: Sequence[int] = (1, 10),
+    queries: int = 200,
+    seed: int = 0,
+) -> List[Dict]:
+    """
+    Measures recall_memory latency against graph size (subjects) and
+    history depth (superseded edges per subject and relation). The recall
+    cache is disabled so every query reaches the graph.
+    """
+    rng = random.Random(seed)
+    rows = []
+    RecallCache.configure(max_entries=0)
+    try:
+        for size in graph_sizes:
+            for depth in history_depths:
+                _reset_store()
+                for valid_at, triples in synthetic_history(size, depth, seed=seed):
+                    graph_store.add_facts(triples, valid_at=valid_at).unwrap()
+
+                subjects = person_names(size)
+                samples = []
+                for _ in range(queries):
+                    subject = rng.choice(subjects)
+                    start = time.perf_counter()
+                    memory.recall_memory(subject).unwrap()
+                    samples.append(time.perf_counter() - start)
+
+                rows.append(
+                    {
+                        "graph_size": size,
+                        "history_depth": depth,
+                        "queries": queries,
+                        **_latency_ms(samples),
+                    }
+                )
+    finally:
+        RecallCache.reset()
+    return rows
+
+
+def bench_consolidate(entity_counts: Sequence[int] = (100, 1000, 5000)) -> List[Dict]:
+    """Times a cold consolidate_topics run against the number of entities."""
+    rows = []
+    for count in entity_counts:
+        _reset_store()
+        if os.path.exists(memory.clustering.DEFAULT_TOPIC_MODEL_PATH):
+            os.remove(memory.clustering.DEFAULT_TOPIC_MODEL_PATH)
+        people = person_names(count)
+        # Pair people up so every name becomes an entity.
+        triples = [
+            (people[i], "knows", people[(i + 1) % count]) for i in range(0, count, 2)
+        ]
+        graph_store.add_facts(triples).unwrap()
+
+        start = time.perf_counter()
+        res = memory.consolidate_topics()
+        row = {"entities": count, "seconds": time.perf_counter() - start}
+        if isinstance(res, Success):
+            row["summary"] = res.unwrap()
+        else:
+            logger.warning(f"consolidate_topics failed at {count} entities: {res.failure()}")
+            row["error"] = str(res.failure())
+        rows.append(row)
+    return rows
@@ -0,0 +1,87 @@
+"""
+Model-free stand-ins for benchmarks.
+
+The stubs follow the corpus templates closely enough that the graph, cache
+and clustering code get realistic work. They cost almost nothing and need
+no model downloads.
+"""
+
+import hashlib
+from contextlib import contextmanager
+from typing import Iterable, Iterator, List, Sequence, Tuple
+
+import numpy as np
+from returns.result import Success
+
+from ..core import embeddings, text_processing
+from ..core.text_processing import Triple
+from .corpus import TEMPLATES
+
+# Kept low-dimensional: fast_hdbscan needs the optional pynndescent package
+# for higher-dimensional input.
+STUB_DIM = 16
+
+
+def stub_extract(text: str) -> List[Triple]:
+    """Reads triplets back out of template sentences."""
+    triplets = []
+    for sentence in text_processing.split_sentences(text):
+        sentence = sentence.rstrip(".")
+        for relation, phrase in TEMPLATES.items():
+            if phrase in sentence:
+                subject, obj = sentence.split(phrase, 1)
+                triplets.append(Triple(subject, relation, obj))
+                break
+    return triplets
+
+
+def stub_extractor(texts: Sequence[str]) -> List[Tuple[str, List[Triple]]]:
+    """Picklable extractor for parallel.IngestionEngine(extractor=...)."""
+    return [(text, stub_extract(text)) for text in texts]
+
+
+def _seed(text: str) -> int:
+    return int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest())
+
+
+def stub_embed(texts: Iterable[str], dim: int = STUB_DIM) -> np.ndarray:
+    """
+    Deterministic unit vectors. Names sharing a first word land near a
+    common centre, so clustering finds topics.
+    """
+    rows = []
+    for text in texts:
+        words = text.split()
+        centre = np.random.default_rng(_seed(words[0] if words else "")).normal(size=dim)
+        noise = np.random.default_rng(_seed(text)).normal(scale=0.1, size=dim)
+        vector = centre + noise
+        rows.append(vector / np.linalg.norm(vector))
+    if not rows:
+        return np.empty((0, dim), dtype=np.float32)
+    return np.asarray(rows, dtype=np.float32)
+
+
+def _stub_texts_pipeline(texts, use_coref=False, use_gliner2=False, batch_size=32, n_process=1):
+    return Success(stub_extractor(list(texts)))
+
+
+def _stub_text_pipeline(text, use_coref=False, use_gliner2=False):
+    return Success((text, stub_extract(text)))
+
+
+@contextmanager
+def stubbed() -> Iterator[None]:
+    """Routes extraction and embedding through the stubs while active."""
+    patches = [
+        (text_processing, "process_texts_pipeline", _stub_texts_pipeline),
+        (text_processing, "process_text_pipeline", _stub_text_pipeline),
+        (embeddings, "embed_texts", lambda texts: Success(stub_embed(texts))),
+    ]
+    originals = [(module, name, getattr(module, name)) for module, name, _ in patches]
+    try:
+        for module, name, replacement in patches:
+            setattr(module, name, replacement)
+        yield
+    finally:
+        for module, name, original in originals:
+            setattr(module, name, original)
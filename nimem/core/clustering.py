@@ -1,4 +1,6 @@
 import logging
+import os
+import time
 from typing import List, Dict
 
 import numpy as np
@@ -32,3 +34,120 @@ def perform_clustering(
 def generate_topic_name(texts: List[str]) -> str:
     """Simple heuristic to name a cluster."""
     return "Topic: " + ", ".join(list(set(texts))[:3])
+
+
+DEFAULT_TOPIC_MODEL_PATH = "./nimem_topics.npz"
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+class TopicModel:
+    """
+    Topic centroids from the last full clustering.
+
+    New entities are assigned to the most similar centroid in
+    O(new x topics) instead of refitting HDBSCAN over every entity. The model
+    tracks how many entities it could not place since the last fit; that
+    share is the drift used to decide when a full re-clustering is due.
+    """
+
+    def __init__(
+        self,
+        centroids: np.ndarray,
+        names: List[str],
+        known: List[str],
+        fitted_at: float,
+        unassigned: int = 0,
+    ):
+        self.centroids = _normalize(centroids) if len(names) else centroids
+        self.names = list(names)
+        self.known = set(known)
+        self.fitted_at = fitted_at
+        self.unassigned = unassigned
+
+    @classmethod
+    def from_clusters(
+        cls,
+        clusters: Dict[int, List[str]],
+        names: Dict[int, str],
+        vectors: np.ndarray,
+        texts: List[str],
+    ) -> "TopicModel":
+        rows = {text: i for i, text in enumerate(texts)}
+        normalized = _normalize(vectors) if len(texts) else vectors
+        labels = [label for label in clusters if label != -1]
+        centroids = [
+            normalized[[rows[text] for text in clusters[label]]].mean(axis=0)
+            for label in labels
+        ]
+        dim = normalized.shape[1] if len(texts) else 0
+        return cls(
+            centroids=np.array(centroids, dtype=np.float32).reshape(len(labels), dim),
+            names=[names[label] for label in labels],
+            known=texts,
+            fitted_at=time.time(),
+        )
+
+    @property
+    def drift(self) -> float:
+        return self.unassigned / max(len(self.known), 1)
+
+    def needs_refit(self, refit_interval: float | None, drift_threshold: float) -> bool:
+        if refit_interval is not None and time.time() - self.fitted_at > refit_interval:
+            return True
+        return self.drift > drift_threshold
+
+    def assign(self, vectors: np.ndarray, threshold: float) -> np.ndarray:
+        """Returns the topic index for each vector, or -1 below the threshold."""
+        if not self.names or len(vectors) == 0:
+            return np.full(len(vectors), -1, dtype=int)
+        similarities = _normalize(vectors) @ self.centroids.T
+        best = similarities.argmax(axis=1)
+        best[similarities.max(axis=1) < threshold] = -1
+        return best
+
+    def save(self, path: str = DEFAULT_TOPIC_MODEL_PATH) -> None:
+        with open(path, "wb") as f:
+            np.savez(
+                f,
+                centroids=self.centroids,
+                names=np.array(self.names, dtype=str),
+                known=np.array(sorted(self.known), dtype=str),
+                fitted_at=self.fitted_at,
+                unassigned=self.unassigned,
+            )
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_TOPIC_MODEL_PATH) -> "TopicModel | None":
+        if not os.path.exists(path):
+            return None
+        with np.load(path) as data:
+            return cls(
+                centroids=data["centroids"],
+                names=data["names"].tolist(),
+                known=data["known"].tolist(),
+                fitted_at=float(data["fitted_at"]),
+                unassigned=int(data["unassigned"]),
+            )
+
+
+@safe
+def assign_to_topics(
+    model: TopicModel, vectors: np.ndarray, texts: List[str], threshold: float = 0.7
+) -> Dict[int, List[str]]:
+    """Places new texts into the model's existing topics, keyed by topic index."""
+    labels = model.assign(vectors, threshold)
+
+    clusters: Dict[int, List[str]] = {}
+    for text, label in zip(texts, labels):
+        model.known.add(text)
+        if label == -1:
+            model.unassigned += 1
+            continue
+        clusters.setdefault(int(label), []).append(text)
+    return clusters
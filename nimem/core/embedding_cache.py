@@ -0,0 +1,186 @@
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from . import metrics
+from .schema import EMBEDDING_BACKEND, EMBEDDING_MODEL
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = "./nimem_embeddings"
+
+_KEYS_FILE = "keys.txt"
+_VECTORS_FILE = "vectors.bin"
+_META_FILE = "meta.json"
+
+
+class EmbeddingCache:
+    """
+    Content-addressed, append-only cache of embedding vectors on disk.
+
+    Each model and backend (engine and dtype, which change the vectors) gets
+    its own directory holding a raw row-major matrix
+    (``vectors.bin``, read through ``np.memmap``) and a key file with one
+    ``sha1(model, text)`` per row. Rows are only ever appended, so reopening a
+    cache costs one pass over the key file and no vector I/O.
+    """
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __init__(
+        self,
+        cache_dir: str = DEFAULT_CACHE_DIR,
+        model_name: str = EMBEDDING_MODEL,
+        dtype: str = "float32",
+        backend: Dict[str, str] | None = None,
+    ):
+        self.model_name = model_name
+        self.dtype = np.dtype(dtype)
+        self.backend = dict(backend or EMBEDDING_BACKEND)
+        name = f"{model_name}-{self.backend['engine']}-{self.backend['dtype']}"
+        self.path = os.path.abspath(
+            os.path.join(cache_dir, re.sub(r"[^A-Za-z0-9_.-]+", "_", name))
+        )
+        os.makedirs(self.path, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._index: Dict[str, int] = {}
+        self._dim: int | None = None
+        self._vectors: np.memmap | None = None
+        self._load()
+
+    @classmethod
+    def get_instance(cls) -> "EmbeddingCache":
+        """The shared cache, reopened if EMBEDDING_BACKEND has changed."""
+        instance = cls._instance
+        if instance is None or instance.backend != EMBEDDING_BACKEND:
+            with cls._instance_lock:
+                instance = cls._instance
+                if instance is None or instance.backend != EMBEDDING_BACKEND:
+                    instance = cls._instance = cls()
+        return instance
+
+    @classmethod
+    def reset(cls):
+        cls._instance = None
+
+    def _file(self, name: str) -> str:
+        return os.path.join(self.path, name)
+
+    def _load(self):
+        meta_path = self._file(_META_FILE)
+        if not os.path.exists(meta_path):
+            return
+
+        with open(meta_path) as f:
+            meta = json.load(f)
+        if np.dtype(meta["dtype"]) != self.dtype:
+            raise ValueError(
+                f"Cache at {self.path} stores {meta['dtype']}, not {self.dtype}"
+            )
+        self._dim = meta["dim"]
+
+        keys_path = self._file(_KEYS_FILE)
+        keys = []
+        if os.path.exists(keys_path):
+            with open(keys_path) as f:
+                keys = f.read().split()
+
+        # Vectors are appended before keys, so a torn write leaves rows (or a
+        # partial row) without a key, or, if the key file outlived the vector
+        # file, keys without rows. Both files are cut back to the rows they
+        # agree on, since new rows are numbered from the key count.
+        row_bytes = self._dim * self.dtype.itemsize
+        vectors_path = self._file(_VECTORS_FILE)
+        size = os.path.getsize(vectors_path) if os.path.exists(vectors_path) else 0
+        rows = min(size // row_bytes, len(keys))
+        if size != rows * row_bytes:
+            logger.warning(f"Embedding cache {self.path}: dropping rows past {rows}")
+            with open(vectors_path, "ab") as f:
+                f.truncate(rows * row_bytes)
+        if len(keys) != rows:
+            logger.warning(f"Embedding cache {self.path} truncated to {rows} rows")
+            keys = keys[:rows]
+            with open(keys_path, "w") as f:
+                f.write("".join(f"{key}\n" for key in keys))
+        self._index = {key: row for row, key in enumerate(keys)}
+
+    def _matrix(self) -> np.memmap:
+        if self._vectors is None or len(self._vectors) != len(self._index):
+            self._vectors = np.memmap(
+                self._file(_VECTORS_FILE),
+                dtype=self.dtype,
+                mode="r",
+                shape=(len(self._index), self._dim),
+            )
+        return self._vectors
+
+    def key(self, text: str) -> str:
+        return hashlib.sha1(f"{self.model_name}\0{text}".encode("utf-8")).hexdigest()
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __contains__(self, text: str) -> bool:
+        return self.key(text) in self._index
+
+    def lookup(self, texts: List[str]) -> Tuple[Dict[int, np.ndarray], List[int]]:
+        """Returns ({position: vector} for cached texts, positions of misses)."""
+        with self._lock:
+            rows = [self._index.get(self.key(text)) for text in texts]
+            hits = {}
+            misses = []
+            matrix = self._matrix() if self._index else None
+            for pos, row in enumerate(rows):
+                if row is None:
+                    misses.append(pos)
+                else:
+                    hits[pos] = np.asarray(matrix[row], dtype=np.float32)
+        metrics.count("cache_hits", len(hits), cache="embedding")
+        metrics.count("cache_misses", len(misses), cache="embedding")
+        return hits, misses
+
+    def add(self, texts: List[str], vectors: np.ndarray) -> int:
+        """Appends vectors for texts not already cached; returns rows written."""
+        vectors = np.asarray(vectors)
+        with self._lock:
+            if self._dim is None:
+                self._dim = int(vectors.shape[1])
+                with open(self._file(_META_FILE), "w") as f:
+                    json.dump({"dim": self._dim, "dtype": self.dtype.name}, f)
+            elif vectors.shape[1] != self._dim:
+                raise ValueError(
+                    f"Expected {self._dim}-dimensional vectors, got {vectors.shape[1]}"
+                )
+
+            new_keys = []
+            new_rows = []
+            seen = set()
+            for text, vector in zip(texts, vectors):
+                key = self.key(text)
+                if key in self._index or key in seen:
+                    continue
+                seen.add(key)
+                new_keys.append(key)
+                new_rows.append(vector)
+
+            if not new_keys:
+                return 0
+
+            block = np.asarray(new_rows, dtype=self.dtype)
+            with open(self._file(_VECTORS_FILE), "ab") as f:
+                f.write(block.tobytes())
+            with open(self._file(_KEYS_FILE), "a") as f:
+                f.write("".join(f"{key}\n" for key in new_keys))
+
+            start = len(self._index)
+            for offset, key in enumerate(new_keys):
+                self._index[key] = start + offset
+        return len(new_keys)
@@ -1,43 +1,201 @@
 import asyncio
+import atexit
 import logging
-from typing import List
+import threading
+import time
+from concurrent.futures import Future
+from typing import Dict, List
 
 import numpy as np
 from infinity_emb import AsyncEmbeddingEngine, EngineArgs
-from infinity_emb.primitives import InferenceEngine
-from returns.result import safe
+from infinity_emb.primitives import Dtype, InferenceEngine
+from returns.result import Failure, Result, Success, safe
+
+from . import metrics
+from .embedding_cache import EmbeddingCache
+from .schema import EMBEDDING_BACKEND, EMBEDDING_MODEL
 
 logger = logging.getLogger(__name__)
 
 
 class EmbeddingService:
+    """
+    Keeps one Infinity engine running on a dedicated event loop thread.
+
+    The engine is started once and stays up until ``shutdown``, so repeated
+    calls pay only inference cost and concurrent callers share Infinity's
+    dynamic batching. ``embed`` blocks the calling thread; ``aembed`` can be
+    awaited from any other event loop.
+    """
+
     _instance = None
+    _instance_lock = threading.Lock()
+
+    def __init__(
+        self,
+        model_name: str = EMBEDDING_MODEL,
+        engine: str | None = None,
+        dtype: str | None = None,
+    ):
+        self.model_name = model_name
+        self.engine_name = engine or EMBEDDING_BACKEND["engine"]
+        self.dtype = dtype or EMBEDDING_BACKEND["dtype"]
+
+        logger.info(
+            f"Initializing embedding engine ({model_name}, "
+            f"{self.engine_name}, {self.dtype})"
+        )
+        # Invalid settings raise here, before the loop thread exists.
+        engine_args = EngineArgs(
+            model_name_or_path=model_name,
+            engine=InferenceEngine(self.engine_name),
+            dtype=Dtype(self.dtype),
+            bettertransformer=False,
+        )
+        self.engine = AsyncEmbeddingEngine.from_args(engine_args)
+
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._loop.run_forever, name="nimem-embeddings", daemon=True
+        )
+        self._thread.start()
+        try:
+            self._submit(self.engine.astart()).result()
+        except Exception:
+            self._stop_loop()
+            raise
 
     @classmethod
-    def get_instance(cls):
+    def get_instance(cls) -> "EmbeddingService":
         if cls._instance is None:
-            logger.info("Initializing embedding engine (michaelfeil/bge-small-en-v1.5)")
-            engine_args = EngineArgs(
-                model_name_or_path="michaelfeil/bge-small-en-v1.5",
-                engine=InferenceEngine.torch,
-                bettertransformer=False,
-            )
-            cls._instance = AsyncEmbeddingEngine.from_args(engine_args)
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = cls()
         return cls._instance
 
     @classmethod
     def reset(cls):
-        cls._instance = None
+        with cls._instance_lock:
+            instance, cls._instance = cls._instance, None
+        if instance is not None:
+            instance.shutdown()
+
+    def _submit(self, coro) -> Future:
+        return asyncio.run_coroutine_threadsafe(coro, self._loop)
 
+    async def _embed(self, texts: List[str]) -> np.ndarray:
+        embeddings, _ = await self.engine.embed(list(texts))
+        return np.array(embeddings)
 
-async def _embed_async(texts: List[str]) -> np.ndarray:
-    engine = EmbeddingService.get_instance()
-    async with engine:
-        embeddings, _ = await engine.embed(texts)
-    return np.array(embeddings)
+    def embed(self, texts: List[str]) -> np.ndarray:
+        return self._submit(self._embed(texts)).result()
+
+    async def aembed(self, texts: List[str]) -> np.ndarray:
+        return await asyncio.wrap_future(self._submit(self._embed(texts)))
+
+    def _stop_loop(self):
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+    def shutdown(self):
+        """Stops the engine and its event loop thread."""
+        if self._loop.is_closed():
+            return
+        try:
+            self._submit(self.engine.astop()).result()
+        finally:
+            self._stop_loop()
+
+
+atexit.register(EmbeddingService.reset)
 
 
 @safe
 def embed_texts(texts: List[str]) -> np.ndarray:
     """Embeds a list of texts using Infinity-emb."""
-    return asyncio.run(_embed_async(texts))
+    metrics.count("texts_embedded", len(texts))
+    with metrics.timer("stage", stage="embed"):
+        return EmbeddingService.get_instance().embed(texts)
+
+
+@safe
+def embed_texts_cached(
+    texts: List[str], cache: EmbeddingCache | None = None
+) -> np.ndarray:
+    """
+    Embeds texts, reusing vectors from the on-disk embedding cache.
+
+    Only texts the cache has not seen are sent to the engine; their vectors
+    are appended to the cache before returning.
+    """
+    if cache is None:
+        cache = EmbeddingCache.get_instance()
+    hits, misses = cache.lookup(texts)
+    logger.debug(f"Embedding cache: {len(hits)} hits, {len(misses)} misses")
+
+    if misses:
+        missing = list(dict.fromkeys(texts[pos] for pos in misses))
+        vectors = embed_texts(missing).unwrap()
+        cache.add(missing, vectors)
+        by_text = dict(zip(missing, vectors))
+        for pos in misses:
+            hits[pos] = np.asarray(by_text[texts[pos]], dtype=np.float32)
+
+    if not hits:
+        return np.empty((0, 0), dtype=np.float32)
+    return np.stack([hits[pos] for pos in range(len(texts))])
+
+
+async def aembed_texts(texts: List[str]) -> Result[np.ndarray, Exception]:
+    """Async variant of embed_texts, usable from inside a running event loop."""
+    try:
+        return Success(await EmbeddingService.get_instance().aembed(texts))
+    except Exception as e:
+        return Failure(e)
+
+
+def _cosine_rows(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    a = a / np.linalg.norm(a, axis=1, keepdims=True)
+    b = b / np.linalg.norm(b, axis=1, keepdims=True)
+    return np.sum(a * b, axis=1)
+
+
+@safe
+def check_embedding_parity(
+    texts: List[str],
+    engine: str | None = None,
+    dtype: str | None = None,
+    reference_engine: str = "torch",
+    reference_dtype: str = "float32",
+) -> Dict[str, float]:
+    """
+    Embeds texts with a candidate backend (the configured one by default) and
+    with a full-precision torch reference.
+
+    Returns the per-text cosine agreement and the time each backend took.
+    Engines are started outside the timings.
+    """
+    timings = {}
+    vectors = {}
+    backends = {
+        "reference": (reference_engine, reference_dtype),
+        "candidate": (engine, dtype),
+    }
+    for role, (backend_engine, backend_dtype) in backends.items():
+        service = EmbeddingService(engine=backend_engine, dtype=backend_dtype)
+        try:
+            start = time.perf_counter()
+            vectors[role] = np.asarray(service.embed(texts), dtype=np.float32)
+            timings[role] = time.perf_counter() - start
+        finally:
+            service.shutdown()
+
+    cosine = _cosine_rows(vectors["reference"], vectors["candidate"])
+    return {
+        "min_cosine": float(cosine.min()),
+        "mean_cosine": float(cosine.mean()),
+        "reference_seconds": timings["reference"],
+        "candidate_seconds": timings["candidate"],
+        "speedup": timings["reference"] / max(timings["candidate"], 1e-9),
+    }
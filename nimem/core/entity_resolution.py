@@ -0,0 +1,69 @@
+import re
+from difflib import SequenceMatcher
+from typing import Dict, Iterable, List, Tuple
+
+from .schema import CORPORATE_SUFFIXES
+
+_DROPPED = re.compile(r"[.'’]")
+_SEPARATORS = re.compile(r"[^\w\s]")
+
+
+def normalize_name(name: str) -> str:
+    """
+    Key under which surface forms of one entity collide: casefolded, without
+    punctuation, a leading "the" or trailing corporate suffixes.
+    """
+    text = _SEPARATORS.sub(" ", _DROPPED.sub("", name.casefold()))
+    words = text.split()
+    if len(words) > 1 and words[0] == "the":
+        words = words[1:]
+    while len(words) > 1 and words[-1] in CORPORATE_SUFFIXES:
+        words.pop()
+    return " ".join(words) or name.casefold().strip()
+
+
+def string_similarity(a: str, b: str) -> float:
+    return SequenceMatcher(None, normalize_name(a), normalize_name(b)).ratio()
+
+
+def canonical_names(names: Iterable[str], existing: Dict[str, str]) -> Dict[str, str]:
+    """
+    Maps each name to its canonical form.
+
+    ``existing`` maps normalised keys to entity names already in the graph.
+    Names with no existing entity collapse onto the first name seen with the
+    same key.
+    """
+    canonical = dict(existing)
+    mapping = {}
+    for name in names:
+        mapping[name] = canonical.setdefault(normalize_name(name), name)
+    return mapping
+
+
+def match_similar(
+    names: List[str],
+    candidates: Dict[int, List[Tuple[str, float]]],
+    similarity_threshold: float,
+    min_string_similarity: float,
+) -> Dict[str, str]:
+    """
+    Picks, for each name, the best embedding neighbour that also looks alike.
+
+    ``candidates`` maps a position in ``names`` to (entity, cosine similarity)
+    pairs. Embeddings only block candidates: a neighbour is accepted when its
+    similarity reaches ``similarity_threshold`` and its name reaches
+    ``min_string_similarity``, so "Apple" is not folded into "Microsoft".
+    """
+    mapping = {}
+    for pos, name in enumerate(names):
+        best = None
+        for entity, similarity in candidates.get(pos, []):
+            if entity == name or similarity < similarity_threshold:
+                continue
+            score = string_similarity(name, entity)
+            if score >= min_string_similarity and (best is None or score > best[1]):
+                best = (entity, score)
+        if best is not None:
+            mapping[name] = best[0]
+    return mapping
@@ -0,0 +1,197 @@
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from importlib import metadata
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+from . import metrics, schema
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = "./nimem_extractions.sqlite"
+DEFAULT_MAX_ENTRIES = 100_000
+
+# Bump when the stored layout or the meaning of a cached result changes.
+FORMAT_VERSION = 1
+
+Extraction = Tuple[str, List[Tuple[str, str, str]]]
+
+
+def _package_version(name: str) -> str:
+    try:
+        return metadata.version(name)
+    except metadata.PackageNotFoundError:
+        return "unknown"
+
+
+def config_fingerprint(use_coref: bool, use_gliner2: bool) -> str:
+    """
+    Digest of everything besides the text that shapes an extraction: the
+    pipeline flags, model names and package versions, and the schema.
+    """
+    parts = {
+        "format": FORMAT_VERSION,
+        "schema": [
+            schema.RELATIONS,
+            sorted(schema.ENTITY_RELATION_MAP.items()),
+            schema.SPACY_LABEL_MAP,
+            schema.VERB_TO_RELATION,
+            sorted(schema.WITH_PREPOSITIONS),
+        ],
+    }
+    if use_gliner2:
+        parts["gliner2"] = [
+            schema.GLINER_MODEL,
+            schema.GLINER_BACKEND,
+            schema.GLINER_WINDOW_CHARS,
+            _package_version("gliner2"),
+        ]
+    else:
+        parts["spacy"] = [
+            schema.SPACY_MODEL,
+            _package_version("spacy"),
+            _package_version(schema.SPACY_MODEL),
+        ]
+    if use_coref:
+        parts["coref"] = [schema.COREF, _package_version("fastcoref")]
+    encoded = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class ExtractionCache:
+    """
+    Persistent cache of (resolved text, triplets) keyed by a hash of the text
+    and the extraction configuration.
+
+    Entries live in one SQLite file. Once more than ``max_entries`` are
+    stored, the least recently used are evicted. The cache is off until
+    ``configure`` is called; each process configures its own.
+    """
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __init__(
+        self, path: str = DEFAULT_CACHE_PATH, max_entries: int = DEFAULT_MAX_ENTRIES
+    ):
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS extractions (
+                key TEXT PRIMARY KEY,
+                resolved TEXT NOT NULL,
+                triples TEXT NOT NULL,
+                last_used REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS extractions_last_used
+                ON extractions (last_used);
+            """
+        )
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @classmethod
+    def configure(
+        cls, path: str = DEFAULT_CACHE_PATH, max_entries: int = DEFAULT_MAX_ENTRIES
+    ) -> "ExtractionCache":
+        """Enables the shared cache, replacing any previous one."""
+        cache = cls(path=path, max_entries=max_entries)
+        with cls._instance_lock:
+            previous, cls._instance = cls._instance, cache
+        if previous is not None:
+            previous.close()
+        return cache
+
+    @classmethod
+    def current(cls) -> "ExtractionCache | None":
+        """The shared cache, or None when caching is off."""
+        return cls._instance
+
+    @classmethod
+    def reset(cls):
+        with cls._instance_lock:
+            instance, cls._instance = cls._instance, None
+        if instance is not None:
+            instance.close()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    @staticmethod
+    def key(text: str, fingerprint: str) -> str:
+        return hashlib.sha256(f"{fingerprint}\0{text}".encode("utf-8")).hexdigest()
+
+    def get_many(self, keys: Sequence[str]) -> Dict[str, Extraction]:
+        """Returns the cached extraction for each key present."""
+        unique = list(dict.fromkeys(keys))
+        found: Dict[str, Extraction] = {}
+        with self._lock:
+            for start in range(0, len(unique), 500):
+                chunk = unique[start : start + 500]
+                marks = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT key, resolved, triples FROM extractions WHERE key IN ({marks})",
+                    chunk,
+                ).fetchall()
+                for key, resolved, triples in rows:
+                    found[key] = (resolved, [tuple(t) for t in json.loads(triples)])
+            if found:
+                now = time.time()
+                self._conn.executemany(
+                    "UPDATE extractions SET last_used = ? WHERE key = ?",
+                    [(now, key) for key in found],
+                )
+                self._conn.commit()
+            hits = sum(1 for key in keys if key in found)
+            self.hits += hits
+            self.misses += len(keys) - hits
+        metrics.count("cache_hits", hits, cache="extraction")
+        metrics.count("cache_misses", len(keys) - hits, cache="extraction")
+        return found
+
+    def put_many(self, entries: Iterable[Tuple[str, str, Sequence[Sequence[str]]]]) -> None:
+        """Stores (key, resolved text, triplets) entries, then evicts down to size."""
+        now = time.time()
+        rows = [
+            (key, resolved, json.dumps([list(t) for t in triples]), now)
+            for key, resolved, triples in entries
+        ]
+        if not rows:
+            return
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO extractions VALUES (?, ?, ?, ?)", rows
+            )
+            (size,) = self._conn.execute("SELECT COUNT(*) FROM extractions").fetchone()
+            excess = size - self.max_entries
+            if excess > 0:
+                self._conn.execute(
+                    "DELETE FROM extractions WHERE key IN "
+                    "(SELECT key FROM extractions ORDER BY last_used LIMIT ?)",
+                    (excess,),
+                )
+                self.evictions += excess
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM extractions").fetchone()[0]
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self),
+            "max_entries": self.max_entries,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
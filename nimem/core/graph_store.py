@@ -1,23 +1,268 @@
+import asyncio
+import functools
 import logging
+import os
 import re
+import threading
 import time
 import uuid
-from typing import List, Any, Dict
+import weakref
+from typing import List, Any, Dict, Iterable, Sequence, Tuple
 
+from redis.asyncio import BlockingConnectionPool, UnixDomainSocketConnection
 from redislite.falkordb_client import FalkorDB
-from returns.result import safe
+from falkordb.asyncio import FalkorDB as AsyncFalkorDB
+from returns.result import Failure, Result, Success, safe
+
+from . import metrics
+from .entity_resolution import canonical_names, normalize_name
+from .recall_cache import RecallCache
+from .schema import CARDINALITY, RELATIONS
 
 logger = logging.getLogger(__name__)
 
 DEFAULT_DB_PATH = "./nimem.db"
 DEFAULT_GRAPH_NAME = "nimem_memory"
+ASYNC_MAX_CONNECTIONS = 32
+
+ENTITY_LABEL = "Entity"
+EMBEDDING_PROPERTY = "embedding"
+ENTITY_INDEX_PROPERTIES = ("name", "key")
+EDGE_INDEX_PROPERTIES = ("valid_at", "invalidated_at")
+DEFAULT_RELATION_TYPES = tuple(rel.upper() for rel in RELATIONS) + ("BELONGS_TO",)
+
+ARCHIVE_SUFFIX = "_archive"
+DEFAULT_RETENTION = 30 * 24 * 3600
+ARCHIVE_BATCH_SIZE = 1000
+KEY_BACKFILL_BATCH_SIZE = 1000
+
+
+class GraphStore:
+    """
+    Long-lived handle on one graph inside an embedded FalkorDB database.
+
+    Opening ``FalkorDB(db_path)`` attaches to (or spawns) the redislite server
+    for that file, and dropping it may shut the server down again. A store keeps
+    one database handle per ``db_path`` alive for the life of the process; its
+    redis connection pool hands each query its own connection, so a single
+    store can be shared freely across threads.
+    """
+
+    def __init__(self, db: FalkorDB, db_path: str, graph_name: str):
+        self.db_path = db_path
+        self.graph_name = graph_name
+        self.key = (os.path.abspath(db_path), graph_name)
+        self._db = db
+        self.graph = db.select_graph(graph_name)
+        self._index_lock = threading.Lock()
+        self._indexed_relations: set[str] = set(DEFAULT_RELATION_TYPES)
+        self._vector_dimension: int | None = None
+        self._async_graphs: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+    def query(self, query: str, params: Dict[str, Any] | None = None):
+        with metrics.timer("graph_query"):
+            return self.graph.query(query, params)
+
+    def _async_graph(self):
+        # redis.asyncio connections are bound to the loop that opened them,
+        # so each running loop gets its own bounded pool on the same server.
+        loop = asyncio.get_running_loop()
+        graph = self._async_graphs.get(loop)
+        if graph is None:
+            pool = BlockingConnectionPool(
+                connection_class=UnixDomainSocketConnection,
+                path=self._db.client.socket_file,
+                max_connections=ASYNC_MAX_CONNECTIONS,
+                decode_responses=True,
+            )
+            graph = AsyncFalkorDB(connection_pool=pool).select_graph(self.graph_name)
+            self._async_graphs[loop] = graph
+        return graph
+
+    async def aquery(self, query: str, params: Dict[str, Any] | None = None):
+        """Runs a query through the asyncio client of the current event loop."""
+        with metrics.timer("graph_query"):
+            return await self._async_graph().query(query, params)
+
+    def clear(self) -> None:
+        """Deletes the graph with all its nodes, edges and indexes, then re-indexes."""
+        try:
+            self.graph.delete()
+        except Exception as e:
+            logger.debug(f"Graph {self.graph_name} not deleted: {e}")
+        RecallCache.get_instance().invalidate_graph(self.key)
+        with self._index_lock:
+            self._indexed_relations = set(DEFAULT_RELATION_TYPES)
+            self._vector_dimension = None
+        self.ensure_indexes()
+
+    def list_indexes(self) -> List[Dict[str, Any]]:
+        """Lists the range/vector indexes defined on this graph."""
+        res = self.query(
+            "CALL db.indexes() YIELD label, properties, types, entitytype "
+            "RETURN label, properties, types, entitytype"
+        )
+        return [
+            {
+                "label": label,
+                "properties": list(properties),
+                "types": {prop: list(kinds) for prop, kinds in types.items()},
+                "entity_type": entity_type,
+            }
+            for label, properties, types, entity_type in res.result_set
+        ]
+
+    def _expected_indexes(self) -> List[Tuple[str, str, str]]:
+        expected = [("NODE", ENTITY_LABEL, prop) for prop in ENTITY_INDEX_PROPERTIES]
+        for rel in sorted(self._indexed_relations):
+            expected.extend(("RELATIONSHIP", rel, prop) for prop in EDGE_INDEX_PROPERTIES)
+        return expected
+
+    def _missing_indexes(self) -> List[Tuple[str, str, str]]:
+        existing = {
+            (idx["entity_type"], idx["label"], prop)
+            for idx in self.list_indexes()
+            for prop, kinds in idx["types"].items()
+            if "RANGE" in kinds
+        }
+        return [key for key in self._expected_indexes() if key not in existing]
+
+    def verify_indexes(self) -> List[str]:
+        """Returns a description of every expected index that is missing."""
+        return [
+            f"{entity_type} {label}({prop})"
+            for entity_type, label, prop in self._missing_indexes()
+        ]
+
+    def ensure_indexes(self, relations: Iterable[str] = ()) -> int:
+        """
+        Creates any missing range index on ``Entity(name)`` and on the
+        ``valid_at``/``invalidated_at`` properties of each relation type.
+
+        Safe to call repeatedly; returns the number of indexes created.
+        """
+        with self._index_lock:
+            self._indexed_relations.update(relations)
+            created = 0
+            for entity_type, label, prop in self._missing_indexes():
+                if entity_type == "NODE":
+                    pattern = f"(n:{label})"
+                else:
+                    pattern = f"()-[n:{label}]-()"
+                try:
+                    self.query(f"CREATE INDEX FOR {pattern} ON (n.{prop})")
+                    created += 1
+                except Exception as e:
+                    if "already indexed" not in str(e):
+                        raise
+            if created:
+                logger.info(f"Created {created} indexes on graph {self.graph_name}")
+            return created
+
+    def ensure_vector_index(self, dimension: int) -> bool:
+        """Creates the cosine vector index on ``Entity.embedding`` if missing."""
+        with self._index_lock:
+            if self._vector_dimension == dimension:
+                return False
+            for idx in self.list_indexes():
+                kinds = idx["types"].get(EMBEDDING_PROPERTY, [])
+                if idx["label"] == ENTITY_LABEL and "VECTOR" in kinds:
+                    self._vector_dimension = dimension
+                    return False
+            self.query(
+                f"CREATE VECTOR INDEX FOR (n:{ENTITY_LABEL}) ON (n.{EMBEDDING_PROPERTY}) "
+                f"OPTIONS {{dimension: {int(dimension)}, similarityFunction: 'cosine'}}"
+            )
+            self._vector_dimension = dimension
+            logger.info(f"Created {dimension}-d vector index on graph {self.graph_name}")
+            return True
+
+    def ensure_relation_index(self, safe_rel: str) -> None:
+        """Indexes the temporal properties of a relation type on first use."""
+        if safe_rel not in self._indexed_relations:
+            self.ensure_indexes([safe_rel])
+
+    async def aensure_relation_index(self, safe_rel: str) -> None:
+        """Async variant of ensure_relation_index; index creation runs in a thread."""
+        if safe_rel not in self._indexed_relations:
+            await asyncio.to_thread(self.ensure_indexes, [safe_rel])
+
+
+_lock = threading.Lock()
+_databases: Dict[str, FalkorDB] = {}
+_stores: Dict[Tuple[str, str], GraphStore] = {}
+
+
+def get_store(
+    db_path: str = DEFAULT_DB_PATH, graph_name: str = DEFAULT_GRAPH_NAME
+) -> GraphStore:
+    """
+    Returns the shared store for ``(db_path, graph_name)``, creating it once.
+    A new store gets its indexes and has any entity without a key backfilled.
+    """
+    key = (os.path.abspath(db_path), graph_name)
+    store = _stores.get(key)
+    if store is not None:
+        return store
+
+    with _lock:
+        store = _stores.get(key)
+        if store is None:
+            db = _databases.get(key[0])
+            if db is None:
+                logger.info(f"Opening FalkorDB at {db_path}")
+                db = FalkorDB(db_path)
+                _databases[key[0]] = db
+            store = GraphStore(db, db_path, graph_name)
+            try:
+                store.ensure_indexes()
+            except Exception as e:
+                logger.warning(f"Failed to create indexes on {graph_name}: {e}")
+            # Reads match entities on their key, so older graphs gain keys here.
+            try:
+                _backfill_keys(store)
+            except Exception as e:
+                logger.warning(f"Failed to backfill entity keys on {graph_name}: {e}")
+            _stores[key] = store
+    return store
+
+
+async def aget_store(
+    db_path: str = DEFAULT_DB_PATH, graph_name: str = DEFAULT_GRAPH_NAME
+) -> GraphStore:
+    """
+    Async variant of get_store. Opening a new store starts the embedded server
+    and creates indexes, so that runs in a thread instead of on the loop.
+    """
+    store = _stores.get((os.path.abspath(db_path), graph_name))
+    if store is not None:
+        return store
+    return await asyncio.to_thread(get_store, db_path, graph_name)
+
+
+def close_stores(under: str | None = None) -> None:
+    """
+    Closes pooled database handles, shutting down embedded servers. With
+    ``under``, only databases stored below that directory are closed.
+    """
+    root = os.path.abspath(under) if under is not None else None
+
+    def selected(path: str) -> bool:
+        return root is None or os.path.commonpath([root, path]) == root
+
+    with _lock:
+        paths = [path for path in _databases if selected(path)]
+        databases = [_databases.pop(path) for path in paths]
+        for key in [key for key in _stores if key[0] in paths]:
+            del _stores[key]
+    for db in databases:
+        db.close()
 
 
 def get_graph_client(
     db_path: str = DEFAULT_DB_PATH, graph_name: str = DEFAULT_GRAPH_NAME
 ):
-    db = FalkorDB(db_path)
-    return db.select_graph(graph_name)
+    return get_store(db_path, graph_name).graph
 
 
 _RELATION_RE = re.compile(r"^[A-Z][A-Z0-9_]*$")
@@ -30,35 +275,359 @@ def _sanitize_relation(relation: str) -> str:
     return upper
 
 
+_RESOLVE_QUERY = """
+UNWIND $keys AS key
+MATCH (n:Entity {key: key})
+RETURN key, collect(n.name)[0]
+"""
+
+_ALIAS_QUERY = """
+UNWIND $rows AS row
+MERGE (n:Entity {name: row.canonical}) ON CREATE SET n.key = row.key
+SET n.aliases = coalesce(n.aliases, []) +
+    [a IN row.aliases WHERE NOT a IN coalesce(n.aliases, [])]
+"""
+
+
+def _resolution_keys(
+    triples: List[Sequence[str]], aliases: Dict[str, str]
+) -> Tuple[Dict[str, str], List[str]]:
+    """Returns (each name routed through ``aliases``, normalised keys to look up)."""
+    routed: Dict[str, str] = {}
+    for subject, _, obj in triples:
+        for name in (subject, obj):
+            if name not in routed:
+                routed[name] = aliases.get(name, name)
+    keys = sorted({normalize_name(name) for name in routed.values()})
+    return routed, keys
+
+
+def _resolved_triples(
+    triples: List[Sequence[str]], routed: Dict[str, str], existing: Dict[str, str]
+) -> Tuple[List[Tuple[str, str, str]], List[Dict[str, Any]]]:
+    """Rewrites triples onto canonical names; also returns the alias rows to store."""
+    canonical = canonical_names(routed.values(), existing)
+    mapping = {name: canonical[target] for name, target in routed.items()}
+
+    aliases: Dict[str, List[str]] = {}
+    for name, target in mapping.items():
+        if name != target:
+            aliases.setdefault(target, []).append(name)
+    alias_rows = [
+        {"canonical": target, "key": normalize_name(target), "aliases": names}
+        for target, names in aliases.items()
+    ]
+    resolved = [(mapping[s], relation, mapping[o]) for s, relation, o in triples]
+    return resolved, alias_rows
+
+
+def _canonicalize(
+    store: GraphStore,
+    triples: List[Sequence[str]],
+    aliases: Dict[str, str] | None = None,
+) -> List[Tuple[str, str, str]]:
+    """
+    Routes each subject and object to the entity sharing its normalised key,
+    recording the surface form as an alias of that entity.
+    """
+    routed, keys = _resolution_keys(triples, aliases or {})
+    existing = dict(store.query(_RESOLVE_QUERY, {"keys": keys}).result_set)
+    resolved, alias_rows = _resolved_triples(triples, routed, existing)
+    if alias_rows:
+        store.query(_ALIAS_QUERY, {"rows": alias_rows})
+    return resolved
+
+
+async def _acanonicalize(
+    store: GraphStore,
+    triples: List[Sequence[str]],
+    aliases: Dict[str, str] | None = None,
+) -> List[Tuple[str, str, str]]:
+    """Async variant of _canonicalize."""
+    routed, keys = _resolution_keys(triples, aliases or {})
+    existing = dict((await store.aquery(_RESOLVE_QUERY, {"keys": keys})).result_set)
+    resolved, alias_rows = _resolved_triples(triples, routed, existing)
+    if alias_rows:
+        await store.aquery(_ALIAS_QUERY, {"rows": alias_rows})
+    return resolved
+
+
+def _invalidate(store: GraphStore, subjects: Iterable[str]) -> None:
+    """
+    Outdates cached recalls of subjects whose outgoing edges were written.
+    Recalls are cached under the subject's normalised key.
+    """
+    RecallCache.get_instance().invalidate(
+        store.key, {normalize_name(subject) for subject in subjects}
+    )
+
+
+def _cache_lookup(
+    store: GraphStore, keys: Iterable[str], at_time: float | None
+) -> Tuple[Dict[str, List[Dict[str, Any]]], Dict[str, int]]:
+    """Returns (cached facts by key, cache version of each missing key)."""
+    cache = RecallCache.get_instance()
+    version = cache.version(store.key)
+    hits, versions = {}, {}
+    for key in keys:
+        facts = cache.get(store.key, key, at_time)
+        if facts is None:
+            versions[key] = version
+        else:
+            hits[key] = facts
+    return hits, versions
+
+
+def _cache_fill(
+    store: GraphStore,
+    at_time: float | None,
+    versions: Dict[str, int],
+    fetched: Dict[str, List[Dict[str, Any]]],
+) -> None:
+    cache = RecallCache.get_instance()
+    for key, facts in fetched.items():
+        cache.put(store.key, key, at_time, versions[key], facts)
+
+
+def _add_fact_query(
+    subject: str,
+    relation: str,
+    obj: str,
+    valid_at: float | None,
+    upsert: bool,
+    expire_existing: bool,
+) -> Tuple[str, str, Dict[str, Any]]:
+    _sanitize_relation(relation)
+    [step] = _add_facts_plan(
+        [(subject, relation, obj)], valid_at, upsert=upsert, cardinality=expire_existing
+    )
+    return step
+
+
 @safe
 def add_fact(
     subject: str,
     relation: str,
     obj: str,
     valid_at: float | None = None,
+    upsert: bool = False,
+    resolve: bool = True,
+    expire_existing: bool = False,
     db_path: str = DEFAULT_DB_PATH,
     graph_name: str = DEFAULT_GRAPH_NAME,
 ) -> bool:
-    """Adds a fact to the graph with soft-delete metadata."""
-    g = get_graph_client(db_path, graph_name)
-    safe_rel = _sanitize_relation(relation)
+    """
+    Adds a fact to the graph with soft-delete metadata.
 
+    With ``upsert``, an identical active edge is updated rather than
+    duplicated. With ``expire_existing``, a relation of cardinality "ONE"
+    expires the subject's other active edges of that relation, as ingestion
+    does; by default earlier facts are left active. With ``resolve``, subject
+    and object are routed to their canonical entities.
+    """
+    store = get_store(db_path, graph_name)
+    if resolve:
+        [(subject, relation, obj)] = _canonicalize(store, [(subject, relation, obj)])
+    safe_rel, query, params = _add_fact_query(
+        subject, relation, obj, valid_at, upsert, expire_existing
+    )
+    store.ensure_relation_index(safe_rel)
+    try:
+        result = store.query(query, params)
+    finally:
+        _invalidate(store, [subject])
+    return len(result.result_set) > 0
+
+
+def _add_facts_query(safe_rel: str, expire_existing: bool) -> str:
+    if not expire_existing:
+        return f"""
+        UNWIND $rows AS row
+        MERGE (s:Entity {{name: row.subject}}) ON CREATE SET s.key = row.subject_key
+        MERGE (o:Entity {{name: row.object}}) ON CREATE SET o.key = row.object_key
+        CREATE (s)-[r:{safe_rel} {{valid_at: $valid_at, id: row.edge_id}}]->(o)
+        RETURN row.idx
+        """
+
+    # Rows superseded by a later row for the same subject are created already
+    # invalidated, mirroring expire-then-add applied triple by triple.
+    return f"""
+    UNWIND $rows AS row
+    MERGE (s:Entity {{name: row.subject}}) ON CREATE SET s.key = row.subject_key
+    MERGE (o:Entity {{name: row.object}}) ON CREATE SET o.key = row.object_key
+    WITH s, o, row
+    OPTIONAL MATCH (s)-[old:{safe_rel}]->()
+    WHERE old.invalidated_at IS NULL
+    WITH s, o, row, collect(old) AS expired
+    FOREACH (e IN expired | SET e.invalidated_at = $valid_at)
+    CREATE (s)-[r:{safe_rel} {{valid_at: $valid_at, id: row.edge_id}}]->(o)
+    FOREACH (_ IN CASE WHEN row.superseded THEN [1] ELSE [] END |
+        SET r.invalidated_at = $valid_at)
+    RETURN row.idx
+    """
+
+
+def _upsert_facts_query(safe_rel: str, expire_existing: bool) -> str:
+    """
+    Like _add_facts_query, but an identical active edge has its ``last_seen``
+    and ``mention_count`` updated instead of a new edge being created.
+    """
+    same_condition = "same.invalidated_at IS NULL"
+    expire = ""
+    if expire_existing:
+        # A superseded row only records history, so any identical edge will do.
+        same_condition += " OR row.superseded"
+        expire = f"""
+    OPTIONAL MATCH (s)-[old:{safe_rel}]->()
+    WHERE size(same) = 0 AND NOT row.superseded AND old.invalidated_at IS NULL
+    WITH s, o, row, same, collect(old) AS expired
+    FOREACH (e IN expired | SET e.invalidated_at = $valid_at)"""
+
+    return f"""
+    UNWIND $rows AS row
+    MERGE (s:Entity {{name: row.subject}}) ON CREATE SET s.key = row.subject_key
+    MERGE (o:Entity {{name: row.object}}) ON CREATE SET o.key = row.object_key
+    WITH s, o, row
+    OPTIONAL MATCH (s)-[same:{safe_rel}]->(o)
+    WHERE {same_condition}
+    WITH s, o, row, collect(same) AS same{expire}
+    FOREACH (e IN same[0..1] |
+        SET e.last_seen = $valid_at,
+            e.mention_count = coalesce(e.mention_count, 1) + row.mentions)
+    FOREACH (_ IN CASE WHEN size(same) = 0 THEN [1] ELSE [] END |
+        CREATE (s)-[:{safe_rel} {{
+            valid_at: $valid_at,
+            last_seen: $valid_at,
+            mention_count: row.mentions,
+            id: row.edge_id,
+            invalidated_at: CASE WHEN row.superseded THEN $valid_at ELSE null END
+        }}]->(o))
+    WITH row
+    UNWIND row.idxs AS idx
+    RETURN idx
+    """
+
+
+def _merge_duplicate_rows(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Collapses repeated (subject, object) rows into one carrying a mention count."""
+    merged: Dict[Tuple[str, str], Dict[str, Any]] = {}
+    for row in rows:
+        key = (row["subject"], row["object"])
+        if key in merged:
+            first = merged[key]
+            first["idx"] = row["idx"]
+            first["idxs"].append(row["idx"])
+            first["mentions"] += 1
+        else:
+            merged[key] = {**row, "idxs": [row["idx"]], "mentions": 1}
+    return list(merged.values())
+
+
+def _add_facts_plan(
+    triples: List[Sequence[str]],
+    valid_at: float | None,
+    upsert: bool = False,
+    cardinality: bool = True,
+) -> List[Tuple[str, str, Dict[str, Any]]]:
+    """
+    Groups triples into one (relation, query, params) step per relation type.
+    With ``cardinality``, "ONE" relations expire the subject's earlier edges.
+    """
     if valid_at is None:
         valid_at = time.time()
 
-    query = f"""
-    MERGE (s:Entity {{name: $subject}})
-    MERGE (o:Entity {{name: $obj}})
-    CREATE (s)-[r:{safe_rel} {{
-        valid_at: {valid_at},
-        id: $edge_id
-    }}]->(o)
-    RETURN count(r)
+    groups: Dict[str, List[Dict[str, Any]]] = {}
+    for idx, (subject, relation, obj) in enumerate(triples):
+        try:
+            safe_rel = _sanitize_relation(relation)
+        except ValueError as e:
+            logger.warning(f"Skipping fact {subject}/{relation}/{obj}: {e}")
+            continue
+        groups.setdefault(safe_rel, []).append(
+            {
+                "idx": idx,
+                "subject": subject,
+                "subject_key": normalize_name(subject),
+                "object": obj,
+                "object_key": normalize_name(obj),
+                "edge_id": str(uuid.uuid4()),
+                "superseded": False,
+            }
+        )
+
+    plan = []
+    for safe_rel, rows in groups.items():
+        expire_existing = (
+            cardinality and CARDINALITY.get(safe_rel.lower(), "MANY") == "ONE"
+        )
+        if upsert:
+            rows = _merge_duplicate_rows(rows)
+        if expire_existing:
+            # Merged rows keep their first position but carry their last
+            # mention's idx, so the latest fact is the highest idx, not the
+            # last row.
+            latest: Dict[str, int] = {}
+            for row in rows:
+                latest[row["subject"]] = max(latest.get(row["subject"], -1), row["idx"])
+            for row in rows:
+                row["superseded"] = latest[row["subject"]] != row["idx"]
+        plan.append(
+            (
+                safe_rel,
+                (_upsert_facts_query if upsert else _add_facts_query)(
+                    safe_rel, expire_existing
+                ),
+                {"rows": rows, "valid_at": valid_at},
+            )
+        )
+    return plan
+
+
+@safe
+def add_facts(
+    triples: Iterable[Sequence[str]],
+    valid_at: float | None = None,
+    upsert: bool = False,
+    resolve: bool = True,
+    aliases: Dict[str, str] | None = None,
+    db_path: str = DEFAULT_DB_PATH,
+    graph_name: str = DEFAULT_GRAPH_NAME,
+) -> List[bool]:
     """
+    Adds many (subject, relation, object) facts with one query per relation type.
 
-    params = {"subject": subject, "obj": obj, "edge_id": str(uuid.uuid4())}
-    result = g.query(query, params)
-    return len(result.result_set) > 0
+    Relations with cardinality "ONE" expire the subject's active edges inside
+    the same query. With ``upsert``, a fact matching an active edge updates
+    that edge's ``last_seen`` and ``mention_count`` instead of adding a
+    parallel edge, and repeats within ``triples`` are written once.
+
+    With ``resolve``, names are first routed to the entity sharing their
+    normalised key (after applying any caller-supplied ``aliases``), and the
+    surface forms are stored as aliases on that entity. Returns one success
+    flag per input triple.
+    """
+    store = get_store(db_path, graph_name)
+    triples = list(triples)
+    if resolve and triples:
+        triples = _canonicalize(store, triples, aliases)
+
+    stored = [False] * len(triples)
+    plan = _add_facts_plan(triples, valid_at, upsert)
+    for safe_rel, query, params in plan:
+        store.ensure_relation_index(safe_rel)
+        try:
+            res = store.query(query, params)
+        except Exception as e:
+            logger.warning(f"Failed to add {len(params['rows'])} {safe_rel} facts: {e}")
+            continue
+        finally:
+            _invalidate(store, (row["subject"] for row in params["rows"]))
+
+        for record in res.result_set:
+            stored[record[0]] = True
+
+    logger.debug(f"Added {sum(stored)}/{len(triples)} facts in {len(plan)} queries")
+    return stored
 
 
 @safe
@@ -69,22 +638,28 @@ def expire_facts(
     db_path: str = DEFAULT_DB_PATH,
     graph_name: str = DEFAULT_GRAPH_NAME,
 ) -> int:
-    """Expires existing active facts by setting invalidated_at."""
-    g = get_graph_client(db_path, graph_name)
+    """
+    Expires existing active facts by setting invalidated_at. The subject is
+    matched on its normalised key, as in query_valid_facts.
+    """
+    store = get_store(db_path, graph_name)
     safe_rel = _sanitize_relation(relation)
 
     if invalidated_at is None:
         invalidated_at = time.time()
 
     query = f"""
-    MATCH (s:Entity {{name: $subject}})-[r:{safe_rel}]->(o)
+    MATCH (s:Entity {{key: $key}})-[r:{safe_rel}]->(o)
     WHERE r.invalidated_at IS NULL
     SET r.invalidated_at = {invalidated_at}
     RETURN count(r)
     """
 
-    params = {"subject": subject}
-    res = g.query(query, params)
+    params = {"key": normalize_name(subject)}
+    try:
+        res = store.query(query, params)
+    finally:
+        _invalidate(store, [subject])
 
     count = 0
     if res.result_set and len(res.result_set) > 0:
@@ -95,31 +670,172 @@ def expire_facts(
 
 
 @safe
-def query_valid_facts(
-    subject: str,
-    at_time: float | None = None,
+def compact_facts(
+    db_path: str = DEFAULT_DB_PATH, graph_name: str = DEFAULT_GRAPH_NAME
+) -> int:
+    """
+    Merges parallel edges left by non-upsert writes; returns edges removed.
+
+    Edges with the same subject, relation, object and ``invalidated_at`` are
+    collapsed into the earliest one, which keeps the summed ``mention_count``
+    and latest ``last_seen`` of the group.
+    """
+    store = get_store(db_path, graph_name)
+    query = """
+    MATCH (s:Entity)-[r]->(o:Entity)
+    WITH s, o, type(r) AS rel, r.invalidated_at AS invalidated_at, r
+    ORDER BY r.valid_at
+    WITH s, o, rel, invalidated_at, collect(r) AS edges
+    WHERE size(edges) > 1
+    WITH edges[0] AS keep, edges[1..] AS duplicates,
+        reduce(n = 0, e IN edges | n + coalesce(e.mention_count, 1)) AS mentions,
+        reduce(t = 0.0, e IN edges |
+            CASE WHEN coalesce(e.last_seen, e.valid_at) > t
+            THEN coalesce(e.last_seen, e.valid_at) ELSE t END) AS last_seen
+    SET keep.mention_count = mentions, keep.last_seen = last_seen
+    FOREACH (e IN duplicates | DELETE e)
+    RETURN sum(size(duplicates))
+    """
+    try:
+        res = store.query(query)
+    finally:
+        RecallCache.get_instance().invalidate_graph(store.key)
+    removed = int(res.result_set[0][0] or 0) if res.result_set else 0
+    logger.info(f"Compacted {removed} duplicate edges in {graph_name}")
+    return removed
+
+
+def archive_graph_name(graph_name: str) -> str:
+    return f"{graph_name}{ARCHIVE_SUFFIX}"
+
+
+def _archived_facts(
+    store: GraphStore, keys: List[str], at_time: float
+) -> Dict[str, List[Dict[str, Any]]]:
+    archive = get_store(store.db_path, archive_graph_name(store.graph_name))
+    params = {"keys": keys, "at_time": at_time}
+    res = archive.query(_valid_facts_many_query(at_time), params)
+    return _facts_by_key(keys, res)
+
+
+async def _aarchived_facts(
+    store: GraphStore, keys: List[str], at_time: float
+) -> Dict[str, List[Dict[str, Any]]]:
+    """Async variant of _archived_facts."""
+    archive = await aget_store(store.db_path, archive_graph_name(store.graph_name))
+    params = {"keys": keys, "at_time": at_time}
+    res = await archive.aquery(_valid_facts_many_query(at_time), params)
+    return _facts_by_key(keys, res)
+
+
+@safe
+def archive_facts(
+    retention: float = DEFAULT_RETENTION,
+    before: float | None = None,
+    batch_size: int = ARCHIVE_BATCH_SIZE,
     db_path: str = DEFAULT_DB_PATH,
     graph_name: str = DEFAULT_GRAPH_NAME,
-) -> List[Dict[str, Any]]:
-    """Queries facts about a subject that are active (not invalidated)."""
-    g = get_graph_client(db_path, graph_name)
+) -> int:
+    """
+    Moves edges invalidated before a cutoff into the archive graph.
 
+    The cutoff is ``before`` if given, else ``retention`` seconds ago. Each
+    batch is copied into ``<graph_name>_archive`` (merged on the edge ``id``,
+    so an interrupted run can simply be repeated) and then deleted from the
+    hot graph. Returns the number of edges moved.
+    """
+    store = get_store(db_path, graph_name)
+    archive = get_store(db_path, archive_graph_name(graph_name))
+    cutoff = before if before is not None else time.time() - retention
+
+    res = store.query(
+        "CALL db.relationshipTypes() YIELD relationshipType RETURN relationshipType"
+    )
+    moved = 0
+    for (relation,) in res.result_set:
+        try:
+            safe_rel = _sanitize_relation(relation)
+        except ValueError:
+            continue
+        archive.ensure_relation_index(safe_rel)
+
+        params = {"cutoff": cutoff, "limit": batch_size}
+        while True:
+            rows = store.query(
+                f"""
+                MATCH (s:Entity)-[r:{safe_rel}]->(o:Entity)
+                WHERE r.invalidated_at < $cutoff
+                RETURN id(r), s.name, o.name, properties(r)
+                LIMIT $limit
+                """,
+                params,
+            ).result_set
+            if not rows:
+                break
+
+            archive_rows = []
+            for _, subject, obj, props in rows:
+                props = dict(props)
+                props.setdefault("id", str(uuid.uuid4()))
+                archive_rows.append(
+                    {
+                        "subject": subject,
+                        "subject_key": normalize_name(subject),
+                        "object": obj,
+                        "object_key": normalize_name(obj),
+                        "props": props,
+                    }
+                )
+            archive.query(
+                f"""
+                UNWIND $rows AS row
+                MERGE (s:Entity {{name: row.subject}}) ON CREATE SET s.key = row.subject_key
+                MERGE (o:Entity {{name: row.object}}) ON CREATE SET o.key = row.object_key
+                MERGE (s)-[r:{safe_rel} {{id: row.props.id}}]->(o)
+                SET r += row.props
+                """,
+                {"rows": archive_rows},
+            )
+            try:
+                store.query(
+                    f"""
+                    MATCH ()-[r:{safe_rel}]->()
+                    WHERE r.invalidated_at < $cutoff AND id(r) IN $ids
+                    DELETE r
+                    """,
+                    {"cutoff": cutoff, "ids": [row[0] for row in rows]},
+                )
+            finally:
+                _invalidate(store, {row[1] for row in rows})
+
+            moved += len(rows)
+            if len(rows) < batch_size:
+                break
+
+    logger.info(f"Archived {moved} edges invalidated before {cutoff} from {graph_name}")
+    return moved
+
+
+def _valid_edge_condition(var: str, at_time: float | None) -> str:
+    """Cypher condition selecting edges active now, or at ``$at_time`` if given."""
     if at_time is None:
-        query = """
-        MATCH (s:Entity {name: $subject})-[r]->(o:Entity)
-        WHERE r.invalidated_at IS NULL
-        RETURN type(r) as relation, o.name as object
-        """
-    else:
-        query = f"""
-        MATCH (s:Entity {{name: $subject}})-[r]->(o:Entity)
-        WHERE r.valid_at <= {at_time} 
-          AND (r.invalidated_at IS NULL OR r.invalidated_at > {at_time})
-        RETURN type(r) as relation, o.name as object
-        """
+        return f"{var}.invalidated_at IS NULL"
+    return (
+        f"{var}.valid_at <= $at_time "
+        f"AND ({var}.invalidated_at IS NULL OR {var}.invalidated_at > $at_time)"
+    )
+
+
+def _valid_facts_query(key: str, at_time: float | None) -> Tuple[str, Dict[str, Any]]:
+    query = f"""
+    MATCH (s:Entity {{key: $key}})-[r]->(o:Entity)
+    WHERE {_valid_edge_condition("r", at_time)}
+    RETURN type(r) as relation, o.name as object
+    """
+    return query, {"key": key, "at_time": at_time}
 
-    params = {"subject": subject}
-    res = g.query(query, params)
+
+def _facts_from_result(res) -> List[Dict[str, Any]]:
     output = []
     for record in res.result_set:
         output.append({"relation": record[0], "object": record[1]})
@@ -127,12 +843,500 @@ def query_valid_facts(
     return output
 
 
+@safe
+def query_valid_facts(
+    subject: str,
+    at_time: float | None = None,
+    include_archive: bool = False,
+    db_path: str = DEFAULT_DB_PATH,
+    graph_name: str = DEFAULT_GRAPH_NAME,
+) -> List[Dict[str, Any]]:
+    """
+    Queries facts about a subject that are active (not invalidated).
+
+    The subject is matched on its normalised key, so any surface form of an
+    entity ("apple", "Apple Inc") finds its facts. Graphs written before
+    entities carried keys need backfill_entity_keys first.
+
+    Results are served from the shared RecallCache until a write touches the
+    subject. With ``include_archive``, an ``at_time`` query also reads the
+    edges moved out by archive_facts.
+    """
+    store = get_store(db_path, graph_name)
+    key = normalize_name(subject)
+    hits, versions = _cache_lookup(store, [key], at_time)
+    facts = hits.get(key)
+    if facts is None:
+        query, params = _valid_facts_query(key, at_time)
+        res = store.query(query, params)
+        facts = _facts_from_result(res)
+        _cache_fill(store, at_time, versions, {key: facts})
+
+    if include_archive and at_time is not None:
+        facts = facts + _archived_facts(store, [key], at_time)[key]
+    return facts
+
+
+def _valid_facts_many_query(at_time: float | None) -> str:
+    return f"""
+    UNWIND $keys AS key
+    MATCH (s:Entity {{key: key}})-[r]->(o:Entity)
+    WHERE {_valid_edge_condition("r", at_time)}
+    RETURN key, type(r) as relation, o.name as object
+    """
+
+
+def _facts_by_key(keys: List[str], res) -> Dict[str, List[Dict[str, Any]]]:
+    output: Dict[str, List[Dict[str, Any]]] = {key: [] for key in keys}
+    for key, relation, obj in res.result_set:
+        output[key].append({"relation": relation, "object": obj})
+    return output
+
+
+@safe
+def query_valid_facts_many(
+    subjects: Iterable[str],
+    at_time: float | None = None,
+    include_archive: bool = False,
+    db_path: str = DEFAULT_DB_PATH,
+    graph_name: str = DEFAULT_GRAPH_NAME,
+) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Queries the active facts of many subjects with one query.
+
+    Every subject appears in the result, keyed as given, with an empty list if
+    nothing is known. Subjects are matched on their normalised key as in
+    query_valid_facts, and keys held in the RecallCache are not queried.
+    ``include_archive`` behaves as in query_valid_facts.
+    """
+    store = get_store(db_path, graph_name)
+    keys = {subject: normalize_name(subject) for subject in subjects}
+    unique = list(dict.fromkeys(keys.values()))
+    hits, versions = _cache_lookup(store, unique, at_time)
+    if versions:
+        params = {"keys": list(versions), "at_time": at_time}
+        res = store.query(_valid_facts_many_query(at_time), params)
+        fetched = _facts_by_key(list(versions), res)
+        _cache_fill(store, at_time, versions, fetched)
+        hits.update(fetched)
+
+    if include_archive and at_time is not None and unique:
+        for key, facts in _archived_facts(store, unique, at_time).items():
+            hits[key] = hits[key] + facts
+    return {subject: hits[key] for subject, key in keys.items()}
+
+
+def _fanout_caps(
+    fanout: int | Sequence[int | None] | None, depth: int
+) -> List[int | None]:
+    if fanout is None or isinstance(fanout, int):
+        return [fanout] * depth
+    return (list(fanout) + [None] * depth)[:depth]
+
+
+def _neighbourhood_query(
+    depth: int,
+    relations: Iterable[str] | None,
+    at_time: float | None,
+    caps: List[int | None],
+) -> str:
+    """
+    One stage per hop: each keeps at most its cap of edges per source node and
+    expands only nodes not reached before, so fan-out is bounded in the query.
+    """
+    if depth < 1:
+        raise ValueError(f"depth must be at least 1, got {depth}")
+    types = ""
+    if relations:
+        types = ":" + "|".join(_sanitize_relation(rel) for rel in relations)
+
+    stages = []
+    for hop in range(1, int(depth) + 1):
+        cap = "" if caps[hop - 1] is None else f"[..$cap{hop}]"
+        stages.append(
+            f"""
+    UNWIND (CASE WHEN size(frontier) = 0 THEN [null] ELSE frontier END) AS name
+    OPTIONAL MATCH (src:Entity {{name: name}})-[r{types}]->(dst:Entity)
+    WHERE {_valid_edge_condition("r", at_time)}
+    WITH roots, seen, edges, name, collect(
+        CASE WHEN r IS NULL THEN null ELSE [name, type(r), dst.name, {hop}] END
+    ){cap} AS out
+    WITH roots, seen, edges, collect(out) AS outs
+    WITH roots, seen, edges, reduce(acc = [], o IN outs | acc + o)[..($limit - size(edges))] AS hop
+    WITH roots, seen, edges + hop AS edges,
+         reduce(acc = [], e IN hop |
+             CASE WHEN e[2] IN seen OR e[2] IN acc THEN acc ELSE acc + [e[2]] END) AS frontier
+    WITH roots, seen + frontier AS seen, edges, frontier"""
+        )
+
+    return f"""
+    MATCH (s:Entity {{key: $key}})
+    WITH collect(s.name) AS roots
+    WITH roots, roots AS seen, [] AS edges, roots AS frontier{"".join(stages)}
+    RETURN roots, edges
+    """
+
+
+def _neighbourhood_from_edges(roots: List[str], rows) -> Dict[str, List]:
+    nodes = dict.fromkeys(roots)
+    edges: Dict[Tuple[str, str, str], int] = {}
+    for src, rel, dst, hop in rows:
+        edges.setdefault((src, rel, dst), hop)
+        nodes[dst] = None
+
+    return {
+        "nodes": list(nodes),
+        "edges": [
+            {"subject": src, "relation": rel, "object": dst, "hop": hop}
+            for (src, rel, dst), hop in edges.items()
+        ],
+    }
+
+
+@safe
+def query_neighbourhood(
+    subject: str,
+    depth: int = 2,
+    limit: int = 100,
+    relations: Iterable[str] | None = None,
+    at_time: float | None = None,
+    fanout: int | Sequence[int | None] | None = None,
+    db_path: str = DEFAULT_DB_PATH,
+    graph_name: str = DEFAULT_GRAPH_NAME,
+) -> Dict[str, List]:
+    """
+    Collects the subgraph within ``depth`` hops of a subject in one query.
+
+    The subject is matched on its normalised key as in query_valid_facts, and
+    the nodes start with the entities it resolved to (or the subject itself
+    if none). Only edges valid now (or at ``at_time``) are followed, optionally
+    restricted to ``relations``. At most ``limit`` edges are read, nearest
+    hops first, and ``fanout`` caps the edges followed out of any one node,
+    either as a single cap or one per hop.
+    """
+    store = get_store(db_path, graph_name)
+    caps = _fanout_caps(fanout, depth)
+    query = _neighbourhood_query(depth, relations, at_time, caps)
+    params = {"key": normalize_name(subject), "limit": int(limit), "at_time": at_time}
+    for hop, cap in enumerate(caps, start=1):
+        if cap is not None:
+            params[f"cap{hop}"] = int(cap)
+    res = store.query(query, params)
+    roots, rows = res.result_set[0] if res.result_set else ([], [])
+    return _neighbourhood_from_edges(roots or [subject], rows)
+
+
 @safe
 def get_all_entities(
     db_path: str = DEFAULT_DB_PATH, graph_name: str = DEFAULT_GRAPH_NAME
 ) -> List[str]:
     """Retrieves all unique entity names from the graph."""
-    g = get_graph_client(db_path, graph_name)
+    store = get_store(db_path, graph_name)
     query = "MATCH (n:Entity) RETURN n.name"
-    res = g.query(query)
+    res = store.query(query)
     return [record[0] for record in res.result_set]
+
+
+@safe
+def list_indexes(
+    db_path: str = DEFAULT_DB_PATH, graph_name: str = DEFAULT_GRAPH_NAME
+) -> List[Dict[str, Any]]:
+    """Lists the indexes defined on the graph."""
+    return get_store(db_path, graph_name).list_indexes()
+
+
+@safe
+def verify_indexes(
+    db_path: str = DEFAULT_DB_PATH, graph_name: str = DEFAULT_GRAPH_NAME
+) -> List[str]:
+    """Returns the expected indexes that are missing (empty when all exist)."""
+    return get_store(db_path, graph_name).verify_indexes()
+
+
+@safe
+def get_unembedded_entities(
+    db_path: str = DEFAULT_DB_PATH, graph_name: str = DEFAULT_GRAPH_NAME
+) -> List[str]:
+    """Retrieves the names of entities without a stored embedding."""
+    store = get_store(db_path, graph_name)
+    query = f"MATCH (n:Entity) WHERE n.{EMBEDDING_PROPERTY} IS NULL RETURN n.name"
+    res = store.query(query)
+    return [record[0] for record in res.result_set]
+
+
+@safe
+def resolve_entities(
+    names: Iterable[str],
+    db_path: str = DEFAULT_DB_PATH,
+    graph_name: str = DEFAULT_GRAPH_NAME,
+) -> Dict[str, str]:
+    """Maps each name to the existing entity sharing its normalised key, if any."""
+    store = get_store(db_path, graph_name)
+    keys = {name: normalize_name(name) for name in names}
+    if not keys:
+        return {}
+    res = store.query(_RESOLVE_QUERY, {"keys": sorted(set(keys.values()))})
+    existing = dict(res.result_set)
+    return {name: existing[key] for name, key in keys.items() if key in existing}
+
+
+def _backfill_keys(store: GraphStore, batch_size: int = KEY_BACKFILL_BATCH_SIZE) -> int:
+    updated = 0
+    try:
+        while True:
+            res = store.query(
+                "MATCH (n:Entity) WHERE n.key IS NULL RETURN n.name LIMIT $limit",
+                {"limit": batch_size},
+            )
+            rows = [
+                {"name": name, "key": normalize_name(name)} for (name,) in res.result_set
+            ]
+            if not rows:
+                break
+            store.query(
+                "UNWIND $rows AS row MATCH (n:Entity {name: row.name}) SET n.key = row.key",
+                {"rows": rows},
+            )
+            updated += len(rows)
+    finally:
+        if updated:
+            # Recalls cached before the keys existed found nothing.
+            RecallCache.get_instance().invalidate_graph(store.key)
+            logger.info(f"Backfilled keys on {updated} entities in {store.graph_name}")
+    return updated
+
+
+@safe
+def backfill_entity_keys(
+    batch_size: int = KEY_BACKFILL_BATCH_SIZE,
+    db_path: str = DEFAULT_DB_PATH,
+    graph_name: str = DEFAULT_GRAPH_NAME,
+) -> int:
+    """
+    Sets the normalised key on entities written before keys existed. get_store
+    runs this when it opens a graph; call it again after writing to the graph
+    with an older version of nimem.
+    """
+    return _backfill_keys(get_store(db_path, graph_name), batch_size)
+
+
+@safe
+def nearest_entities(
+    vectors: Sequence[Sequence[float]],
+    k: int = 3,
+    db_path: str = DEFAULT_DB_PATH,
+    graph_name: str = DEFAULT_GRAPH_NAME,
+) -> Dict[int, List[Tuple[str, float]]]:
+    """Returns the k indexed entities nearest to each vector, by position."""
+    store = get_store(db_path, graph_name)
+    rows = [
+        {"idx": idx, "vector": [float(x) for x in vector]}
+        for idx, vector in enumerate(vectors)
+    ]
+    if not rows:
+        return {}
+    query = f"""
+    UNWIND $rows AS row
+    CALL db.idx.vector.queryNodes('{ENTITY_LABEL}', '{EMBEDDING_PROPERTY}', $k, vecf32(row.vector))
+    YIELD node, score
+    RETURN row.idx, node.name, score
+    ORDER BY score
+    """
+    res = store.query(query, {"rows": rows, "k": int(k)})
+    output: Dict[int, List[Tuple[str, float]]] = {}
+    for idx, name, distance in res.result_set:
+        output.setdefault(idx, []).append((name, 1.0 - distance))
+    return output
+
+
+@safe
+def set_entity_embeddings(
+    names: List[str],
+    vectors: Sequence[Sequence[float]],
+    db_path: str = DEFAULT_DB_PATH,
+    graph_name: str = DEFAULT_GRAPH_NAME,
+) -> int:
+    """Stores entity embeddings as a vector property, creating the vector index."""
+    if not names:
+        return 0
+    store = get_store(db_path, graph_name)
+    rows = [
+        {"name": name, "vector": [float(x) for x in vector]}
+        for name, vector in zip(names, vectors)
+    ]
+    store.ensure_vector_index(len(rows[0]["vector"]))
+
+    query = f"""
+    UNWIND $rows AS row
+    MATCH (n:Entity {{name: row.name}})
+    SET n.{EMBEDDING_PROPERTY} = vecf32(row.vector)
+    RETURN count(n)
+    """
+    res = store.query(query, {"rows": rows})
+    return res.result_set[0][0] if res.result_set else 0
+
+
+@safe
+def query_similar_entities(
+    vector: Sequence[float],
+    k: int = 5,
+    at_time: float | None = None,
+    db_path: str = DEFAULT_DB_PATH,
+    graph_name: str = DEFAULT_GRAPH_NAME,
+) -> List[Dict[str, Any]]:
+    """
+    Finds the k entities nearest to ``vector`` and their valid facts in one query.
+
+    Results are ordered by cosine similarity, highest first.
+    """
+    store = get_store(db_path, graph_name)
+    query = f"""
+    CALL db.idx.vector.queryNodes('{ENTITY_LABEL}', '{EMBEDDING_PROPERTY}', $k, vecf32($vector))
+    YIELD node, score
+    OPTIONAL MATCH (node)-[r]->(o:Entity)
+    WHERE {_valid_edge_condition("r", at_time)}
+    RETURN node.name, score, collect([type(r), o.name])
+    ORDER BY score
+    """
+    params = {"k": int(k), "vector": [float(x) for x in vector], "at_time": at_time}
+    res = store.query(query, params)
+
+    output = []
+    for name, distance, pairs in res.result_set:
+        output.append(
+            {
+                "name": name,
+                "similarity": 1.0 - distance,
+                "facts": [
+                    {"relation": relation, "object": obj}
+                    for relation, obj in pairs
+                    if relation is not None
+                ],
+            }
+        )
+    return output
+
+
+def _async_safe(func):
+    """Async counterpart of ``returns.result.safe``."""
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs) -> Result:
+        try:
+            return Success(await func(*args, **kwargs))
+        except Exception as e:
+            return Failure(e)
+
+    return wrapper
+
+
+@_async_safe
+async def aadd_fact(
+    subject: str,
+    relation: str,
+    obj: str,
+    valid_at: float | None = None,
+    upsert: bool = False,
+    resolve: bool = True,
+    expire_existing: bool = False,
+    db_path: str = DEFAULT_DB_PATH,
+    graph_name: str = DEFAULT_GRAPH_NAME,
+) -> bool:
+    """Async variant of add_fact."""
+    store = await aget_store(db_path, graph_name)
+    if resolve:
+        [(subject, relation, obj)] = await _acanonicalize(
+            store, [(subject, relation, obj)]
+        )
+    safe_rel, query, params = _add_fact_query(
+        subject, relation, obj, valid_at, upsert, expire_existing
+    )
+    await store.aensure_relation_index(safe_rel)
+    try:
+        result = await store.aquery(query, params)
+    finally:
+        _invalidate(store, [subject])
+    return len(result.result_set) > 0
+
+
+@_async_safe
+async def aadd_facts(
+    triples: Iterable[Sequence[str]],
+    valid_at: float | None = None,
+    upsert: bool = False,
+    resolve: bool = True,
+    aliases: Dict[str, str] | None = None,
+    db_path: str = DEFAULT_DB_PATH,
+    graph_name: str = DEFAULT_GRAPH_NAME,
+) -> List[bool]:
+    """Async variant of add_facts."""
+    store = await aget_store(db_path, graph_name)
+    triples = list(triples)
+    if resolve and triples:
+        triples = await _acanonicalize(store, triples, aliases)
+
+    stored = [False] * len(triples)
+    for safe_rel, query, params in _add_facts_plan(triples, valid_at, upsert):
+        await store.aensure_relation_index(safe_rel)
+        try:
+            res = await store.aquery(query, params)
+        except Exception as e:
+            logger.warning(f"Failed to add {len(params['rows'])} {safe_rel} facts: {e}")
+            continue
+        finally:
+            _invalidate(store, (row["subject"] for row in params["rows"]))
+
+        for record in res.result_set:
+            stored[record[0]] = True
+    return stored
+
+
+@_async_safe
+async def aquery_valid_facts(
+    subject: str,
+    at_time: float | None = None,
+    include_archive: bool = False,
+    db_path: str = DEFAULT_DB_PATH,
+    graph_name: str = DEFAULT_GRAPH_NAME,
+) -> List[Dict[str, Any]]:
+    """Async variant of query_valid_facts."""
+    store = await aget_store(db_path, graph_name)
+    key = normalize_name(subject)
+    hits, versions = _cache_lookup(store, [key], at_time)
+    facts = hits.get(key)
+    if facts is None:
+        query, params = _valid_facts_query(key, at_time)
+        res = await store.aquery(query, params)
+        facts = _facts_from_result(res)
+        _cache_fill(store, at_time, versions, {key: facts})
+
+    if include_archive and at_time is not None:
+        facts = facts + (await _aarchived_facts(store, [key], at_time))[key]
+    return facts
+
+
+@_async_safe
+async def aquery_valid_facts_many(
+    subjects: Iterable[str],
+    at_time: float | None = None,
+    include_archive: bool = False,
+    db_path: str = DEFAULT_DB_PATH,
+    graph_name: str = DEFAULT_GRAPH_NAME,
+) -> Dict[str, List[Dict[str, Any]]]:
+    """Async variant of query_valid_facts_many."""
+    store = await aget_store(db_path, graph_name)
+    keys = {subject: normalize_name(subject) for subject in subjects}
+    unique = list(dict.fromkeys(keys.values()))
+    hits, versions = _cache_lookup(store, unique, at_time)
+    if versions:
+        params = {"keys": list(versions), "at_time": at_time}
+        res = await store.aquery(_valid_facts_many_query(at_time), params)
+        fetched = _facts_by_key(list(versions), res)
+        _cache_fill(store, at_time, versions, fetched)
+        hits.update(fetched)
+
+    if include_archive and at_time is not None and unique:
+        archived = await _aarchived_facts(store, unique, at_time)
+        for key, facts in archived.items():
+            hits[key] = hits[key] + facts
+    return {subject: hits[key] for subject, key in keys.items()}
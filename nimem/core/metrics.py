@@ -0,0 +1,243 @@
+"""
+Timers and counters for nimem's pipeline stages, caches and graph queries.
+
+Nothing is recorded until a sink is configured::
+
+    from nimem.core import metrics
+
+    registry = metrics.Registry()
+    metrics.configure(registry, metrics.LoggingSink())
+    ...
+    print(registry.to_prometheus())
+
+With no sink, ``timer`` hands back a shared no-op and ``count`` returns
+immediately, so instrumented code pays one truthiness check per call.
+"""
+
+import bisect
+import logging
+import threading
+import time
+from typing import Any, Dict, Iterable, Tuple
+
+logger = logging.getLogger(__name__)
+
+PREFIX = "nimem_"
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class Sink:
+    """Receives measurements. Subclasses override what they support."""
+
+    def start_span(self, name: str, labels: Dict[str, str]) -> Any:
+        """Called when a timer starts; the return value is passed to observe."""
+        return None
+
+    def observe(
+        self, name: str, seconds: float, labels: Dict[str, str], span: Any = None
+    ) -> None:
+        pass
+
+    def increment(self, name: str, value: float, labels: Dict[str, str]) -> None:
+        pass
+
+
+class LoggingSink(Sink):
+    """Logs every measurement at ``level``."""
+
+    def __init__(self, level: int = logging.DEBUG):
+        self.level = level
+
+    def observe(self, name, seconds, labels, span=None):
+        logger.log(self.level, f"{name} {labels} took {seconds * 1000:.2f}ms")
+
+    def increment(self, name, value, labels):
+        logger.log(self.level, f"{name} {labels} +{value:g}")
+
+
+class Registry(Sink):
+    """
+    In-memory counters and timer histograms, exportable in the Prometheus
+    text format.
+    """
+
+    def __init__(self, buckets: Iterable[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        self._counters: Dict[Tuple[str, Labels], float] = {}
+        # (name, labels) -> [per-bucket counts..., count, sum]
+        self._timers: Dict[Tuple[str, Labels], list] = {}
+
+    @staticmethod
+    def _key(name: str, labels: Dict[str, str]) -> Tuple[str, Labels]:
+        return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+    def observe(self, name, seconds, labels, span=None):
+        key = self._key(name, labels)
+        slot = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            entry = self._timers.get(key)
+            if entry is None:
+                entry = self._timers[key] = [0] * len(self.buckets) + [0, 0.0]
+            if slot < len(self.buckets):
+                entry[slot] += 1
+            entry[-2] += 1
+            entry[-1] += seconds
+
+    def increment(self, name, value, labels):
+        key = self._key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._timers.clear()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Counters and per-timer count and sum, keyed by (name, labels)."""
+        with self._lock:
+            return {
+                "counters": dict(self._counters),
+                "timers": {
+                    key: {"count": entry[-2], "sum": entry[-1]}
+                    for key, entry in self._timers.items()
+                },
+            }
+
+    def to_prometheus(self) -> str:
+        lines = []
+        with self._lock:
+            counters = sorted(self._counters.items())
+            timers = sorted((key, list(entry)) for key, entry in self._timers.items())
+
+        declared = set()
+        for (name, labels), value in counters:
+            metric = f"{PREFIX}{name}_total"
+            if metric not in declared:
+                declared.add(metric)
+                lines.append(f"# TYPE {metric} counter")
+            lines.append(f"{metric}{_format_labels(labels)} {value:g}")
+
+        for (name, labels), entry in timers:
+            metric = f"{PREFIX}{name}_seconds"
+            if metric not in declared:
+                declared.add(metric)
+                lines.append(f"# TYPE {metric} histogram")
+            cumulative = 0
+            for bound, hits in zip(self.buckets, entry):
+                cumulative += hits
+                le = labels + (("le", f"{bound:g}"),)
+                lines.append(f"{metric}_bucket{_format_labels(le)} {cumulative}")
+            inf = labels + (("le", "+Inf"),)
+            lines.append(f"{metric}_bucket{_format_labels(inf)} {entry[-2]}")
+            lines.append(f"{metric}_sum{_format_labels(labels)} {entry[-1]:.9g}")
+            lines.append(f"{metric}_count{_format_labels(labels)} {entry[-2]}")
+        return "\n".join(lines) + "\n" if lines else ""
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    escaped = (
+        (k, v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for k, v in labels
+    )
+    return "{" + ",".join(f'{k}="{v}"' for k, v in escaped) + "}"
+
+
+class OpenTelemetrySink(Sink):
+    """
+    Emits a span per timer through OpenTelemetry (an optional dependency).
+    Spans started inside another become its children.
+    """
+
+    def __init__(self, tracer=None):
+        from opentelemetry import trace
+
+        self._trace = trace
+        self.tracer = tracer or trace.get_tracer("nimem")
+
+    def start_span(self, name, labels):
+        span = self.tracer.start_span(
+            f"nimem.{name}", attributes={f"nimem.{k}": str(v) for k, v in labels.items()}
+        )
+        activation = self._trace.use_span(span, end_on_exit=True)
+        activation.__enter__()
+        return activation
+
+    def observe(self, name, seconds, labels, span=None):
+        if span is not None:
+            span.__exit__(None, None, None)
+
+
+_sinks: Tuple[Sink, ...] = ()
+
+
+def configure(*sinks: Sink) -> None:
+    """Sends measurements to ``sinks``; with none, instrumentation is off."""
+    global _sinks
+    _sinks = tuple(sinks)
+
+
+def reset() -> None:
+    configure()
+
+
+def enabled() -> bool:
+    return bool(_sinks)
+
+
+class _Timer:
+    __slots__ = ("name", "labels", "sinks", "spans", "start")
+
+    def __init__(self, name: str, labels: Dict[str, str]):
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self) -> "_Timer":
+        self.sinks = _sinks
+        self.spans = [sink.start_span(self.name, self.labels) for sink in self.sinks]
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        seconds = time.perf_counter() - self.start
+        for sink, span in zip(reversed(self.sinks), reversed(self.spans)):
+            try:
+                sink.observe(self.name, seconds, self.labels, span)
+            except Exception as e:
+                logger.debug(f"Metrics sink {sink!r} failed: {e}")
+
+
+class _NoopTimer:
+    __slots__ = ()
+
+    def __enter__(self) -> "_NoopTimer":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        pass
+
+
+_NOOP = _NoopTimer()
+
+
+def timer(name: str, **labels: str):
+    """Context manager timing its block as ``name``."""
+    if not _sinks:
+        return _NOOP
+    return _Timer(name, labels)
+
+
+def count(name: str, value: float = 1, **labels: str) -> None:
+    """Adds ``value`` to the counter ``name``."""
+    if not _sinks or not value:
+        return
+    for sink in _sinks:
+        try:
+            sink.increment(name, value, labels)
+        except Exception as e:
+            logger.debug(f"Metrics sink {sink!r} failed: {e}")
@@ -0,0 +1,185 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Iterable, List, Set, Tuple
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_ENTRIES = 4096
+DEFAULT_TTL = 300.0
+# Subjects whose last write time is remembered per cache.
+WRITE_HISTORY = 4096
+
+Facts = List[Dict[str, Any]]
+
+
+class RecallCache:
+    """
+    In-process LRU/TTL cache of fact lists, keyed by (graph, subject, at_time).
+
+    Every write drops the cached entries of the subjects it touches (or of a
+    whole graph) and stamps those subjects with the graph's write clock.
+    Readers take the clock *before* querying, and a result is only cached if
+    its subject has not been written since, so a racing write cannot leave a
+    stale copy behind while writes to other subjects do not get in the way.
+
+    Only the latest ``WRITE_HISTORY`` stamps are kept; a subject whose stamp
+    was dropped counts as written at the newest dropped stamp, which only
+    turns away reads older than that. The TTL only bounds staleness from
+    writers in other processes.
+    """
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        ttl: float | None = DEFAULT_TTL,
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: OrderedDict = OrderedDict()
+        # (graph, subject) -> at_time values cached for it
+        self._subject_times: Dict[Tuple[Hashable, str], Set[float | None]] = {}
+        self._clocks: Dict[Hashable, int] = {}
+        # (graph, subject) -> clock of its last write, oldest first
+        self._written: OrderedDict = OrderedDict()
+        self._forgotten: Dict[Hashable, int] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @classmethod
+    def get_instance(cls) -> "RecallCache":
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = cls()
+        return cls._instance
+
+    @classmethod
+    def configure(
+        cls, max_entries: int = DEFAULT_MAX_ENTRIES, ttl: float | None = DEFAULT_TTL
+    ) -> "RecallCache":
+        """Replaces the shared cache; ``max_entries=0`` disables caching."""
+        with cls._instance_lock:
+            cls._instance = cls(max_entries=max_entries, ttl=ttl)
+        return cls._instance
+
+    @classmethod
+    def reset(cls):
+        cls._instance = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def version(self, graph: Hashable) -> int:
+        """Write clock of ``graph``; take it before a read and pass it to put."""
+        return self._clocks.get(graph, 0)
+
+    def _last_write(self, graph: Hashable, subject: str) -> int:
+        return self._written.get((graph, subject), self._forgotten.get(graph, 0))
+
+    def _tick(self, graph: Hashable) -> int:
+        clock = self._clocks[graph] = self._clocks.get(graph, 0) + 1
+        return clock
+
+    def _drop(self, key: Tuple[Hashable, str, float | None]) -> None:
+        del self._entries[key]
+        graph, subject, at_time = key
+        times = self._subject_times[(graph, subject)]
+        times.discard(at_time)
+        if not times:
+            del self._subject_times[(graph, subject)]
+
+    def get(self, graph: Hashable, subject: str, at_time: float | None) -> Facts | None:
+        if not self.enabled:
+            return None
+        key = (graph, subject, at_time)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, facts = entry
+                if expires_at is None or expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    metrics.count("cache_hits", cache="recall")
+                    return [dict(fact) for fact in facts]
+                self._drop(key)
+            self.misses += 1
+        metrics.count("cache_misses", cache="recall")
+        return None
+
+    def put(
+        self,
+        graph: Hashable,
+        subject: str,
+        at_time: float | None,
+        version: int,
+        facts: Facts,
+    ) -> None:
+        """Caches facts read at ``version``, unless the subject was written since."""
+        if not self.enabled:
+            return
+        expires_at = None if self.ttl is None else time.monotonic() + self.ttl
+        with self._lock:
+            if self._last_write(graph, subject) > version:
+                return
+            key = (graph, subject, at_time)
+            self._entries[key] = (expires_at, [dict(fact) for fact in facts])
+            self._entries.move_to_end(key)
+            self._subject_times.setdefault((graph, subject), set()).add(at_time)
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+
+    def invalidate(self, graph: Hashable, subjects: Iterable[str]) -> None:
+        """Outdates cached facts of ``subjects``; call after writing to them."""
+        if not self.enabled:
+            return
+        with self._lock:
+            clock = self._tick(graph)
+            for subject in set(subjects):
+                for at_time in list(self._subject_times.get((graph, subject), ())):
+                    self._drop((graph, subject, at_time))
+                self._written[(graph, subject)] = clock
+                self._written.move_to_end((graph, subject))
+            while len(self._written) > WRITE_HISTORY:
+                (old_graph, _), stamp = self._written.popitem(last=False)
+                self._forgotten[old_graph] = max(self._forgotten.get(old_graph, 0), stamp)
+
+    def invalidate_graph(self, graph: Hashable) -> None:
+        """Outdates every cached entry of a graph."""
+        if not self.enabled:
+            return
+        with self._lock:
+            # Every subject of the graph now counts as written at this clock.
+            self._forgotten[graph] = self._tick(graph)
+            for key in [key for key in self._written if key[0] == graph]:
+                del self._written[key]
+            for key in [key for key in self._entries if key[0] == graph]:
+                self._drop(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._subject_times.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
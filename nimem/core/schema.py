@@ -1,4 +1,26 @@
 SPACY_MODEL = "en_core_web_md"
+EMBEDDING_MODEL = "michaelfeil/bge-small-en-v1.5"
+GLINER_MODEL = "fastino/gliner2-multi-v1"
+
+# Inference backends. The embedder runs on Infinity's "torch" or "optimum"
+# (ONNX Runtime) engine; dtype "int8" quantises it. "quantize" converts
+# GLiNER2's linear layers to dynamic int8. Check accuracy on your own data
+# with embeddings.check_embedding_parity / text_processing.check_gliner_parity.
+EMBEDDING_BACKEND = {"engine": "torch", "dtype": "auto"}
+GLINER_BACKEND = {"quantize": False}
+
+# Batched GLiNER2 extraction runs over windows of whole sentences of at most
+# this many characters, so one long text does not pad a whole batch.
+GLINER_WINDOW_CHARS = 1000
+
+# Batched coreference resolution. Texts are packed into model calls of at most
+# "max_tokens_in_batch" words; texts longer than "max_text_tokens" words are
+# resolved in windows that repeat the previous "overlap_sentences" as context.
+COREF = {
+    "max_tokens_in_batch": 10000,
+    "max_text_tokens": 2000,
+    "overlap_sentences": 2,
+}
 
 SPACY_LABEL_MAP = {
     "PERSON": "person",
@@ -96,3 +118,19 @@ CARDINALITY = {
     "created": "MANY",
     "worked_with": "MANY",
 }
+
+# Trailing words dropped when normalising entity names, so that "Apple Inc."
+# and "apple" resolve to the same node.
+CORPORATE_SUFFIXES = {
+    "inc", "incorporated", "corp", "corporation", "co", "company",
+    "ltd", "limited", "llc", "plc", "gmbh", "ag", "sa", "llp", "lp",
+}
+
+# Embedding-similarity matching of new entity names against indexed ones.
+# Both scores must pass for a name to be folded into an existing entity.
+ENTITY_RESOLUTION = {
+    "use_embeddings": False,
+    "similarity_threshold": 0.9,
+    "min_string_similarity": 0.6,
+    "candidates": 3,
+}
@@ -1,18 +1,35 @@
 import logging
 import re
-from typing import List, Tuple, NamedTuple, Set
+import sqlite3
+import time
+from bisect import bisect_right
+from typing import Callable, Iterable, Iterator, List, Tuple, NamedTuple, Set
 from functools import lru_cache
+from itertools import batched
 
 import spacy
-from returns.result import Result, safe
+from returns.result import Result, Success, safe
+
+from . import metrics
+from .extraction_cache import ExtractionCache, config_fingerprint
 
 from .schema import (
-    SPACY_MODEL, SPACY_LABEL_MAP, ENTITY_RELATION_MAP,
-    RELATIONS, VERB_TO_RELATION, WITH_PREPOSITIONS,
+    SPACY_MODEL, GLINER_MODEL, GLINER_BACKEND, GLINER_WINDOW_CHARS, COREF,
+    SPACY_LABEL_MAP, ENTITY_RELATION_MAP, RELATIONS, VERB_TO_RELATION, WITH_PREPOSITIONS,
 )
 
 logger = logging.getLogger(__name__)
 
+# Sentence ends and paragraph breaks; used to window streamed text before any
+# model has seen it.
+_BOUNDARY = re.compile(r"(?<=[.!?])\s+|\n\s*\n")
+
+# Pronouns replaced by "<antecedent>'s" rather than the bare antecedent.
+_POSSESSIVES = {"his", "its", "their", "theirs"}
+
+# Built once rather than per GLiNER2 call.
+_RELATION_LABELS = list(RELATIONS.keys())
+
 
 class Triple(NamedTuple):
     subject: str
@@ -33,12 +50,28 @@ def get_spacy_model():
         return spacy.load(SPACY_MODEL)
 
 
-@lru_cache(maxsize=1)
-def get_gliner_model():
+def _quantize_dynamic(model):
+    """Converts the model's linear layers to dynamic int8 for CPU inference."""
+    import torch
+
+    return torch.ao.quantization.quantize_dynamic(
+        model, {torch.nn.Linear}, dtype=torch.qint8
+    )
+
+
+def _load_gliner_model(quantize: bool):
     from gliner2 import GLiNER2
 
-    logger.info("Loading GLiNER model: fastino/gliner2-multi-v1")
-    return GLiNER2.from_pretrained("fastino/gliner2-multi-v1")
+    logger.info(f"Loading GLiNER model: {GLINER_MODEL} (int8: {quantize})")
+    model = GLiNER2.from_pretrained(GLINER_MODEL)
+    if quantize:
+        model = _quantize_dynamic(model)
+    return model
+
+
+@lru_cache(maxsize=1)
+def get_gliner_model():
+    return _load_gliner_model(GLINER_BACKEND["quantize"])
 
 
 @lru_cache(maxsize=1)
@@ -54,23 +87,12 @@ def _infer_relation(entity1_label: str, entity2_label: str) -> str | None:
     return ENTITY_RELATION_MAP.get(key)
 
 
-def _extract_relations_from_entities(text: str, entities: List[dict]) -> List[Triple]:
+def _extract_relations_from_entities(doc, entities: List[dict]) -> List[Triple]:
     triplets = []
-    sentences = re.split(r"[.!?]+", text)
-    sentence_starts = [0]
-    pos = 0
-    for sent in sentences[:-1]:
-        pos += len(sent) + 1
-        sentence_starts.append(pos)
+    sentence_starts = [sent.start_char for sent in doc.sents]
 
     def get_sentence_idx(entity_start: int) -> int:
-        for i, start in enumerate(sentence_starts):
-            if i + 1 < len(sentence_starts):
-                if sentence_starts[i] <= entity_start < sentence_starts[i + 1]:
-                    return i
-            else:
-                return i
-        return len(sentence_starts) - 1
+        return max(bisect_right(sentence_starts, entity_start) - 1, 0)
 
     sentence_entities: dict[int, List[dict]] = {}
     for entity in entities:
@@ -106,10 +128,9 @@ def _get_noun_phrase(token) -> str:
     return " ".join(parts)
 
 
-def _extract_verb_relations(text: str, known_entities: Set[str]) -> List[Triple]:
-    nlp = get_spacy_model()
-    doc = nlp(text)
+def _extract_verb_relations(doc, known_entities: Set[str]) -> List[Triple]:
     triplets = []
+    entity_at = {i: ent for ent in doc.ents for i in range(ent.start, ent.end)}
 
     for token in doc:
         if token.pos_ != "VERB":
@@ -142,38 +163,24 @@ def _extract_verb_relations(text: str, known_entities: Set[str]) -> List[Triple]
 
         for subj in subjects:
             subj_text = subj.text
-            if subj_text not in known_entities:
-                subj_ent = None
-                for ent in doc.ents:
-                    if subj.i >= ent.start and subj.i < ent.end:
-                        subj_ent = ent
-                        break
-                if not subj_ent:
-                    continue
+            if subj_text not in known_entities and subj.i not in entity_at:
+                continue
 
             for obj in all_objects:
                 obj_text = obj.text
                 if obj_text in known_entities:
                     triplets.append(Triple(subj_text, relation, obj_text))
                 else:
-                    obj_ent = None
-                    for ent in doc.ents:
-                        if obj.i >= ent.start and obj.i < ent.end:
-                            obj_ent = ent
-                            obj_text = ent.text
-                            break
-
-                    if obj_ent:
-                        triplets.append(Triple(subj_text, relation, obj_text))
+                    obj_ent = entity_at.get(obj.i)
+                    if obj_ent is not None:
+                        triplets.append(Triple(subj_text, relation, obj_ent.text))
                     else:
                         descriptive_name = f"{subj_text}'s {obj.text}"
                         triplets.append(Triple(subj_text, relation, descriptive_name))
 
             for with_obj in with_objects:
                 with_text = with_obj.text
-                if with_text in known_entities or any(
-                    with_obj.i >= ent.start and with_obj.i < ent.end for ent in doc.ents
-                ):
+                if with_text in known_entities or with_obj.i in entity_at:
                     triplets.append(Triple(subj_text, "worked_with", with_text))
                     for obj in all_objects:
                         if obj.text in known_entities:
@@ -182,11 +189,7 @@ def _extract_verb_relations(text: str, known_entities: Set[str]) -> List[Triple]
     return triplets
 
 
-def _extract_gliner2_relations(text: str) -> List[Triple]:
-    model = get_gliner_model()
-    relation_labels = list(RELATIONS.keys())
-    result = model.extract_relations(text, relation_labels)
-
+def _gliner2_result_to_triplets(result: dict) -> List[Triple]:
     triplets = []
     extractions = result.get("relation_extraction", {})
     for relation, pairs in extractions.items():
@@ -204,15 +207,85 @@ def _extract_gliner2_relations(text: str) -> List[Triple]:
     return triplets
 
 
+def _extract_gliner2_relations(text: str) -> List[Triple]:
+    model = get_gliner_model()
+    with metrics.timer("stage", stage="gliner2"):
+        result = model.extract_relations(text, _RELATION_LABELS)
+    return _gliner2_result_to_triplets(result)
+
+
+def _gliner2_windows(texts: List[str], window_chars: int) -> List[Tuple[int, str]]:
+    """Splits texts into sentence windows, each tagged with its text's index."""
+    return [
+        (idx, " ".join(window))
+        for idx, text in enumerate(texts)
+        for window in iter_windows([text], max_chars=window_chars)
+    ]
+
+
+def _extract_gliner2_relations_batch(
+    texts: List[str], batch_size: int, window_chars: int = GLINER_WINDOW_CHARS
+) -> List[List[Triple]]:
+    """
+    Runs GLiNER2 over sentence windows of all texts, batched by length.
+
+    Windows are sorted by word count before batching so each batch pads to
+    similar lengths; their triplets are merged back per source text.
+    """
+    model = get_gliner_model()
+    windows = _gliner2_windows(texts, window_chars)
+    order = sorted(range(len(windows)), key=lambda i: len(windows[i][1].split()))
+
+    found: List[List[Tuple[int, Triple]]] = [[] for _ in texts]
+    for bucket in batched(order, batch_size):
+        with metrics.timer("stage", stage="gliner2"):
+            results = model.batch_extract_relations(
+                [windows[i][1] for i in bucket], _RELATION_LABELS, batch_size=batch_size
+            )
+        for i, result in zip(bucket, results):
+            found[windows[i][0]].extend(
+                (i, triple) for triple in _gliner2_result_to_triplets(result)
+            )
+
+    # Back into window order, keeping each triple once per text.
+    return [
+        list(dict.fromkeys(triple for _, triple in sorted(pairs, key=lambda p: p[0])))
+        for pairs in found
+    ]
+
+
 @safe
-def extract_triplets(text: str, use_gliner2: bool = False) -> List[Triple]:
-    if use_gliner2:
-        triplets = _extract_gliner2_relations(text)
-        logger.debug(f"GLiNER2 triplets: {triplets}")
-        return triplets
+def check_gliner_parity(texts: List[str], batch_size: int = 8) -> dict:
+    """
+    Runs GLiNER2 at full precision and quantised over texts.
+
+    ``agreement`` is the mean Jaccard overlap of the triplets each model
+    extracts per text; timings exclude model loading.
+    """
+    outputs = {}
+    timings = {}
+    for role, quantize in (("reference", False), ("candidate", True)):
+        model = _load_gliner_model(quantize)
+        start = time.perf_counter()
+        results = model.batch_extract_relations(
+            texts, _RELATION_LABELS, batch_size=batch_size
+        )
+        timings[role] = time.perf_counter() - start
+        outputs[role] = [set(_gliner2_result_to_triplets(r)) for r in results]
+
+    overlaps = [
+        len(ref & cand) / len(ref | cand) if ref | cand else 1.0
+        for ref, cand in zip(outputs["reference"], outputs["candidate"])
+    ]
+    return {
+        "agreement": sum(overlaps) / len(overlaps) if overlaps else 1.0,
+        "reference_seconds": timings["reference"],
+        "candidate_seconds": timings["candidate"],
+        "speedup": timings["reference"] / max(timings["candidate"], 1e-9),
+    }
 
-    nlp = get_spacy_model()
-    doc = nlp(text)
+
+def _triplets_from_doc(doc) -> List[Triple]:
     entities = [
         {
             "text": ent.text,
@@ -225,8 +298,10 @@ def extract_triplets(text: str, use_gliner2: bool = False) -> List[Triple]:
     logger.debug(f"Extracted entities: {entities}")
 
     known_entities = {e["text"] for e in entities}
-    triplets_heuristic = _extract_relations_from_entities(text, entities)
-    triplets_verb = _extract_verb_relations(text, known_entities)
+    with metrics.timer("stage", stage="entity_relations"):
+        triplets_heuristic = _extract_relations_from_entities(doc, entities)
+    with metrics.timer("stage", stage="verb_relations"):
+        triplets_verb = _extract_verb_relations(doc, known_entities)
 
     seen = set()
     combined = []
@@ -241,14 +316,276 @@ def extract_triplets(text: str, use_gliner2: bool = False) -> List[Triple]:
 
 
 @safe
-def resolve_coreferences(text: str) -> str:
-    model = get_fastcoref_model()
-    preds = model.predict(texts=[text])
-    return preds[0].get_resolved_text()
+def extract_triplets(text: str, use_gliner2: bool = False) -> List[Triple]:
+    if use_gliner2:
+        triplets = _extract_gliner2_relations(text)
+        logger.debug(f"GLiNER2 triplets: {triplets}")
+    else:
+        nlp = get_spacy_model()
+        with metrics.timer("stage", stage="spacy_parse"):
+            doc = nlp(text)
+        triplets = _triplets_from_doc(doc)
+    metrics.count("triples_extracted", len(triplets))
+    return triplets
 
 
-def process_text_pipeline(
-    text: str, use_coref: bool = False, use_gliner2: bool = False
+@safe
+def extract_triplets_batch(
+    texts: List[str],
+    use_gliner2: bool = False,
+    batch_size: int = 32,
+    n_process: int = 1,
+) -> List[List[Triple]]:
+    """Extracts triplets for many texts, batching model inference."""
+    if use_gliner2:
+        batches = _extract_gliner2_relations_batch(texts, batch_size)
+    else:
+        nlp = get_spacy_model()
+        if metrics.enabled():
+            # Parse eagerly so parsing is timed apart from relation extraction.
+            with metrics.timer("stage", stage="spacy_parse"):
+                docs = list(nlp.pipe(texts, batch_size=batch_size, n_process=n_process))
+        else:
+            docs = nlp.pipe(texts, batch_size=batch_size, n_process=n_process)
+        batches = [_triplets_from_doc(doc) for doc in docs]
+    metrics.count("triples_extracted", sum(len(triplets) for triplets in batches))
+    return batches
+
+
+def split_sentences(text: str) -> List[str]:
+    return [s.strip() for s in _BOUNDARY.split(text) if s.strip()]
+
+
+def _cut(text: str, max_chars: int) -> Iterator[str]:
+    """Cuts a boundary-free run of text into pieces of at most max_chars."""
+    while len(text) > max_chars:
+        cut = text.rfind(" ", 0, max_chars)
+        if cut <= 0:
+            cut = max_chars
+        yield text[:cut]
+        text = text[cut:].lstrip()
+    yield text
+
+
+def iter_windows(chunks: Iterable[str], max_chars: int = 2000) -> Iterator[List[str]]:
+    """
+    Groups streamed text into windows of whole sentences.
+
+    ``chunks`` may be any iterable of strings (a list of pages, an open file).
+    At most one window and one partial sentence are held at a time; text with
+    no boundary for ``max_chars`` characters is cut at the last space.
+    """
+    buffer = ""
+    window: List[str] = []
+    size = 0
+
+    def emit(sentences: Iterable[str]) -> Iterator[List[str]]:
+        nonlocal window, size
+        for sentence in sentences:
+            for piece in _cut(sentence.strip(), max_chars):
+                if not piece:
+                    continue
+                if window and size + len(piece) > max_chars:
+                    yield window
+                    window, size = [], 0
+                window.append(piece)
+                size += len(piece) + 1
+
+    for chunk in chunks:
+        parts = _BOUNDARY.split(buffer + chunk)
+        buffer = parts.pop()
+        if len(buffer) > max_chars:
+            *whole, buffer = _cut(buffer, max_chars)
+            parts.extend(whole)
+        yield from emit(parts)
+
+    yield from emit([buffer])
+    if window:
+        yield window
+
+
+def _token_count(text: str) -> int:
+    return len(text.split())
+
+
+def _resolve_clusters(text: str, clusters, start: int = 0) -> str:
+    """
+    Rewrites ``text[start:]``, replacing each later mention in a cluster of
+    (start_char, end_char) spans with the cluster's first mention. Mentions
+    before ``start`` only serve as antecedents.
+    """
+    replacements = []
+    for cluster in clusters:
+        spans = sorted(tuple(span) for span in cluster)
+        head = text[spans[0][0] : spans[0][1]]
+        for mention_start, mention_end in spans[1:]:
+            if mention_start < start:
+                continue
+            mention = text[mention_start:mention_end]
+            if mention.lower() in _POSSESSIVES:
+                replacement = f"{head}'s"
+            else:
+                replacement = head
+            replacements.append((mention_start, mention_end, replacement))
+
+    pieces = []
+    cursor = start
+    for mention_start, mention_end, replacement in sorted(replacements):
+        if mention_start < cursor:
+            continue  # nested in a mention already replaced
+        pieces.append(text[cursor:mention_start])
+        pieces.append(replacement)
+        cursor = mention_end
+    pieces.append(text[cursor:])
+    return "".join(pieces)
+
+
+def _coref_windows(text: str, max_tokens: int, overlap: int) -> List[Tuple[str, int]]:
+    """
+    Splits a long text into windows of whole sentences, each starting with
+    the previous ``overlap`` sentences as context.
+
+    Returns (window text, offset where the window's own sentences begin).
+    """
+    windows = []
+    context: List[str] = []
+    own: List[str] = []
+    size = 0
+
+    def close():
+        prefix = " ".join(context)
+        windows.append((" ".join(context + own), len(prefix) + 1 if prefix else 0))
+
+    for sentence in split_sentences(text):
+        tokens = _token_count(sentence)
+        if own and size + tokens > max_tokens:
+            close()
+            context = (context + own)[-overlap:] if overlap else []
+            own = []
+            size = sum(_token_count(s) for s in context)
+        own.append(sentence)
+        size += tokens
+    if own:
+        close()
+    return windows
+
+
+def _pack_batches(order: List[int], sizes: List[int], budget: int) -> Iterator[List[int]]:
+    """Greedily groups items (already sorted by size) under a token budget."""
+    batch: List[int] = []
+    total = 0
+    for i in order:
+        if batch and total + sizes[i] > budget:
+            yield batch
+            batch, total = [], 0
+        batch.append(i)
+        total += sizes[i]
+    if batch:
+        yield batch
+
+
+@safe
+def resolve_coreferences_batch(
+    texts: Iterable[str],
+    max_tokens_in_batch: int = COREF["max_tokens_in_batch"],
+    max_text_tokens: int = COREF["max_text_tokens"],
+    overlap: int = COREF["overlap_sentences"],
+) -> List[str]:
+    """
+    Resolves coreferences in many texts with as few model calls as possible.
+
+    Texts over ``max_text_tokens`` words are split into overlapping sentence
+    windows. All texts and windows are sorted by length and packed into
+    model calls of at most ``max_tokens_in_batch`` words. Resolved texts are
+    returned in input order.
+    """
+    texts = list(texts)
+    # (index of the source text, text sent to the model, start of its own part)
+    units: List[Tuple[int, str, int]] = []
+    for idx, text in enumerate(texts):
+        if _token_count(text) <= max_text_tokens:
+            units.append((idx, text, 0))
+        else:
+            units.extend(
+                (idx, window, start)
+                for window, start in _coref_windows(text, max_text_tokens, overlap)
+            )
+
+    sizes = [_token_count(text) for _, text, _ in units]
+    resolved = [text[start:] for _, text, start in units]
+    pending = sorted((i for i in range(len(units)) if sizes[i]), key=sizes.__getitem__)
+    if pending:
+        model = get_fastcoref_model()
+        for batch in _pack_batches(pending, sizes, max_tokens_in_batch):
+            with metrics.timer("stage", stage="coref"):
+                preds = model.predict(
+                    texts=[units[i][1] for i in batch],
+                    max_tokens_in_batch=max_tokens_in_batch,
+                )
+            for i, pred in zip(batch, preds):
+                _, text, start = units[i]
+                resolved[i] = _resolve_clusters(
+                    text, pred.get_clusters(as_strings=False), start
+                )
+
+    parts: List[List[str]] = [[] for _ in texts]
+    for (idx, _, _), text in zip(units, resolved):
+        parts[idx].append(text)
+    return [" ".join(pieces) for pieces in parts]
+
+
+def resolve_coreferences(text: str) -> Result[str, Exception]:
+    return resolve_coreferences_batch([text]).map(lambda resolved: resolved[0])
+
+
+Extracted = List[Tuple[str, List[Triple]]]
+
+
+def _with_cache(
+    texts: List[str],
+    use_coref: bool,
+    use_gliner2: bool,
+    run: Callable[[List[str]], Result[Extracted, Exception]],
+) -> Result[Extracted, Exception]:
+    """Serves texts from the extraction cache, if configured, running only misses."""
+    cache = ExtractionCache.current()
+    if cache is None:
+        return run(texts)
+
+    fingerprint = config_fingerprint(use_coref, use_gliner2)
+    keys = [cache.key(text, fingerprint) for text in texts]
+    try:
+        found = cache.get_many(keys)
+    except sqlite3.Error as e:
+        logger.warning(f"Extraction cache lookup failed: {e}")
+        return run(texts)
+    missing = {key: text for key, text in zip(keys, texts) if key not in found}
+    logger.debug(
+        f"Extraction cache: {len(texts) - len(missing)} hits, {len(missing)} misses"
+    )
+
+    def merge(computed: Extracted) -> Extracted:
+        computed_by_key = dict(zip(missing, computed))
+        try:
+            cache.put_many(
+                (key, resolved, triplets)
+                for key, (resolved, triplets) in computed_by_key.items()
+            )
+        except sqlite3.Error as e:
+            logger.warning(f"Extraction cache write failed: {e}")
+        found.update(computed_by_key)
+        return [
+            (found[key][0], [Triple(*triple) for triple in found[key][1]])
+            for key in keys
+        ]
+
+    if not missing:
+        return Success(merge([]))
+    return run(list(missing.values())).map(merge)
+
+
+def _process_text(
+    text: str, use_coref: bool, use_gliner2: bool
 ) -> Result[Tuple[str, List[Triple]], Exception]:
     if use_coref:
         return resolve_coreferences(text).bind(
@@ -260,3 +597,44 @@ def process_text_pipeline(
         return extract_triplets(text, use_gliner2=use_gliner2).map(
             lambda triplets: (text, triplets)
         )
+
+
+def process_text_pipeline(
+    text: str, use_coref: bool = False, use_gliner2: bool = False
+) -> Result[Tuple[str, List[Triple]], Exception]:
+    return _with_cache(
+        [text],
+        use_coref,
+        use_gliner2,
+        lambda texts: _process_text(texts[0], use_coref, use_gliner2).map(
+            lambda result: [result]
+        ),
+    ).map(lambda results: results[0])
+
+
+def process_texts_pipeline(
+    texts: Iterable[str],
+    use_coref: bool = False,
+    use_gliner2: bool = False,
+    batch_size: int = 32,
+    n_process: int = 1,
+) -> Result[List[Tuple[str, List[Triple]]], Exception]:
+    """
+    Batched counterpart of process_text_pipeline, one entry per input text.
+    Texts already in the extraction cache skip the models.
+    """
+
+    def extract(resolved: List[str]):
+        return extract_triplets_batch(
+            resolved,
+            use_gliner2=use_gliner2,
+            batch_size=batch_size,
+            n_process=n_process,
+        ).map(lambda batch: list(zip(resolved, batch)))
+
+    def run(pending: List[str]):
+        if use_coref:
+            return resolve_coreferences_batch(pending).bind(extract)
+        return extract(pending)
+
+    return _with_cache(list(texts), use_coref, use_gliner2, run)
@@ -1,5 +1,6 @@
 import logging
-from typing import Dict, List
+from itertools import batched
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Sequence, Tuple
 
 from returns.result import Result, Success, Failure
 
@@ -7,11 +8,117 @@ from .core import text_processing
 from .core import embeddings
 from .core import graph_store
 from .core import clustering
-from .core.schema import CARDINALITY
+from .core import metrics
+from .core.entity_resolution import match_similar
+from .core.schema import ENTITY_RESOLUTION
+from .core.text_processing import Triple
 
 logger = logging.getLogger(__name__)
 
 
+class StreamProgress(NamedTuple):
+    window: int
+    chars: int
+    facts: int
+    result: Result[str, Exception]
+
+
+def _batch_summaries(
+    batches: List[List[Triple]], res: Result[List[bool], Exception]
+) -> List[Tuple[int, List[str]]]:
+    """Splits an add_facts result back into (stored count, errors) per text."""
+    if isinstance(res, Failure):
+        error = str(res.failure())
+        return [(0, [error] * len(triplets)) for triplets in batches]
+
+    stored = res.unwrap()
+    summaries = []
+    offset = 0
+    for triplets in batches:
+        flags = stored[offset : offset + len(triplets)]
+        offset += len(triplets)
+        errors = [
+            f"Failed to store {tri.subject} -[{tri.relation}]-> {tri.object}"
+            for tri, ok in zip(triplets, flags)
+            if not ok
+        ]
+        summaries.append((sum(flags), errors))
+    return summaries
+
+
+def _similar_entity_aliases(triples: List[Triple]) -> Dict[str, str]:
+    """
+    Maps names with no exact key match to an existing entity whose embedding
+    and spelling are both close, when ENTITY_RESOLUTION["use_embeddings"] is on.
+    """
+    if not ENTITY_RESOLUTION["use_embeddings"] or not triples:
+        return {}
+    names = list(dict.fromkeys(n for tri in triples for n in (tri.subject, tri.object)))
+
+    def match(known: Dict[str, str]) -> Result[Dict[str, str], Exception]:
+        new = [name for name in names if name not in known]
+        if not new:
+            return Success({})
+        return (
+            embeddings.embed_texts_cached(new)
+            .bind(
+                lambda vectors: graph_store.nearest_entities(
+                    vectors, k=ENTITY_RESOLUTION["candidates"]
+                )
+            )
+            .map(
+                lambda candidates: match_similar(
+                    new,
+                    candidates,
+                    ENTITY_RESOLUTION["similarity_threshold"],
+                    ENTITY_RESOLUTION["min_string_similarity"],
+                )
+            )
+        )
+
+    match_res = graph_store.resolve_entities(names).bind(match)
+    if isinstance(match_res, Failure):
+        logger.warning(f"Embedding entity resolution skipped: {match_res.failure()}")
+        return {}
+    return match_res.unwrap()
+
+
+def _store_batch(batches: List[List[Triple]]) -> List[Tuple[int, List[str]]]:
+    """
+    Writes the triplets of several texts with a single bulk graph write.
+    Facts already in the graph are refreshed rather than duplicated, and
+    entity names are canonicalised on the way in.
+
+    Returns (stored count, error messages) for each text.
+    """
+    flat = [tri for triplets in batches for tri in triplets]
+    for tri in flat:
+        logger.info(f"Adding: {tri.subject} -[{tri.relation}]-> {tri.object}")
+
+    aliases = _similar_entity_aliases(flat)
+    with metrics.timer("stage", stage="graph_write"):
+        stored = graph_store.add_facts(flat, upsert=True, aliases=aliases)
+    metrics.count("triples_written", sum(stored.value_or([])))
+    return _batch_summaries(batches, stored)
+
+
+def _store_triplets(triplets: List[Triple]) -> Tuple[int, List[str]]:
+    """Writes triplets to the graph, returning (stored count, error messages)."""
+    return _store_batch([triplets])[0]
+
+
+def _ingest_summary(
+    resolved_text: str, count: int, errors: List[str]
+) -> Result[str, Exception]:
+    if errors and count == 0:
+        return Failure(RuntimeError(f"All {len(errors)} facts failed: {errors}"))
+
+    if errors:
+        logger.warning(f"Some facts failed to store: {errors}")
+
+    return Success(f"Ingested {count} facts. (Resolved text: {resolved_text[:50]}...)")
+
+
 def ingest_text(text: str, use_coref: bool = False) -> Result[str, Exception]:
     """
     Ingest text by extracting triplets and storing them in the graph.
@@ -27,74 +134,311 @@ def ingest_text(text: str, use_coref: bool = False) -> Result[str, Exception]:
         logger.info(f"Resolved Text: {resolved_text}")
         logger.info(f"Found Triplets: {len(triplets)}")
 
-        count = 0
-        errors = []
-        for tri in triplets:
-            logger.info(f"Adding: {tri.subject} -[{tri.relation}]-> {tri.object}")
+        count, errors = _store_triplets(triplets)
+        return _ingest_summary(resolved_text, count, errors)
 
-            cardinality = CARDINALITY.get(tri.relation, "MANY")
-            if cardinality == "ONE":
-                logger.info(f"Relation '{tri.relation}' is 1-to-1. Expiring old facts.")
-                res_expire = graph_store.expire_facts(tri.subject, tri.relation)
-                if isinstance(res_expire, Failure):
-                    logger.warning(f"Failed to expire facts: {res_expire}")
+    return processed.bind(store_triplets)
 
-            res = graph_store.add_fact(tri.subject, tri.relation, tri.object)
-            if isinstance(res, Success):
-                count += 1
-            else:
-                errors.append(str(res.failure()))
 
-        if errors and count == 0:
-            return Failure(RuntimeError(f"All {len(errors)} facts failed: {errors}"))
+def ingest_texts(
+    texts: Iterable[str],
+    batch_size: int = 32,
+    n_process: int = 1,
+    use_coref: bool = False,
+    use_gliner2: bool = False,
+) -> List[Result[str, Exception]]:
+    """
+    Ingest many texts, batching model inference and graph writes.
 
-        if errors:
-            logger.warning(f"Some facts failed to store: {errors}")
+    Texts are consumed lazily in batches of ``batch_size``: each batch goes
+    through coreference resolution and extraction as a single model call
+    (``nlp.pipe`` / ``batch_extract_relations`` / ``FCoref.predict``), then all
+    of its triplets are written with one bulk graph write before the next batch
+    is read.
 
-        return Success(
-            f"Ingested {count} facts. (Resolved text: {resolved_text[:50]}...)"
+    Args:
+        texts: Iterable of input texts
+        batch_size: Number of texts per inference and write batch
+        n_process: Number of spaCy worker processes for the heuristic path
+        use_coref: If True, resolve coreferences before extraction
+        use_gliner2: If True, use GLiNER2 relation extraction
+
+    Returns:
+        One Result per input text, in input order.
+    """
+    results: List[Result[str, Exception]] = []
+    for batch in batched(texts, batch_size):
+        processed = text_processing.process_texts_pipeline(
+            batch,
+            use_coref=use_coref,
+            use_gliner2=use_gliner2,
+            batch_size=batch_size,
+            n_process=n_process,
         )
+        if isinstance(processed, Failure):
+            logger.warning(f"Batch of {len(batch)} texts failed: {processed}")
+            results.extend([processed] * len(batch))
+            continue
 
-    return processed.bind(store_triplets)
+        docs = processed.unwrap()
+        stored = _store_batch([triplets for _, triplets in docs])
+        for (resolved_text, _), (count, errors) in zip(docs, stored):
+            results.append(_ingest_summary(resolved_text, count, errors))
+
+    return results
+
+
+def _triple_key(tri: Triple) -> Tuple[str, str, str]:
+    return (tri.subject.lower(), tri.relation.lower(), tri.object.lower())
+
+
+def ingest_stream(
+    source: str | Iterable[str],
+    max_chars: int = 2000,
+    overlap: int = 2,
+    use_coref: bool = False,
+    use_gliner2: bool = False,
+) -> Iterator[StreamProgress]:
+    """
+    Ingest a document of any length window by window, with bounded memory.
+
+    The source is split on sentence and paragraph boundaries into windows of
+    about ``max_chars`` characters. Each window is prefixed with the last
+    ``overlap`` sentences of the previous one, taken after coreference
+    resolution, so pronouns can still be resolved to the entities they refer
+    to. Facts already stored from the previous window are skipped, and every
+    window is written to the graph before the next one is read.
+
+    Args:
+        source: A string, or any iterable of strings such as an open file
+        max_chars: Target window size in characters
+        overlap: Number of sentences of context carried between windows
+        use_coref: If True, resolve coreferences before extraction
+        use_gliner2: If True, use GLiNER2 relation extraction
+
+    Yields:
+        StreamProgress(window index, source characters consumed, facts stored,
+        Result for the window).
+    """
+    chunks = [source] if isinstance(source, str) else source
+    context: List[str] = []
+    previous: set = set()
+    consumed = 0
+
+    windows = text_processing.iter_windows(chunks, max_chars)
+    for index, sentences in enumerate(windows):
+        consumed += sum(len(s) + 1 for s in sentences)
+        processed = text_processing.process_text_pipeline(
+            " ".join(context + sentences), use_coref=use_coref, use_gliner2=use_gliner2
+        )
+        if isinstance(processed, Failure):
+            logger.warning(f"Window {index} failed: {processed}")
+            context = sentences[-overlap:] if overlap else []
+            previous = set()
+            yield StreamProgress(index, consumed, 0, processed)
+            continue
+
+        resolved_text, triplets = processed.unwrap()
+        keys = {_triple_key(tri) for tri in triplets}
+        new = [tri for tri in triplets if _triple_key(tri) not in previous]
+        previous = keys
+
+        count, errors = _store_triplets(new) if new else (0, [])
+        if overlap:
+            context = text_processing.split_sentences(resolved_text)[-overlap:]
+        result = _ingest_summary(resolved_text, count, errors)
+        yield StreamProgress(index, consumed, count, result)
 
 
 def add_memory(subject: str, relation: str, obj: str) -> Result[bool, Exception]:
-    """Directly adds a memory fact."""
-    return graph_store.add_fact(subject, relation, obj)
+    """
+    Directly adds a memory fact, or refreshes it if already known. Earlier
+    facts are left active, even for cardinality "ONE" relations.
+    """
+    return graph_store.add_fact(subject, relation, obj, upsert=True)
+
+
+def recall_memory(
+    subject: str, at_time: float | None = None, include_archive: bool = False
+) -> Result[list, Exception]:
+    """
+    Recalls facts about a subject, optionally as they stood at ``at_time``.
+
+    Set ``include_archive`` to also search history moved out by archive_history.
+    """
+    return graph_store.query_valid_facts(
+        subject, at_time=at_time, include_archive=include_archive
+    )
 
 
-def recall_memory(subject: str) -> Result[list, Exception]:
-    """Recalls facts about a subject."""
-    return graph_store.query_valid_facts(subject)
+def recall_many(
+    subjects: Iterable[str],
+    at_time: float | None = None,
+    include_archive: bool = False,
+) -> Result[Dict[str, list], Exception]:
+    """Recalls facts about many subjects in one round trip, keyed by subject."""
+    return graph_store.query_valid_facts_many(
+        subjects, at_time=at_time, include_archive=include_archive
+    )
 
 
-def consolidate_topics() -> Result[str, Exception]:
+def recall_neighbourhood(
+    subject: str,
+    depth: int = 2,
+    limit: int = 100,
+    relations: Iterable[str] | None = None,
+    at_time: float | None = None,
+    fanout: int | Sequence[int | None] | None = None,
+) -> Result[Dict[str, List], Exception]:
+    """
+    Recalls the facts within ``depth`` hops of a subject with a single query.
+
+    Returns {"nodes": [...], "edges": [{"subject", "relation", "object", "hop"}]}.
+    See graph_store.query_neighbourhood for ``limit`` and ``fanout``.
+    """
+    return graph_store.query_neighbourhood(
+        subject,
+        depth=depth,
+        limit=limit,
+        relations=relations,
+        at_time=at_time,
+        fanout=fanout,
+    )
+
+
+def archive_history(
+    retention: float = graph_store.DEFAULT_RETENTION,
+) -> Result[int, Exception]:
+    """
+    Moves facts invalidated more than ``retention`` seconds ago to the archive
+    graph, keeping the hot graph to current facts and recent history.
+    """
+    return graph_store.archive_facts(retention=retention)
+
+
+def index_entities() -> Result[int, Exception]:
+    """
+    Stores an embedding on every entity that lacks one, so that
+    recall_similar can find it through the graph's vector index.
+    """
+
+    def embed_and_store(entities: List[str]) -> Result[int, Exception]:
+        if not entities:
+            return Success(0)
+        return embeddings.embed_texts_cached(entities).bind(
+            lambda vectors: graph_store.set_entity_embeddings(entities, vectors)
+        )
+
+    return graph_store.get_unembedded_entities().bind(embed_and_store)
+
+
+def recall_similar(
+    text: str, k: int = 5, at_time: float | None = None
+) -> Result[List[Dict], Exception]:
+    """
+    Recalls the k entities semantically closest to ``text``, with their facts.
+
+    Only entities indexed by index_entities are searched.
+    """
+    return embeddings.embed_texts([text]).bind(
+        lambda vectors: graph_store.query_similar_entities(
+            vectors[0], k=k, at_time=at_time
+        )
+    )
+
+
+def consolidate_topics(
+    incremental: bool = False,
+    model_path: str = clustering.DEFAULT_TOPIC_MODEL_PATH,
+    refit_interval: float | None = 24 * 3600,
+    drift_threshold: float = 0.2,
+    similarity_threshold: float = 0.7,
+) -> Result[str, Exception]:
     """
     Clusters entity names in the graph to find topics.
     Creates 'BELONGS_TO' edges from Entities to Topic nodes.
+
+    Entity vectors come from the on-disk embedding cache, so only entities
+    not seen by a previous run are embedded.
+
+    Args:
+        incremental: If True, keep the fitted topic centroids at ``model_path``
+            and assign only entities the model has not seen to existing topics.
+            A full re-clustering still runs when no model exists, when it is
+            older than ``refit_interval`` seconds, or when the share of entities
+            it could not place exceeds ``drift_threshold``.
+        model_path: Where the topic model is stored in incremental mode
+        refit_interval: Maximum model age in seconds (None disables the schedule)
+        drift_threshold: Share of unplaceable entities that triggers a refit
+        similarity_threshold: Minimum cosine similarity to join a topic
     """
     entities_res = graph_store.get_all_entities()
+    model = clustering.TopicModel.load(model_path) if incremental else None
 
-    def embed_and_cluster(entities: List[str]):
-        return embeddings.embed_texts(entities).bind(
-            lambda vectors: clustering.perform_clustering(vectors, entities)
+    def cluster_all(entities: List[str]) -> Result[str, Exception]:
+        def write(clusters: Dict[int, List[str]], vectors) -> str:
+            names = _topic_names(clusters)
+            if incremental:
+                clustering.TopicModel.from_clusters(
+                    clusters, names, vectors, entities
+                ).save(model_path)
+            return _process_clusters(clusters, names)
+
+        return embeddings.embed_texts_cached(entities).bind(
+            lambda vectors: clustering.perform_clustering(vectors, entities).map(
+                lambda clusters: write(clusters, vectors)
+            )
         )
 
-    return entities_res.bind(embed_and_cluster).map(_process_clusters)
+    def assign_new(entities: List[str]) -> Result[str, Exception]:
+        topics = set(model.names)
+        new = [e for e in entities if e not in model.known and e not in topics]
+        if not new:
+            return Success("No new entities to consolidate.")
+
+        def write(clusters: Dict[int, List[str]]) -> str:
+            model.save(model_path)
+            return _process_clusters(clusters, dict(enumerate(model.names)))
+
+        return (
+            embeddings.embed_texts_cached(new)
+            .bind(
+                lambda vectors: clustering.assign_to_topics(
+                    model, vectors, new, similarity_threshold
+                )
+            )
+            .map(write)
+        )
+
+    def run(entities: List[str]) -> Result[str, Exception]:
+        if model is None or model.needs_refit(refit_interval, drift_threshold):
+            return cluster_all(entities)
+        return assign_new(entities)
+
+    return entities_res.bind(run)
+
+
+def _topic_names(clusters: Dict[int, List[str]]) -> Dict[int, str]:
+    return {
+        label: clustering.generate_topic_name(items)
+        for label, items in clusters.items()
+        if label != -1
+    }
 
 
-def _process_clusters(clusters: Dict[int, List[str]]) -> str:
+def _process_clusters(clusters: Dict[int, List[str]], names: Dict[int, str]) -> str:
     count = 0
     topic_count = 0
     for label, items in clusters.items():
         if label == -1:
             continue
-        topic_name = clustering.generate_topic_name(items)
+        topic_name = names[label]
         logger.info(f"Found Cluster '{topic_name}': {items}")
         topic_count += 1
 
         for item in items:
-            res = graph_store.add_fact(item, "BELONGS_TO", topic_name)
+            # Refits reassign every entity; upsert keeps one edge per topic.
+            res = graph_store.add_fact(item, "BELONGS_TO", topic_name, upsert=True)
             if isinstance(res, Success):
                 count += 1
             else:
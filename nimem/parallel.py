@@ -0,0 +1,220 @@
+"""
+Multi-process ingestion for nimem.
+
+Extraction runs in a pool of worker processes, each of which loads the NLP
+models once at start-up. Extracted triplets are handed to a single writer
+thread over a bounded queue, so FalkorDB only ever sees one bulk write at a
+time however many workers are extracting.
+"""
+
+import logging
+import multiprocessing
+import os
+import queue
+import threading
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from itertools import batched
+from typing import Callable, Iterable, List, Sequence, Tuple
+
+from returns.result import Failure, Result
+
+from . import memory, warmup
+from .core import text_processing
+from .core.text_processing import Triple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 32
+DEFAULT_MP_CONTEXT = "spawn"
+
+Extractor = Callable[[Sequence[str]], List[Tuple[str, List[Triple]]]]
+
+# (index of the batch's first text, [(resolved text, triplets), ...])
+_Extracted = Tuple[int, List[Tuple[str, List[Triple]]]]
+
+
+def _init_worker(use_coref: bool, use_gliner2: bool, torch_threads: int | None):
+    """Loads the models a worker needs once, before it takes any work."""
+    if torch_threads:
+        try:
+            import torch
+
+            torch.set_num_threads(torch_threads)
+        except ImportError:
+            pass
+
+    components = ["gliner2" if use_gliner2 else "spacy"]
+    if use_coref:
+        components.append("coref")
+    warmup.preload(components, wait=True)
+
+
+def _extract_batch(
+    texts: Sequence[str], use_coref: bool, use_gliner2: bool, batch_size: int
+) -> List[Tuple[str, List[Triple]]]:
+    # Result containers stay in the worker; only plain values cross processes.
+    return text_processing.process_texts_pipeline(
+        texts, use_coref=use_coref, use_gliner2=use_gliner2, batch_size=batch_size
+    ).unwrap()
+
+
+class IngestionEngine:
+    """
+    Process pool of extraction workers feeding a single graph writer.
+
+    Args:
+        workers: Number of extraction processes (defaults to the CPU count)
+        queue_depth: Extracted batches that may wait for the writer before
+            workers are held back (defaults to ``2 * workers``)
+        batch_size: Texts per worker task and per model call
+        use_coref: If True, resolve coreferences before extraction
+        use_gliner2: If True, use GLiNER2 relation extraction
+        mp_context: Multiprocessing start method for the workers
+        torch_threads: Intra-op torch threads per worker, so that
+            ``workers`` processes do not oversubscribe the cores
+        extractor: Picklable function mapping a batch of texts to
+            ``[(resolved text, triplets), ...]``, used instead of the
+            built-in pipeline (no models are preloaded when it is set)
+    """
+
+    def __init__(
+        self,
+        workers: int | None = None,
+        queue_depth: int | None = None,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        use_coref: bool = False,
+        use_gliner2: bool = False,
+        mp_context: str = DEFAULT_MP_CONTEXT,
+        torch_threads: int | None = 1,
+        extractor: Extractor | None = None,
+    ):
+        self.workers = workers or os.cpu_count() or 1
+        self.queue_depth = queue_depth or 2 * self.workers
+        self.batch_size = batch_size
+        self.use_coref = use_coref
+        self.use_gliner2 = use_gliner2
+        self.extractor = extractor
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context(mp_context),
+            initializer=None if extractor else _init_worker,
+            initargs=() if extractor else (use_coref, use_gliner2, torch_threads),
+        )
+
+    def __enter__(self) -> "IngestionEngine":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self, wait: bool = True) -> None:
+        self._pool.shutdown(wait=wait, cancel_futures=not wait)
+
+    def _write(self, items: List[_Extracted], results: List) -> None:
+        docs = [doc for _, batch in items for doc in batch]
+        summaries = iter(memory._store_batch([triplets for _, triplets in docs]))
+        for start, batch in items:
+            for offset, (resolved_text, _) in enumerate(batch):
+                count, errors = next(summaries)
+                results[start + offset] = memory._ingest_summary(
+                    resolved_text, count, errors
+                )
+
+    def _writer(self, pending: queue.Queue, results: List) -> None:
+        """Drains the queue, merging whatever has accumulated into one write."""
+        done = False
+        while not done:
+            items = [pending.get()]
+            while True:
+                try:
+                    items.append(pending.get_nowait())
+                except queue.Empty:
+                    break
+            if None in items:
+                done = True
+                items = [item for item in items if item is not None]
+            if not items:
+                continue
+            try:
+                self._write(items, results)
+            except Exception as e:
+                # Keep draining, or the producer would block on a full queue.
+                logger.warning(f"Graph write failed: {e}")
+                for start, batch in items:
+                    results[start : start + len(batch)] = [Failure(e)] * len(batch)
+
+    def ingest(self, texts: Iterable[str]) -> List[Result[str, Exception]]:
+        """
+        Ingests texts across the worker pool.
+
+        Texts are read lazily; at most ``2 * workers`` tasks are submitted and
+        at most ``queue_depth`` extracted batches wait for the writer at once.
+
+        Returns:
+            One Result per input text, in input order.
+        """
+        results: List[Result[str, Exception] | None] = []
+        pending: queue.Queue = queue.Queue(maxsize=self.queue_depth)
+        writer = threading.Thread(
+            target=self._writer, args=(pending, results), name="nimem-writer"
+        )
+        writer.start()
+
+        in_flight: dict[Future, Tuple[int, int]] = {}
+
+        def collect(done: Iterable[Future]) -> None:
+            for future in done:
+                start, size = in_flight.pop(future)
+                try:
+                    pending.put((start, future.result()))
+                except Exception as e:
+                    logger.warning(f"Batch of {size} texts failed: {e}")
+                    results[start : start + size] = [Failure(e)] * size
+
+        try:
+            for batch in batched(texts, self.batch_size):
+                start = len(results)
+                results.extend([None] * len(batch))
+                if self.extractor:
+                    future = self._pool.submit(self.extractor, batch)
+                else:
+                    future = self._pool.submit(
+                        _extract_batch,
+                        batch,
+                        self.use_coref,
+                        self.use_gliner2,
+                        self.batch_size,
+                    )
+                in_flight[future] = (start, len(batch))
+                # One task queued per worker keeps them busy between batches.
+                if len(in_flight) >= 2 * self.workers:
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    collect(done)
+
+            collect(wait(in_flight).done)
+        finally:
+            pending.put(None)
+            writer.join()
+
+        return results
+
+
+def ingest_texts(
+    texts: Iterable[str],
+    workers: int | None = None,
+    queue_depth: int | None = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    use_coref: bool = False,
+    use_gliner2: bool = False,
+    mp_context: str = DEFAULT_MP_CONTEXT,
+) -> List[Result[str, Exception]]:
+    """One-shot IngestionEngine run; see IngestionEngine for the arguments."""
+    with IngestionEngine(
+        workers=workers,
+        queue_depth=queue_depth,
+        batch_size=batch_size,
+        use_coref=use_coref,
+        use_gliner2=use_gliner2,
+        mp_context=mp_context,
+    ) as engine:
+        return engine.ingest(texts)
@@ -0,0 +1,65 @@
+import pytest
+from unittest.mock import patch, AsyncMock
+from returns.result import Success
+from nimem.core.text_processing import Triple
+from nimem import aio
+
+@pytest.fixture
+def mock_text_pipeline():
+    with patch('nimem.core.text_processing.process_text_pipeline') as mock:
+        triplets = [
+            Triple("Alice", "works_for", "Google"),
+            Triple("Bob", "knows", "Alice")
+        ]
+        mock.return_value = Success(("Alice works...", triplets))
+        yield mock
+
+@pytest.mark.asyncio
+async def test_ingest_text(mock_text_pipeline):
+    with patch('nimem.core.graph_store.aadd_facts', new_callable=AsyncMock) as mock_add:
+        mock_add.return_value = Success([True, True])
+        res = (await aio.ingest_text("Source Text")).unwrap()
+
+    assert "Ingested 2 facts" in res
+    mock_text_pipeline.assert_called_with("Source Text", use_coref=False)
+    mock_add.assert_awaited_once()
+
+@pytest.mark.asyncio
+async def test_ingest_text_resolves_aliases(mock_text_pipeline):
+    with patch('nimem.memory._similar_entity_aliases') as mock_aliases, \
+         patch('nimem.core.graph_store.aadd_facts', new_callable=AsyncMock) as mock_add:
+        mock_aliases.return_value = {"Google": "Google LLC"}
+        mock_add.return_value = Success([True, True])
+        (await aio.ingest_text("Source Text")).unwrap()
+
+    triplets = mock_text_pipeline.return_value.unwrap()[1]
+    mock_aliases.assert_called_once_with(triplets)
+    mock_add.assert_awaited_once_with(triplets, upsert=True, aliases={"Google": "Google LLC"})
+
+@pytest.mark.asyncio
+async def test_recall_memory():
+    with patch('nimem.core.graph_store.aquery_valid_facts', new_callable=AsyncMock) as mock_query:
+        mock_query.return_value = Success([{'relation': 'KNOWS', 'object': 'Bob'}])
+        res = (await aio.recall_memory("Alice")).unwrap()
+        await aio.recall_memory("Alice", at_time=5.0, include_archive=True)
+
+    assert res == [{'relation': 'KNOWS', 'object': 'Bob'}]
+    mock_query.assert_awaited_with("Alice", at_time=5.0, include_archive=True)
+
+@pytest.mark.asyncio
+async def test_recall_many():
+    with patch('nimem.core.graph_store.aquery_valid_facts_many', new_callable=AsyncMock) as mock_query:
+        mock_query.return_value = Success({'Alice': [], 'Bob': []})
+        res = (await aio.recall_many(["Alice", "Bob"])).unwrap()
+
+    assert res == {'Alice': [], 'Bob': []}
+    mock_query.assert_awaited_once_with(["Alice", "Bob"], at_time=None, include_archive=False)
+
+@pytest.mark.asyncio
+async def test_consolidate_runs_in_pool():
+    with patch('nimem.memory.consolidate_topics') as mock_consolidate:
+        mock_consolidate.return_value = Success("Consolidated 0 weak relations into 0 topics.")
+        res = (await aio.consolidate_topics(incremental=True)).unwrap()
+
+    assert "Consolidated" in res
+    mock_consolidate.assert_called_once_with(incremental=True)
@@ -0,0 +1,58 @@
+import json
+from nimem import bench
+from nimem.bench import corpus, stubs
+from nimem.core import text_processing
+
+
+def test_corpus_is_deterministic():
+    assert corpus.synthetic_corpus(3, seed=1) == corpus.synthetic_corpus(3, seed=1)
+    assert len(set(corpus.person_names(300))) == 300
+
+
+def test_stub_extract_reads_templates():
+    [text] = corpus.synthetic_corpus(1, sentences_per_text=4)
+    triplets = stubs.stub_extract(text)
+
+    assert len(triplets) == 4
+    assert all(t.relation in corpus.TEMPLATES for t in triplets)
+
+
+def test_stubbed_restores_pipeline():
+    original = text_processing.process_texts_pipeline
+    with stubs.stubbed():
+        assert text_processing.process_texts_pipeline is not original
+    assert text_processing.process_texts_pipeline is original
+
+
+def test_run_reports_all_scenarios(tmp_path):
+    report = bench.run(
+        options={
+            "ingest": {"n_texts": 20, "batch_size": 8},
+            "recall": {"graph_sizes": [20], "history_depths": [1, 3], "queries": 10},
+            "consolidate": {"entity_counts": [30]},
+        },
+        workdir=str(tmp_path),
+    )
+
+    json.dumps(report)
+    results = report["results"]
+    assert set(results["ingest"]["rows"][0]["stages"]) == {"extract", "write", "index"}
+    assert [row["history_depth"] for row in results["recall"]["rows"]] == [1, 3]
+    assert "summary" in results["consolidate"]["rows"][0]
+
+
+def test_run_keeps_callers_stores(tmp_path):
+    from nimem.core import graph_store
+
+    store = graph_store.get_store(str(tmp_path / "caller.db"), "caller")
+    (tmp_path / "bench").mkdir()
+    bench.run(
+        scenarios=["recall"],
+        options={"recall": {"graph_sizes": [5], "history_depths": [1], "queries": 2}},
+        workdir=str(tmp_path / "bench"),
+    )
+    try:
+        assert graph_store.get_store(str(tmp_path / "caller.db"), "caller") is store
+        store.query("RETURN 1")
+    finally:
+        graph_store.close_stores(under=str(tmp_path))
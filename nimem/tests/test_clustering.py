@@ -30,3 +30,31 @@ def test_topic_naming():
     name = clustering.generate_topic_name(["apple", "banana", "cherry"])
     assert "Topic:" in name
     assert "apple" in name
+
+def test_topic_model_assign_and_persist(tmp_path):
+    vectors = np.array([[1.0, 0.0], [0.9, 0.1], [0.0, 1.0], [0.1, 0.9]])
+    texts = ["a", "b", "c", "d"]
+    clusters = {0: ["a", "b"], 1: ["c", "d"]}
+    model = clustering.TopicModel.from_clusters(
+        clusters, {0: "Topic: ab", 1: "Topic: cd"}, vectors, texts
+    )
+
+    path = str(tmp_path / "topics.npz")
+    model.save(path)
+    loaded = clustering.TopicModel.load(path)
+    assert loaded.names == ["Topic: ab", "Topic: cd"]
+    assert loaded.known == set(texts)
+
+    new_vectors = np.array([[0.95, 0.05], [-1.0, -1.0]])
+    res = clustering.assign_to_topics(loaded, new_vectors, ["e", "far"], 0.7).unwrap()
+    assert res == {0: ["e"]}
+    assert loaded.unassigned == 1
+    assert "far" in loaded.known
+
+def test_topic_model_needs_refit():
+    model = clustering.TopicModel(np.zeros((0, 2)), [], ["a", "b"], fitted_at=0.0)
+    assert model.needs_refit(refit_interval=10, drift_threshold=0.5)
+    assert not model.needs_refit(refit_interval=None, drift_threshold=0.5)
+
+    model.unassigned = 2
+    assert model.needs_refit(refit_interval=None, drift_threshold=0.5)
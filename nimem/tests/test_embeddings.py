@@ -1,5 +1,5 @@
 import pytest
-from unittest.mock import patch, AsyncMock
+from unittest.mock import patch, AsyncMock, MagicMock
 import numpy as np
 from nimem.core import embeddings
 
@@ -28,3 +28,119 @@ def test_embed_texts(mock_infinity):
     assert res.shape == (2, 3)
     assert res[0, 0] == 0.1
     mock_infinity.embed.assert_called()
+
+def test_engine_started_once(mock_infinity):
+    embeddings.embed_texts(["a"]).unwrap()
+    embeddings.embed_texts(["b"]).unwrap()
+
+    mock_infinity.astart.assert_awaited_once()
+    assert mock_infinity.embed.await_count == 2
+    mock_infinity.astop.assert_not_awaited()
+
+def test_aembed_inside_running_loop(mock_infinity):
+    import asyncio
+
+    async def run():
+        return await embeddings.aembed_texts(["hello", "world"])
+
+    res = asyncio.run(run()).unwrap()
+    assert res.shape == (2, 3)
+
+def test_reset_stops_engine(mock_infinity):
+    service = embeddings.EmbeddingService.get_instance()
+    embeddings.EmbeddingService.reset()
+
+    mock_infinity.astop.assert_awaited_once()
+    assert not service._thread.is_alive()
+
+def test_embed_texts_cached(mock_infinity, tmp_path):
+    from nimem.core.embedding_cache import EmbeddingCache
+
+    cache = EmbeddingCache(cache_dir=str(tmp_path), model_name="test-model")
+    first = embeddings.embed_texts_cached(["hello", "world"], cache=cache).unwrap()
+    assert first.shape == (2, 3)
+    assert len(cache) == 2
+
+    mock_infinity.embed.reset_mock()
+    again = embeddings.embed_texts_cached(["world", "hello"], cache=cache).unwrap()
+    mock_infinity.embed.assert_not_called()
+    np.testing.assert_allclose(again[0], first[1], rtol=1e-6)
+
+def test_embedding_cache_persists(tmp_path):
+    from nimem.core.embedding_cache import EmbeddingCache
+
+    cache = EmbeddingCache(cache_dir=str(tmp_path), model_name="test-model")
+    cache.add(["a", "b"], np.array([[1.0, 0.0], [0.0, 1.0]]))
+
+    reopened = EmbeddingCache(cache_dir=str(tmp_path), model_name="test-model")
+    hits, misses = reopened.lookup(["b", "c"])
+    assert misses == [1]
+    np.testing.assert_array_equal(hits[0], [0.0, 1.0])
+
+    other_model = EmbeddingCache(cache_dir=str(tmp_path), model_name="other-model")
+    assert len(other_model) == 0
+
+    int8 = {"engine": "optimum", "dtype": "int8"}
+    other_backend = EmbeddingCache(cache_dir=str(tmp_path), model_name="test-model", backend=int8)
+    assert len(other_backend) == 0
+
+def test_shared_embedding_cache_follows_backend(tmp_path, monkeypatch):
+    from nimem.core.embedding_cache import EmbeddingCache
+
+    monkeypatch.chdir(tmp_path)
+    EmbeddingCache.reset()
+    try:
+        default = EmbeddingCache.get_instance()
+        assert EmbeddingCache.get_instance() is default
+        with patch.dict(embeddings.EMBEDDING_BACKEND, {"engine": "optimum", "dtype": "int8"}):
+            quantized = EmbeddingCache.get_instance()
+        assert quantized.path != default.path
+    finally:
+        EmbeddingCache.reset()
+
+def test_invalid_backend_starts_no_thread(mock_infinity):
+    import threading
+
+    with pytest.raises(ValueError):
+        embeddings.EmbeddingService(engine="no-such-engine")
+    assert "nimem-embeddings" not in [t.name for t in threading.enumerate()]
+
+def test_backend_from_config(mock_infinity):
+    with patch.dict(embeddings.EMBEDDING_BACKEND, {"engine": "optimum", "dtype": "int8"}), \
+         patch('nimem.core.embeddings.EngineArgs') as mock_args:
+        service = embeddings.EmbeddingService()
+        service.shutdown()
+
+    kwargs = mock_args.call_args.kwargs
+    assert kwargs["engine"] == embeddings.InferenceEngine.optimum
+    assert kwargs["dtype"] == embeddings.Dtype.int8
+
+def test_check_embedding_parity():
+    outputs = {
+        "torch": np.array([[1.0, 0.0], [0.0, 1.0]]),
+        "optimum": np.array([[1.0, 0.0], [0.1, 1.0]]),
+    }
+    with patch('nimem.core.embeddings.EmbeddingService') as mock_service:
+        mock_service.side_effect = lambda engine, dtype: MagicMock(
+            embed=lambda texts: outputs[engine]
+        )
+        report = embeddings.check_embedding_parity(["a", "b"], engine="optimum").unwrap()
+
+    assert report["min_cosine"] == pytest.approx(1 / np.sqrt(1.01))
+    assert report["mean_cosine"] > report["min_cosine"]
+    assert report["speedup"] > 0
+
+def test_embedding_cache_recovers_from_torn_write(tmp_path):
+    from nimem.core.embedding_cache import EmbeddingCache
+    cache = EmbeddingCache(cache_dir=str(tmp_path), model_name="test-model")
+    cache.add(["a", "b"], np.array([[1.0, 0.0], [0.0, 1.0]]))
+    # Vectors of an add whose keys were never written.
+    with open(cache._file("vectors.bin"), "ab") as f:
+        f.write(np.array([[9.0, 9.0]], dtype=np.float32).tobytes())
+
+    reopened = EmbeddingCache(cache_dir=str(tmp_path), model_name="test-model")
+    reopened.add(["c"], np.array([[0.5, 0.5]]))
+    hits, _ = EmbeddingCache(cache_dir=str(tmp_path), model_name="test-model").lookup(["a", "c"])
+
+    assert hits[0].tolist() == [1.0, 0.0]
+    assert hits[1].tolist() == [0.5, 0.5]
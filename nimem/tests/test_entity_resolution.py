@@ -0,0 +1,31 @@
+from nimem.core import entity_resolution
+
+
+def test_normalize_name():
+    assert entity_resolution.normalize_name("Apple Inc.") == "apple"
+    assert entity_resolution.normalize_name("The Apple Corp") == "apple"
+    assert entity_resolution.normalize_name("AT&T") == "at t"
+    assert entity_resolution.normalize_name("The") == "the"
+
+
+def test_canonical_names_prefers_existing():
+    mapping = entity_resolution.canonical_names(
+        ["apple", "Apple Inc", "Google LLC", "google"], {"apple": "Apple Inc."}
+    )
+    assert mapping == {
+        "apple": "Apple Inc.",
+        "Apple Inc": "Apple Inc.",
+        "Google LLC": "Google LLC",
+        "google": "Google LLC",
+    }
+
+
+def test_match_similar_requires_both_signals():
+    candidates = {
+        0: [("Microsoft", 0.97), ("Apple Computers", 0.95)],
+        1: [("Alice Smith", 0.5)],
+    }
+    mapping = entity_resolution.match_similar(
+        ["Apple Computer", "Alice Smyth"], candidates, 0.9, 0.6
+    )
+    assert mapping == {"Apple Computer": "Apple Computers"}
@@ -0,0 +1,51 @@
+import pytest
+from unittest.mock import patch
+from nimem.core import extraction_cache
+from nimem.core.extraction_cache import ExtractionCache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = ExtractionCache(path=str(tmp_path / "extractions.sqlite"), max_entries=2)
+    yield cache
+    cache.close()
+
+
+def test_round_trip_and_hit_rate(cache):
+    cache.put_many([("k1", "Alice knows Bob", [("Alice", "knows", "Bob")])])
+
+    found = cache.get_many(["k1", "k2"])
+
+    assert found == {"k1": ("Alice knows Bob", [("Alice", "knows", "Bob")])}
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["hit_rate"] == 0.5
+
+
+def test_evicts_least_recently_used(cache):
+    with patch("nimem.core.extraction_cache.time.time", side_effect=[1, 2, 3, 4]):
+        cache.put_many([("k1", "a", [])])
+        cache.put_many([("k2", "b", [])])
+        cache.get_many(["k1"])
+        cache.put_many([("k3", "c", [])])
+
+    assert set(cache.get_many(["k1", "k2", "k3"])) == {"k1", "k3"}
+    assert cache.stats()["evictions"] == 1
+
+
+def test_persists_across_instances(tmp_path):
+    path = str(tmp_path / "extractions.sqlite")
+    first = ExtractionCache(path=path)
+    first.put_many([("k1", "a", [])])
+    first.close()
+
+    second = ExtractionCache(path=path)
+    assert len(second) == 1
+    second.close()
+
+
+def test_fingerprint_tracks_configuration():
+    base = extraction_cache.config_fingerprint(False, False)
+    assert extraction_cache.config_fingerprint(True, False) != base
+    assert extraction_cache.config_fingerprint(False, True) != base
+    with patch.dict(extraction_cache.schema.RELATIONS, {"owns": "Ownership"}):
+        assert extraction_cache.config_fingerprint(False, False) != base
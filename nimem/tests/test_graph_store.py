@@ -6,14 +6,21 @@ from nimem.core import graph_store
 FAKE_DB = './test_nimem.db'
 TEST_GRAPH = 'test_memory'
 
-@pytest.fixture
-def clean_db():
+@pytest.fixture(scope="module")
+def db_file():
+    graph_store.close_stores()
     if os.path.exists(FAKE_DB):
         os.remove(FAKE_DB)
     yield
+    graph_store.close_stores()
     if os.path.exists(FAKE_DB):
         os.remove(FAKE_DB)
 
+@pytest.fixture
+def clean_db(db_file):
+    graph_store.get_store(db_path=FAKE_DB, graph_name=TEST_GRAPH).clear()
+    yield
+
 def test_add_and_query_fact(clean_db):
     res = graph_store.add_fact("Alice", "works_for", "Google", db_path=FAKE_DB, graph_name=TEST_GRAPH).unwrap()
     assert res is True
@@ -48,3 +55,355 @@ def test_bitemporality_query(clean_db):
     
     facts_too_early = graph_store.query_valid_facts("Bob", at_time=past_time - 1, db_path=FAKE_DB, graph_name=TEST_GRAPH).unwrap()
     assert len(facts_too_early) == 0
+
+def test_store_is_reused(clean_db):
+    store = graph_store.get_store(db_path=FAKE_DB, graph_name=TEST_GRAPH)
+    assert graph_store.get_store(db_path=FAKE_DB, graph_name=TEST_GRAPH) is store
+
+    other = graph_store.get_store(db_path=FAKE_DB, graph_name="other_graph")
+    assert other is not store
+    assert other._db is store._db
+
+def test_store_shared_across_threads(clean_db):
+    from concurrent.futures import ThreadPoolExecutor
+
+    def write(i):
+        return graph_store.add_fact(
+            f"Person{i}", "knows", "Alice", db_path=FAKE_DB, graph_name=TEST_GRAPH
+        ).unwrap()
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        assert all(pool.map(write, range(8)))
+
+    entities = graph_store.get_all_entities(db_path=FAKE_DB, graph_name=TEST_GRAPH).unwrap()
+    assert len(entities) == 9
+
+def test_add_facts_bulk(clean_db):
+    triples = [
+        ("Alice", "works_for", "Google"),
+        ("Alice", "knows", "Bob"),
+        ("Bob", "works_for", "Acme"),
+        ("Bob", "not a relation!", "Acme"),
+    ]
+    res = graph_store.add_facts(triples, db_path=FAKE_DB, graph_name=TEST_GRAPH).unwrap()
+    assert res == [True, True, True, False]
+
+    facts = graph_store.query_valid_facts("Alice", db_path=FAKE_DB, graph_name=TEST_GRAPH).unwrap()
+    assert sorted(f['relation'] for f in facts) == ['KNOWS', 'WORKS_FOR']
+
+def test_add_facts_cardinality_one(clean_db):
+    graph_store.add_fact("Alice", "located_in", "London", valid_at=0, db_path=FAKE_DB, graph_name=TEST_GRAPH)
+
+    triples = [("Alice", "located_in", "Berlin"), ("Alice", "located_in", "Paris")]
+    res = graph_store.add_facts(triples, valid_at=10, db_path=FAKE_DB, graph_name=TEST_GRAPH).unwrap()
+    assert res == [True, True]
+
+    facts = graph_store.query_valid_facts("Alice", db_path=FAKE_DB, graph_name=TEST_GRAPH).unwrap()
+    assert facts == [{'relation': 'LOCATED_IN', 'object': 'Paris'}]
+
+    past = graph_store.query_valid_facts("Alice", at_time=5, db_path=FAKE_DB, graph_name=TEST_GRAPH).unwrap()
+    assert past == [{'relation': 'LOCATED_IN', 'object': 'London'}]
+
+def _edges(subject, relation):
+    store = graph_store.get_store(FAKE_DB, TEST_GRAPH)
+    res = store.query(
+        f"MATCH (:Entity {{name: $s}})-[r:{relation}]->(o) "
+        "RETURN o.name, r.mention_count, r.last_seen, r.invalidated_at ORDER BY r.valid_at",
+        {"s": subject},
+    )
+    return res.result_set
+
+def test_add_facts_upsert(clean_db):
+    triples = [("Alice", "knows", "Bob"), ("Alice", "knows", "Bob")]
+    assert graph_store.add_facts(triples, valid_at=1, upsert=True, db_path=FAKE_DB, graph_name=TEST_GRAPH).unwrap() == [True, True]
+    assert graph_store.add_fact("Alice", "knows", "Bob", valid_at=2, upsert=True, db_path=FAKE_DB, graph_name=TEST_GRAPH).unwrap()
+
+    assert _edges("Alice", "KNOWS") == [["Bob", 3, 2, None]]
+    facts = graph_store.query_valid_facts("Alice", db_path=FAKE_DB, graph_name=TEST_GRAPH).unwrap()
+    assert facts == [{'relation': 'KNOWS', 'object': 'Bob'}]
+
+def test_add_facts_upsert_cardinality_one(clean_db):
+    triples = [("Alice", "located_in", "London"), ("Alice", "located_in", "Paris")]
+    for valid_at in (1, 2):
+        graph_store.add_facts(triples, valid_at=valid_at, upsert=True, db_path=FAKE_DB, graph_name=TEST_GRAPH).unwrap()
+
+    assert _edges("Alice", "LOCATED_IN") == [["London", 2, 2, 1], ["Paris", 2, 2, None]]
+
+    graph_store.add_facts([("Alice", "located_in", "Rome")], valid_at=3, upsert=True, db_path=FAKE_DB, graph_name=TEST_GRAPH).unwrap()
+    facts = graph_store.query_valid_facts("Alice", db_path=FAKE_DB, graph_name=TEST_GRAPH).unwrap()
+    assert facts == [{'relation': 'LOCATED_IN', 'object': 'Rome'}]
+
+    # X, Y, X within one batch leaves X current.
+    graph_store.add_facts(
+        [("Bob", "located_in", "London"), ("Bob", "located_in", "Paris"), ("Bob", "located_in", "London")],
+        valid_at=4, upsert=True, db_path=FAKE_DB, graph_name=TEST_GRAPH,
+    ).unwrap()
+    facts = graph_store.query_valid_facts("Bob", db_path=FAKE_DB, graph_name=TEST_GRAPH).unwrap()
+    assert facts == [{'relation': 'LOCATED_IN', 'object': 'London'}]
+
+@pytest.mark.parametrize("upsert", [False, True])
+def test_add_fact_expiry_is_explicit(clean_db, upsert):
+    kw = dict(upsert=upsert, db_path=FAKE_DB, graph_name=TEST_GRAPH)
+    graph_store.add_fact("Alice", "located_in", "London", valid_at=1, **kw).unwrap()
+    graph_store.add_fact("Alice", "located_in", "Paris", valid_at=2, **kw).unwrap()
+    facts = graph_store.query_valid_facts("Alice", db_path=FAKE_DB, graph_name=TEST_GRAPH).unwrap()
+    assert sorted(f['object'] for f in facts) == ["London", "Paris"]
+
+    graph_store.add_fact("Alice", "located_in", "Rome", valid_at=3, expire_existing=True, **kw).unwrap()
+    facts = graph_store.query_valid_facts("Alice", db_path=FAKE_DB, graph_name=TEST_GRAPH).unwrap()
+    assert facts == [{'relation': 'LOCATED_IN', 'object': 'Rome'}]
+
+def test_compact_facts(clean_db):
+    for valid_at in (1, 2, 3):
+        graph_store.add_fact("Alice", "knows", "Bob", valid_at=valid_at, db_path=FAKE_DB, graph_name=TEST_GRAPH)
+    graph_store.add_fact("Alice", "knows", "Carol", db_path=FAKE_DB, graph_name=TEST_GRAPH)
+
+    assert graph_store.compact_facts(db_path=FAKE_DB, graph_name=TEST_GRAPH).unwrap() == 2
+    assert _edges("Alice", "KNOWS")[0] == ["Bob", 3, 3, None]
+    assert len(_edges("Alice", "KNOWS")) == 2
+    assert graph_store.compact_facts(db_path=FAKE_DB, graph_name=TEST_GRAPH).unwrap() == 0
+
+def test_query_valid_facts_many(clean_db):
+    triples = [("Alice", "knows", "Bob"), ("Alice", "works_for", "Acme"), ("Bob", "knows", "Carol")]
+    graph_store.add_facts(triples, valid_at=1, db_path=FAKE_DB, graph_name=TEST_GRAPH)
+
+    facts = graph_store.query_valid_facts_many(
+        ["Alice", "Bob", "Nobody", "Alice"], db_path=FAKE_DB, graph_name=TEST_GRAPH
+    ).unwrap()
+
+    assert list(facts) == ["Alice", "Bob", "Nobody"]
+    assert sorted(f['relation'] for f in facts["Alice"]) == ['KNOWS', 'WORKS_FOR']
+    assert facts["Bob"] == [{'relation': 'KNOWS', 'object': 'Carol'}]
+    assert facts["Nobody"] == []
+
+    before = graph_store.query_valid_facts_many(["Alice"], at_time=0, db_path=FAKE_DB, graph_name=TEST_GRAPH).unwrap()
+    assert before == {"Alice": []}
+
+def test_recall_cache_serves_reads_until_write(clean_db):
+    from nimem.core.recall_cache import RecallCache
+    cache = RecallCache.configure(max_entries=16)
+    try:
+        graph_store.add_fact("Alice", "knows", "Bob", db_path=FAKE_DB, graph_name=TEST_GRAPH)
+        first = graph_store.query_valid_facts("Alice", db_path=FAKE_DB, graph_name=TEST_GRAPH).unwrap()
+        second = graph_store.query_valid_facts("Alice", db_path=FAKE_DB, graph_name=TEST_GRAPH).unwrap()
+        assert first == second
+        assert cache.stats()["hits"] == 1
+
+        graph_store.add_fact("Alice", "works_for", "Acme", db_path=FAKE_DB, graph_name=TEST_GRAPH)
+        facts = graph_store.query_valid_facts_many(["Alice"], db_path=FAKE_DB, graph_name=TEST_GRAPH).unwrap()
+        assert len(facts["Alice"]) == 2
+        assert cache.stats()["hits"] == 1
+    finally:
+        RecallCache.reset()
+
+def test_query_neighbourhood(clean_db):
+    triples = [
+        ("Alice", "knows", "Bob"),
+        ("Alice", "knows", "Carol"),
+        ("Bob", "works_for", "Acme"),
+        ("Acme", "located_in", "Paris"),
+    ]
+    graph_store.add_facts(triples, valid_at=1, db_path=FAKE_DB, graph_name=TEST_GRAPH)
+    graph_store.add_fact("Carol", "knows", "Dave", valid_at=1, db_path=FAKE_DB, graph_name=TEST_GRAPH)
+    graph_store.expire_facts("Carol", "knows", invalidated_at=2, db_path=FAKE_DB, graph_name=TEST_GRAPH)
+
+    sub = graph_store.query_neighbourhood("Alice", depth=2, db_path=FAKE_DB, graph_name=TEST_GRAPH).unwrap()
+    assert sorted(sub["nodes"]) == ["Acme", "Alice", "Bob", "Carol"]
+    assert {"subject": "Bob", "relation": "WORKS_FOR", "object": "Acme", "hop": 2} in sub["edges"]
+
+    past = graph_store.query_neighbourhood("Alice", depth=2, at_time=1.5, db_path=FAKE_DB, graph_name=TEST_GRAPH).unwrap()
+    assert "Dave" in past["nodes"]
+
+    only_knows = graph_store.query_neighbourhood("Alice", depth=3, relations=["knows"], db_path=FAKE_DB, graph_name=TEST_GRAPH).unwrap()
+    assert sorted(only_knows["nodes"]) == ["Alice", "Bob", "Carol"]
+
+    capped = graph_store.query_neighbourhood("Alice", depth=3, fanout=1, db_path=FAKE_DB, graph_name=TEST_GRAPH).unwrap()
+    assert len([e for e in capped["edges"] if e["subject"] == "Alice"]) == 1
+
+    per_hop = graph_store.query_neighbourhood("Alice", depth=3, fanout=[2, 0], db_path=FAKE_DB, graph_name=TEST_GRAPH).unwrap()
+    assert sorted(per_hop["nodes"]) == ["Alice", "Bob", "Carol"]
+
+    limited = graph_store.query_neighbourhood("Alice", depth=3, limit=2, db_path=FAKE_DB, graph_name=TEST_GRAPH).unwrap()
+    assert [e["hop"] for e in limited["edges"]] == [1, 1]
+
+def test_archive_facts(clean_db):
+    graph_store.get_store(FAKE_DB, graph_store.archive_graph_name(TEST_GRAPH)).clear()
+    graph_store.add_facts([("Alice", "located_in", "London")], valid_at=0, db_path=FAKE_DB, graph_name=TEST_GRAPH)
+    graph_store.add_facts([("Alice", "located_in", "Paris")], valid_at=10, db_path=FAKE_DB, graph_name=TEST_GRAPH)
+    graph_store.add_facts([("Alice", "located_in", "Rome")], valid_at=100, db_path=FAKE_DB, graph_name=TEST_GRAPH)
+    assert graph_store.query_valid_facts("Alice", at_time=5, db_path=FAKE_DB, graph_name=TEST_GRAPH).unwrap()
+
+    moved = graph_store.archive_facts(before=50, batch_size=1, db_path=FAKE_DB, graph_name=TEST_GRAPH).unwrap()
+
+    assert moved == 1
+    assert [row[0] for row in _edges("Alice", "LOCATED_IN")] == ["Paris", "Rome"]
+    assert graph_store.query_valid_facts("Alice", at_time=5, db_path=FAKE_DB, graph_name=TEST_GRAPH).unwrap() == []
+    archived = graph_store.query_valid_facts(
+        "Alice", at_time=5, include_archive=True, db_path=FAKE_DB, graph_name=TEST_GRAPH
+    ).unwrap()
+    assert archived == [{'relation': 'LOCATED_IN', 'object': 'London'}]
+    many = graph_store.query_valid_facts_many(
+        ["Alice"], at_time=50, include_archive=True, db_path=FAKE_DB, graph_name=TEST_GRAPH
+    ).unwrap()
+    assert many == {"Alice": [{'relation': 'LOCATED_IN', 'object': 'Paris'}]}
+    import asyncio
+    async_archived = asyncio.run(graph_store.aquery_valid_facts(
+        "Alice", at_time=5, include_archive=True, db_path=FAKE_DB, graph_name=TEST_GRAPH
+    )).unwrap()
+    assert async_archived == archived
+    async_many = asyncio.run(graph_store.aquery_valid_facts_many(
+        ["Alice"], at_time=5, include_archive=True, db_path=FAKE_DB, graph_name=TEST_GRAPH
+    )).unwrap()
+    assert async_many == {"Alice": archived}
+    current = graph_store.query_valid_facts("Alice", include_archive=True, db_path=FAKE_DB, graph_name=TEST_GRAPH).unwrap()
+    assert current == [{'relation': 'LOCATED_IN', 'object': 'Rome'}]
+
+    assert graph_store.archive_facts(before=50, db_path=FAKE_DB, graph_name=TEST_GRAPH).unwrap() == 0
+
+def test_indexes_created_on_connect(clean_db):
+    assert graph_store.verify_indexes(db_path=FAKE_DB, graph_name=TEST_GRAPH).unwrap() == []
+
+    indexes = graph_store.list_indexes(db_path=FAKE_DB, graph_name=TEST_GRAPH).unwrap()
+    entity = [i for i in indexes if i['label'] == 'Entity']
+    assert entity and 'name' in entity[0]['properties']
+
+    store = graph_store.get_store(db_path=FAKE_DB, graph_name=TEST_GRAPH)
+    assert store.ensure_indexes() == 0
+
+def test_new_relation_type_is_indexed(clean_db):
+    graph_store.add_fact("Alice", "mentored", "Bob", db_path=FAKE_DB, graph_name=TEST_GRAPH)
+
+    indexes = graph_store.list_indexes(db_path=FAKE_DB, graph_name=TEST_GRAPH).unwrap()
+    mentored = [i for i in indexes if i['label'] == 'MENTORED']
+    assert mentored
+    assert set(mentored[0]['properties']) == {'valid_at', 'invalidated_at'}
+
+def test_vector_recall(clean_db):
+    graph_store.add_fact("Alice", "works_for", "Google", db_path=FAKE_DB, graph_name=TEST_GRAPH)
+    graph_store.add_fact("Bob", "located_in", "Paris", db_path=FAKE_DB, graph_name=TEST_GRAPH)
+
+    missing = graph_store.get_unembedded_entities(db_path=FAKE_DB, graph_name=TEST_GRAPH).unwrap()
+    assert set(missing) == {"Alice", "Google", "Bob", "Paris"}
+
+    names = ["Alice", "Google", "Bob", "Paris"]
+    vectors = [[1.0, 0.0, 0.0], [0.0, 1.0, 0.0], [0.8, 0.2, 0.0], [0.0, 0.0, 1.0]]
+    count = graph_store.set_entity_embeddings(names, vectors, db_path=FAKE_DB, graph_name=TEST_GRAPH).unwrap()
+    assert count == 4
+    assert graph_store.get_unembedded_entities(db_path=FAKE_DB, graph_name=TEST_GRAPH).unwrap() == []
+
+    hits = graph_store.query_similar_entities([1.0, 0.0, 0.0], k=2, db_path=FAKE_DB, graph_name=TEST_GRAPH).unwrap()
+    assert [h['name'] for h in hits] == ["Alice", "Bob"]
+    assert hits[0]['similarity'] == pytest.approx(1.0)
+    assert hits[0]['facts'] == [{'relation': 'WORKS_FOR', 'object': 'Google'}]
+    assert hits[1]['facts'] == [{'relation': 'LOCATED_IN', 'object': 'Paris'}]
+
+def test_async_graph_io(clean_db):
+    import asyncio
+
+    async def run():
+        added = await graph_store.aadd_facts(
+            [("Alice", "works_for", "Google"), ("Alice", "located_in", "Paris")],
+            db_path=FAKE_DB, graph_name=TEST_GRAPH,
+        )
+        assert added.unwrap() == [True, True]
+        assert (await graph_store.aadd_fact("Alice", "knows", "Bob", db_path=FAKE_DB, graph_name=TEST_GRAPH)).unwrap()
+        return await graph_store.aquery_valid_facts("Alice", db_path=FAKE_DB, graph_name=TEST_GRAPH)
+
+    facts = asyncio.run(run()).unwrap()
+    assert sorted(f['relation'] for f in facts) == ['KNOWS', 'LOCATED_IN', 'WORKS_FOR']
+
+    # A second loop gets its own connection pool.
+    assert len(asyncio.run(graph_store.aquery_valid_facts("Alice", db_path=FAKE_DB, graph_name=TEST_GRAPH)).unwrap()) == 3
+
+
+
+def test_async_writes_keep_setup_off_the_loop(clean_db):
+    import asyncio
+    import threading
+    from unittest.mock import patch
+
+    graph_store.close_stores(under=FAKE_DB)
+    threads = []
+    original = graph_store.GraphStore.ensure_indexes
+
+    def record(self, *args, **kwargs):
+        threads.append(threading.get_ident())
+        return original(self, *args, **kwargs)
+
+    async def run():
+        loop_thread = threading.get_ident()
+        stored = await graph_store.aadd_facts(
+            [("Alice", "admires", "Bob")], db_path=FAKE_DB, graph_name=TEST_GRAPH
+        )
+        return loop_thread, stored
+
+    with patch.object(graph_store.GraphStore, "ensure_indexes", record):
+        loop_thread, stored = asyncio.run(run())
+
+    assert stored.unwrap() == [True]
+    assert len(threads) == 2  # opening the store, then the new relation's index
+    assert loop_thread not in threads
+
+
+def test_add_facts_canonicalizes_entities(clean_db):
+    kw = dict(db_path=FAKE_DB, graph_name=TEST_GRAPH)
+    graph_store.add_facts([("Apple Inc.", "located_in", "Cupertino")], upsert=True, **kw).unwrap()
+    graph_store.add_facts([("apple", "located_in", "Cupertino")], upsert=True, **kw).unwrap()
+
+    store = graph_store.get_store(**kw)
+    res = store.query("MATCH (n:Entity {key: 'apple'}) RETURN n.name, n.aliases")
+    assert res.result_set == [["Apple Inc.", ["apple"]]]
+    assert _edges("Apple Inc.", "LOCATED_IN")[0][1] == 2
+    assert graph_store.resolve_entities(["The Apple Corp", "Pear"], **kw).unwrap() == {
+        "The Apple Corp": "Apple Inc."
+    }
+
+
+def test_recall_matches_surface_forms(clean_db):
+    import asyncio
+    kw = dict(db_path=FAKE_DB, graph_name=TEST_GRAPH)
+    graph_store.add_facts([("Apple Inc.", "located_in", "Cupertino")], upsert=True, **kw).unwrap()
+
+    expected = [{'relation': 'LOCATED_IN', 'object': 'Cupertino'}]
+    assert graph_store.query_valid_facts("Apple", **kw).unwrap() == expected
+    assert graph_store.query_valid_facts_many(["apple", "Apple Inc"], **kw).unwrap() == {
+        "apple": expected,
+        "Apple Inc": expected,
+    }
+    facts = asyncio.run(graph_store.aquery_valid_facts("the apple corp", **kw)).unwrap()
+    assert facts == expected
+
+    sub = graph_store.query_neighbourhood("apple", depth=1, **kw).unwrap()
+    assert sub["nodes"] == ["Apple Inc.", "Cupertino"]
+    assert sub["edges"][0]["subject"] == "Apple Inc."
+
+    assert graph_store.expire_facts("apple", "located_in", **kw).unwrap() == 1
+    assert graph_store.query_valid_facts("Apple Inc.", **kw).unwrap() == []
+
+
+def test_backfill_entity_keys(clean_db):
+    kw = dict(db_path=FAKE_DB, graph_name=TEST_GRAPH)
+    graph_store.get_store(**kw).query("CREATE (:Entity {name: 'Acme Ltd'})")
+    assert graph_store.backfill_entity_keys(**kw).unwrap() == 1
+    assert graph_store.resolve_entities(["ACME"], **kw).unwrap() == {"ACME": "Acme Ltd"}
+
+
+def test_backfill_refreshes_recall(clean_db):
+    from nimem.core.recall_cache import RecallCache
+    kw = dict(db_path=FAKE_DB, graph_name=TEST_GRAPH)
+    RecallCache.configure(max_entries=16)
+    try:
+        graph_store.get_store(**kw).query("CREATE (:Entity {name: 'Zed'})-[:KNOWS]->(:Entity {name: 'Amy'})")
+        assert graph_store.query_valid_facts("Zed", **kw).unwrap() == []
+        assert graph_store.backfill_entity_keys(**kw).unwrap() == 2
+        assert graph_store.query_valid_facts("Zed", **kw).unwrap() == [{'relation': 'KNOWS', 'object': 'Amy'}]
+    finally:
+        RecallCache.reset()
+
+
+def test_get_store_backfills_legacy_graph(clean_db):
+    kw = dict(db_path=FAKE_DB, graph_name=TEST_GRAPH)
+    graph_store.get_store(**kw).query("CREATE (:Entity {name: 'Zed'})-[:KNOWS]->(:Entity {name: 'Amy'})")
+    graph_store.close_stores(under=FAKE_DB)
+
+    assert graph_store.query_valid_facts("zed", **kw).unwrap() == [{'relation': 'KNOWS', 'object': 'Amy'}]
@@ -22,15 +22,15 @@ def mock_graph_add():
         yield mock
 
 @pytest.fixture
-def mock_graph_expire():
-    with patch('nimem.core.graph_store.expire_facts') as mock:
-        mock.return_value = Success(0)
+def mock_graph_add_facts():
+    with patch('nimem.core.graph_store.add_facts') as mock:
+        mock.side_effect = lambda triples, **kwargs: Success([True] * len(triples))
         yield mock
 
 @pytest.fixture
 def mock_consolidate_deps():
     with patch('nimem.core.graph_store.get_all_entities') as mock_ents, \
-         patch('nimem.core.embeddings.embed_texts') as mock_embed, \
+         patch('nimem.core.embeddings.embed_texts_cached') as mock_embed, \
          patch('nimem.core.clustering.perform_clustering') as mock_cluster, \
          patch('nimem.core.clustering.generate_topic_name') as mock_topic:
         mock_ents.return_value = Success(["Alice", "Bob"])
@@ -44,23 +44,132 @@ def mock_consolidate_deps():
             'topic': mock_topic
         }
 
-def test_ingest_text_flow(mock_text_pipeline, mock_graph_add):
+def test_ingest_text_flow(mock_text_pipeline, mock_graph_add_facts):
     res = memory.ingest_text("Source Text").unwrap()
     assert "Ingested 2 facts" in res
     
-    mock_text_pipeline.assert_called_with("Source Text")
-    assert mock_graph_add.call_count == 2
+    mock_text_pipeline.assert_called_with("Source Text", use_coref=False)
+    assert mock_graph_add_facts.call_count == 1
+    assert len(mock_graph_add_facts.call_args[0][0]) == 2
 
-def test_ingest_cardinality_one(mock_text_pipeline, mock_graph_add, mock_graph_expire):
+def test_ingest_cardinality_one(mock_text_pipeline, mock_graph_add_facts):
     mock_text_pipeline.return_value = Success(("Txt", [Triple("Alice", "located_in", "Paris")]))
     
     res = memory.ingest_text("Alice is in Paris").unwrap()
     
-    mock_graph_expire.assert_called_with("Alice", "located_in")
-    mock_graph_add.assert_called_with("Alice", "located_in", "Paris")
+    mock_graph_add_facts.assert_called_with(
+        [Triple("Alice", "located_in", "Paris")], upsert=True, aliases={}
+    )
+
+def test_ingest_partial_failure(mock_text_pipeline):
+    with patch('nimem.core.graph_store.add_facts') as mock:
+        mock.return_value = Success([True, False])
+        res = memory.ingest_text("Source Text").unwrap()
+    assert "Ingested 1 facts" in res
 
 def test_consolidate_topics(mock_graph_add, mock_consolidate_deps):
     res = memory.consolidate_topics().unwrap()
     assert "Consolidated" in res
     
-    mock_graph_add.assert_any_call("Alice", "BELONGS_TO", "Topic: Friends")
+    mock_graph_add.assert_any_call("Alice", "BELONGS_TO", "Topic: Friends", upsert=True)
+
+def test_consolidate_twice_keeps_one_topic_edge(mock_consolidate_deps, tmp_path, monkeypatch):
+    from nimem.core import graph_store
+
+    monkeypatch.chdir(tmp_path)
+    try:
+        for _ in range(2):
+            memory.consolidate_topics(model_path=str(tmp_path / "topics.npz")).unwrap()
+
+        res = graph_store.get_store().query(
+            "MATCH (e:Entity)-[r:BELONGS_TO]->(:Entity) RETURN e.name, count(r) ORDER BY e.name"
+        )
+        assert res.result_set == [["Alice", 1], ["Bob", 1]]
+    finally:
+        graph_store.close_stores(under=str(tmp_path))
+
+def test_ingest_texts_batches(mock_graph_add_facts):
+    with patch('nimem.core.text_processing.process_texts_pipeline') as mock_batch:
+        mock_batch.side_effect = lambda batch, **kwargs: Success([
+            (text, [Triple("Alice", "works_for", "Google")]) for text in batch
+        ])
+
+        results = memory.ingest_texts(["a", "b", "c"], batch_size=2)
+
+    assert len(results) == 3
+    assert all("Ingested 1 facts" in r.unwrap() for r in results)
+    assert mock_batch.call_count == 2
+    assert mock_graph_add_facts.call_count == 2
+    assert len(mock_graph_add_facts.call_args_list[0][0][0]) == 2
+
+def test_ingest_stream_windows(mock_text_pipeline, mock_graph_add_facts):
+    mock_text_pipeline.side_effect = lambda text, **kwargs: Success(
+        (text, [Triple("Alice", "works_for", "Google")])
+    )
+    source = iter(["Alice works at Google. She is ", "happy. Bob knows Alice."])
+
+    progress = list(memory.ingest_stream(source, max_chars=25, overlap=1))
+
+    assert [p.window for p in progress] == [0, 1, 2]
+    assert progress[-1].chars == len("Alice works at Google. She is happy. Bob knows Alice.") + 1
+    windows = [call.args[0] for call in mock_text_pipeline.call_args_list]
+    assert windows[1] == "Alice works at Google. She is happy."
+    assert windows[2] == "She is happy. Bob knows Alice."
+    # The repeated fact is only written by the first window.
+    assert [p.facts for p in progress] == [1, 0, 0]
+    assert mock_graph_add_facts.call_count == 1
+
+def test_consolidate_topics_incremental(mock_graph_add, mock_consolidate_deps, tmp_path):
+    path = str(tmp_path / "topics.npz")
+    mock_consolidate_deps['embed'].return_value = Success(np.array([[1.0, 0.0], [0.9, 0.1]]))
+
+    memory.consolidate_topics(incremental=True, model_path=path).unwrap()
+    assert mock_consolidate_deps['cluster'].call_count == 1
+
+    mock_consolidate_deps['ents'].return_value = Success(["Alice", "Bob", "Carol"])
+    mock_consolidate_deps['embed'].return_value = Success(np.array([[0.95, 0.05]]))
+
+    res = memory.consolidate_topics(incremental=True, model_path=path).unwrap()
+    assert "Consolidated 1 weak relations" in res
+    assert mock_consolidate_deps['cluster'].call_count == 1
+    mock_consolidate_deps['embed'].assert_called_with(["Carol"])
+    mock_graph_add.assert_called_with("Carol", "BELONGS_TO", "Topic: Friends", upsert=True)
+
+def test_recall_similar():
+    with patch('nimem.core.embeddings.embed_texts') as mock_embed, \
+         patch('nimem.core.graph_store.query_similar_entities') as mock_query:
+        mock_embed.return_value = Success(np.array([[0.1, 0.2]]))
+        mock_query.return_value = Success([{'name': 'Alice', 'similarity': 0.9, 'facts': []}])
+
+        res = memory.recall_similar("who works at google?", k=3).unwrap()
+
+    assert res[0]['name'] == 'Alice'
+    assert mock_query.call_args.kwargs == {'k': 3, 'at_time': None}
+
+def test_recall_neighbourhood():
+    with patch('nimem.core.graph_store.query_neighbourhood') as mock_query:
+        mock_query.return_value = Success({'nodes': ['Alice'], 'edges': []})
+
+        res = memory.recall_neighbourhood("Alice", depth=3, fanout=(10, 5)).unwrap()
+
+    assert res['nodes'] == ['Alice']
+    mock_query.assert_called_once_with(
+        "Alice", depth=3, limit=100, relations=None, at_time=None, fanout=(10, 5)
+    )
+
+
+def test_store_batch_embedding_aliases(mock_graph_add_facts):
+    triples = [Triple("Apple Computer", "works_at", "Cupertino")]
+    with patch.dict(memory.ENTITY_RESOLUTION, {"use_embeddings": True}), \
+         patch('nimem.core.graph_store.resolve_entities') as mock_resolve, \
+         patch('nimem.core.embeddings.embed_texts_cached') as mock_embed, \
+         patch('nimem.core.graph_store.nearest_entities') as mock_nearest:
+        mock_resolve.return_value = Success({"Cupertino": "Cupertino"})
+        mock_embed.return_value = Success([[0.1, 0.2]])
+        mock_nearest.return_value = Success({0: [("Apple Computers", 0.95), ("Microsoft", 0.97)]})
+        memory._store_batch([triples])
+
+    mock_embed.assert_called_once_with(["Apple Computer"])
+    mock_graph_add_facts.assert_called_with(
+        triples, upsert=True, aliases={"Apple Computer": "Apple Computers"}
+    )
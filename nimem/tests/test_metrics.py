@@ -0,0 +1,88 @@
+import logging
+import pytest
+from nimem.core import metrics
+from nimem.core.recall_cache import RecallCache
+
+
+@pytest.fixture
+def registry():
+    registry = metrics.Registry(buckets=(0.1, 1.0))
+    metrics.configure(registry)
+    yield registry
+    metrics.reset()
+
+
+def test_disabled_is_noop():
+    metrics.reset()
+    assert metrics.timer("stage", stage="coref") is metrics._NOOP
+    with metrics.timer("stage", stage="coref"):
+        pass
+    metrics.count("triples_extracted", 3)
+    assert not metrics.enabled()
+
+
+def test_registry_records_timers_and_counters(registry):
+    with metrics.timer("stage", stage="coref"):
+        pass
+    metrics.count("triples_extracted", 2)
+    metrics.count("triples_extracted", 3)
+
+    snapshot = registry.snapshot()
+    assert snapshot["counters"][("triples_extracted", ())] == 5
+    assert snapshot["timers"][("stage", (("stage", "coref"),))]["count"] == 1
+
+
+def test_prometheus_text_format(registry):
+    registry.observe("stage", 0.5, {"stage": "spacy_parse"})
+    registry.observe("stage", 2.0, {"stage": "spacy_parse"})
+    registry.increment("cache_hits", 4, {"cache": 'a"b'})
+
+    text = registry.to_prometheus()
+
+    assert '# TYPE nimem_cache_hits_total counter' in text
+    assert 'nimem_cache_hits_total{cache="a\\"b"} 4' in text
+    assert '# TYPE nimem_stage_seconds histogram' in text
+    assert 'nimem_stage_seconds_bucket{stage="spacy_parse",le="0.1"} 0' in text
+    assert 'nimem_stage_seconds_bucket{stage="spacy_parse",le="1"} 1' in text
+    assert 'nimem_stage_seconds_bucket{stage="spacy_parse",le="+Inf"} 2' in text
+    assert 'nimem_stage_seconds_count{stage="spacy_parse"} 2' in text
+
+
+def test_logging_sink_and_failing_sink(registry, caplog):
+    class Broken(metrics.Sink):
+        def observe(self, *args, **kwargs):
+            raise RuntimeError("boom")
+
+    metrics.configure(registry, Broken(), metrics.LoggingSink(level=logging.INFO))
+    with caplog.at_level(logging.INFO, logger="nimem.core.metrics"):
+        with metrics.timer("graph_query"):
+            pass
+
+    assert "graph_query" in caplog.text
+    assert registry.snapshot()["timers"][("graph_query", ())]["count"] == 1
+
+
+def test_cache_counters(registry):
+    cache = RecallCache(max_entries=2)
+    cache.get("g", "Alice", None)
+    cache.put("g", "Alice", None, cache.version("g"), [])
+    cache.get("g", "Alice", None)
+
+    counters = registry.snapshot()["counters"]
+    assert counters[("cache_hits", (("cache", "recall"),))] == 1
+    assert counters[("cache_misses", (("cache", "recall"),))] == 1
+
+
+def test_opentelemetry_spans(registry):
+    pytest.importorskip("opentelemetry")
+    from unittest.mock import MagicMock
+
+    tracer = MagicMock()
+    metrics.configure(metrics.OpenTelemetrySink(tracer=tracer))
+    with metrics.timer("stage", stage="coref"):
+        pass
+
+    tracer.start_span.assert_called_once_with(
+        "nimem.stage", attributes={"nimem.stage": "coref"}
+    )
+    tracer.start_span.return_value.end.assert_called_once()
@@ -0,0 +1,46 @@
+import pytest
+from unittest.mock import patch
+from returns.result import Success, Failure
+from nimem import parallel
+from nimem.core.text_processing import Triple
+
+
+def fake_extractor(texts):
+    # Runs in spawned workers, so it must be importable rather than patched in.
+    if "boom" in texts:
+        raise ValueError("extraction failed")
+    return [(text, [Triple(text, "knows", "Bob")]) for text in texts]
+
+
+@pytest.fixture
+def mock_graph_add_facts():
+    with patch('nimem.core.graph_store.add_facts') as mock:
+        mock.side_effect = lambda triples, **kwargs: Success([True] * len(triples))
+        yield mock
+
+
+@pytest.fixture(scope="module")
+def engine():
+    with parallel.IngestionEngine(
+        workers=2, queue_depth=1, batch_size=2, extractor=fake_extractor
+    ) as engine:
+        yield engine
+
+
+def test_ingest_in_input_order(engine, mock_graph_add_facts):
+    texts = [f"Person{i}" for i in range(9)]
+
+    results = engine.ingest(texts)
+
+    assert len(results) == 9
+    assert all(isinstance(r, Success) for r in results)
+    assert all(f"Person{i}" in r.unwrap() for i, r in enumerate(results))
+    written = [tri.subject for call in mock_graph_add_facts.call_args_list for tri in call.args[0]]
+    assert sorted(written) == sorted(texts)
+
+
+def test_failed_batch_does_not_stop_others(engine, mock_graph_add_facts):
+    results = engine.ingest(["a", "b", "boom", "c", "d"])
+
+    assert [isinstance(r, Failure) for r in results] == [False, False, True, True, False]
+    assert mock_graph_add_facts.call_count >= 1
@@ -0,0 +1,105 @@
+import pytest
+from unittest.mock import patch
+from nimem.core.recall_cache import RecallCache
+
+GRAPH = ("/tmp/nimem.db", "g")
+FACTS = [{'relation': 'KNOWS', 'object': 'Bob'}]
+
+
+@pytest.fixture
+def cache():
+    return RecallCache(max_entries=2, ttl=10)
+
+
+def test_hit_after_put(cache):
+    version = cache.version(GRAPH)
+    assert cache.get(GRAPH, "Alice", None) is None
+    cache.put(GRAPH, "Alice", None, version, FACTS)
+
+    assert cache.get(GRAPH, "Alice", None) == FACTS
+    assert cache.get(GRAPH, "Alice", 5.0) is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 2
+
+
+def test_write_invalidates_subject(cache):
+    cache.put(GRAPH, "Alice", None, cache.version(GRAPH), FACTS)
+    cache.put(GRAPH, "Bob", None, cache.version(GRAPH), FACTS)
+
+    cache.invalidate(GRAPH, ["Alice"])
+
+    assert cache.get(GRAPH, "Alice", None) is None
+    assert cache.get(GRAPH, "Bob", None) == FACTS
+
+    cache.invalidate_graph(GRAPH)
+    assert cache.get(GRAPH, "Bob", None) is None
+
+
+def test_put_after_racing_write_is_dropped(cache):
+    version = cache.version(GRAPH)
+    cache.invalidate(GRAPH, ["Alice"])
+    cache.put(GRAPH, "Alice", None, version, FACTS)
+
+    assert cache.get(GRAPH, "Alice", None) is None
+
+
+def test_lru_eviction(cache):
+    for subject in ("Alice", "Bob"):
+        cache.put(GRAPH, subject, None, cache.version(GRAPH), FACTS)
+    cache.get(GRAPH, "Alice", None)
+    cache.put(GRAPH, "Carol", None, cache.version(GRAPH), FACTS)
+
+    assert cache.get(GRAPH, "Bob", None) is None
+    assert cache.get(GRAPH, "Alice", None) == FACTS
+    assert cache.stats()["evictions"] == 1
+
+
+def test_ttl_expiry(cache):
+    with patch('nimem.core.recall_cache.time.monotonic', return_value=100.0):
+        cache.put(GRAPH, "Alice", None, cache.version(GRAPH), FACTS)
+    with patch('nimem.core.recall_cache.time.monotonic', return_value=111.0):
+        assert cache.get(GRAPH, "Alice", None) is None
+
+
+def test_disabled():
+    cache = RecallCache(max_entries=0)
+    cache.put(GRAPH, "Alice", None, cache.version(GRAPH), FACTS)
+    assert cache.get(GRAPH, "Alice", None) is None
+    cache.invalidate(GRAPH, ["Alice"])
+    cache.invalidate_graph(GRAPH)
+    assert cache.version(GRAPH) == 0
+
+
+def test_invalidate_keeps_no_state_for_uncached_subjects(cache):
+    cache.put(GRAPH, "Alice", None, cache.version(GRAPH), FACTS)
+    cache.invalidate(GRAPH, [f"person {i}" for i in range(1000)])
+
+    assert len(cache._subject_times) == 1
+    assert cache.get(GRAPH, "Alice", None) == FACTS
+
+    cache.invalidate(GRAPH, ["Alice"])
+    assert cache._subject_times == {}
+
+
+def test_write_to_other_subject_keeps_fill(cache):
+    version = cache.version(GRAPH)
+    cache.invalidate(GRAPH, ["Bob"])
+    cache.put(GRAPH, "Alice", None, version, FACTS)
+
+    assert cache.get(GRAPH, "Alice", None) == FACTS
+
+
+def test_write_history_is_bounded(cache):
+    from nimem.core import recall_cache
+
+    stale = cache.version(GRAPH)
+    with patch.object(recall_cache, "WRITE_HISTORY", 10):
+        cache.invalidate(GRAPH, ["Alice"])
+        cache.invalidate(GRAPH, [f"person {i}" for i in range(20)])
+    assert len(cache._written) == 10
+
+    # Alice's stamp was forgotten, so a read from before her write is refused.
+    cache.put(GRAPH, "Alice", None, stale, FACTS)
+    assert cache.get(GRAPH, "Alice", None) is None
+    cache.put(GRAPH, "Alice", None, cache.version(GRAPH), FACTS)
+    assert cache.get(GRAPH, "Alice", None) == FACTS
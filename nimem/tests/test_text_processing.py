@@ -1,3 +1,4 @@
+import re
 import pytest
 from unittest.mock import MagicMock, patch
 from nimem.core import text_processing
@@ -47,55 +48,49 @@ def mock_gliner():
         yield instance
     text_processing.get_gliner_model.cache_clear()
 
+def _fake_clusters(text):
+    """Clusters every "He" with the nearest earlier "Bob"."""
+    clusters = []
+    for match in re.finditer(r"\bHe\b", text):
+        bob = text.rfind("Bob", 0, match.start())
+        if bob >= 0:
+            clusters.append([(bob, bob + 3), (match.start(), match.end())])
+    return clusters
+
 @pytest.fixture
-def mock_stanza():
-    text_processing.get_coref_pipeline.cache_clear()
-    with patch('nimem.core.text_processing.stanza') as mock_mod:
-        mock_pipe = MagicMock()
-        mock_mod.Pipeline.return_value = mock_pipe
-        
-        mock_doc = MagicMock()
-        
-        mock_word_he = MagicMock()
-        mock_word_he.start_char = 31
-        mock_word_he.end_char = 33
-        
-        mock_word_alice = MagicMock()
-        mock_word_alice.start_char = 0
-        mock_word_alice.end_char = 5
-        
-        mock_sent_0 = MagicMock()
-        mock_sent_0.words = [mock_word_alice]
-        mock_sent_1 = MagicMock()
-        mock_sent_1.words = [mock_word_he]
-        mock_doc.sentences = [mock_sent_0, mock_sent_1]
-        
-        mention_rep = MagicMock()
-        mention_rep.sentence = 0
-        mention_rep.start_word = 0
-        mention_rep.end_word = 0
-        
-        mention_he = MagicMock()
-        mention_he.sentence = 1
-        mention_he.start_word = 0
-        mention_he.end_word = 0
-        
-        mock_chain = MagicMock()
-        mock_chain.representative_text = "Alice"
-        mock_chain.representative_index = 0
-        mock_chain.mentions = [mention_rep, mention_he]
-        
-        mock_doc.coref = [mock_chain]
-        mock_pipe.return_value = mock_doc
-        
-        yield mock_pipe
-    text_processing.get_coref_pipeline.cache_clear()
+def mock_coref():
+    text_processing.get_fastcoref_model.cache_clear()
+    with patch('nimem.core.text_processing.get_fastcoref_model') as mock_get:
+        model = MagicMock()
+        mock_get.return_value = model
+
+        def predict(texts, max_tokens_in_batch):
+            preds = []
+            for text in texts:
+                pred = MagicMock()
+                pred.get_clusters.return_value = _fake_clusters(text)
+                preds.append(pred)
+            return preds
+
+        model.predict.side_effect = predict
+        yield model
+    text_processing.get_fastcoref_model.cache_clear()
 
 def test_extract_triplets_heuristic(mock_spacy):
     triplets = text_processing.extract_triplets("Alice works at Google").unwrap()
     mock_spacy.assert_called_once()
     assert len(triplets) > 0
 
+def test_extract_triplets_uses_doc_sentences(mock_spacy):
+    doc = mock_spacy.return_value
+    first, second = MagicMock(start_char=0), MagicMock(start_char=10)
+    doc.sents = [first, second]
+
+    triplets = text_processing.extract_triplets("Alice ran. Google hired.").unwrap()
+
+    mock_spacy.assert_called_once()
+    assert triplets == []
+
 def test_extract_triplets_gliner2(mock_gliner):
     triplets = text_processing.extract_triplets(
         "Alice works at Google", use_gliner2=True
@@ -112,13 +107,38 @@ def test_extract_triplets_gliner2(mock_gliner):
     assert triplets[1].relation == 'works_for'
     assert triplets[1].object == 'Google'
 
-def test_resolve_coreferences(mock_stanza):
+def test_resolve_coreferences(mock_coref):
     text = "Alice works at Google. Alice knows Bob. He is happy."
     res = text_processing.resolve_coreferences(text).unwrap()
     assert "He" not in res
     assert res.count("Alice") >= 2
 
-def test_pipeline_heuristic(mock_spacy, mock_stanza):
+def test_resolve_coreferences_batch_packs_by_length(mock_coref):
+    texts = ["Bob ran. He fell over the fence.", "Bob sat.", "Nothing.", ""]
+    resolved = text_processing.resolve_coreferences_batch(texts, max_tokens_in_batch=4).unwrap()
+
+    assert resolved == ["Bob ran. Bob fell over the fence.", "Bob sat.", "Nothing.", ""]
+    batches = [call.kwargs["texts"] for call in mock_coref.predict.call_args_list]
+    assert batches == [["Nothing.", "Bob sat."], ["Bob ran. He fell over the fence."]]
+
+def test_resolve_coreferences_windows_long_text(mock_coref):
+    text = "It rained. Bob came home. He slept."
+    [resolved] = text_processing.resolve_coreferences_batch(
+        [text], max_text_tokens=5, overlap=1
+    ).unwrap()
+
+    assert resolved == "It rained. Bob came home. Bob slept."
+    windows = [t for call in mock_coref.predict.call_args_list for t in call.kwargs["texts"]]
+    assert sorted(windows) == ["Bob came home. He slept.", "It rained. Bob came home."]
+
+def test_resolve_clusters_possessive():
+    text = "Alice Smith said Smith liked his car."
+    clusters = [[(0, 11), (17, 22)], [(6, 11), (29, 32)]]
+    assert text_processing._resolve_clusters(text, clusters) == (
+        "Alice Smith said Alice Smith liked Smith's car."
+    )
+
+def test_pipeline_heuristic(mock_spacy, mock_coref):
     res = text_processing.process_text_pipeline("Input text")
     assert isinstance(res, Success)
     _, triplets = res.unwrap()
@@ -129,3 +149,97 @@ def test_pipeline_gliner2(mock_gliner):
     assert isinstance(res, Success)
     _, triplets = res.unwrap()
     assert len(triplets) == 2
+
+def test_extract_triplets_batch_heuristic(mock_spacy):
+    doc = mock_spacy.return_value
+    mock_spacy.pipe.return_value = iter([doc, doc])
+
+    batches = text_processing.extract_triplets_batch(
+        ["Alice works at Google", "Alice works at Google"], batch_size=2
+    ).unwrap()
+
+    mock_spacy.pipe.assert_called_once()
+    assert len(batches) == 2
+    assert batches[0] == batches[1]
+
+def test_extract_triplets_batch_gliner2(mock_gliner):
+    found = mock_gliner.extract_relations.return_value
+    mock_gliner.batch_extract_relations.side_effect = lambda texts, labels, batch_size: [
+        found if "Alice" in text else {'relation_extraction': {}} for text in texts
+    ]
+
+    batches = text_processing.extract_triplets_batch(
+        ["Alice knows Bob", "Nothing here"], use_gliner2=True
+    ).unwrap()
+
+    mock_gliner.batch_extract_relations.assert_called_once()
+    assert len(batches[0]) == 2
+    assert batches[1] == []
+
+def test_gliner2_batch_windows_and_buckets(mock_gliner):
+    calls = []
+
+    def fake_batch(texts, labels, batch_size):
+        calls.append(list(texts))
+        return [
+            {'relation_extraction': {'knows': [tuple(text.rstrip('.').split(' knows '))]}}
+            for text in texts
+        ]
+
+    mock_gliner.batch_extract_relations.side_effect = fake_batch
+    texts = ["Alice knows Bob. Alice knows Bob.", "Carol Ann Smith knows Dave."]
+
+    batches = text_processing._extract_gliner2_relations_batch(texts, batch_size=2, window_chars=30)
+
+    assert calls == [["Alice knows Bob.", "Alice knows Bob."], ["Carol Ann Smith knows Dave."]]
+    assert batches == [
+        [text_processing.Triple("Alice", "knows", "Bob")],
+        [text_processing.Triple("Carol Ann Smith", "knows", "Dave")],
+    ]
+
+def test_iter_windows_splits_streamed_text():
+    chunks = ["Alice works at Goo", "gle. She lives in London.\n\nBob knows Alice. ", "x" * 25]
+
+    windows = list(text_processing.iter_windows(chunks, max_chars=30))
+
+    assert windows == [
+        ["Alice works at Google."],
+        ["She lives in London."],
+        ["Bob knows Alice."],
+        ["x" * 25],
+    ]
+
+    unbroken = list(text_processing.iter_windows(["word " * 20], max_chars=30))
+    assert all(len(" ".join(window)) <= 30 for window in unbroken)
+    assert " ".join(" ".join(window) for window in unbroken).split() == ["word"] * 20
+
+def test_check_gliner_parity():
+    def fake_model(quantize):
+        model = MagicMock()
+        pairs = [('Alice', 'Bob')] if quantize else [('Alice', 'Bob'), ('Bob', 'Carol')]
+        model.batch_extract_relations.return_value = [
+            {'relation_extraction': {'knows': pairs}},
+            {'relation_extraction': {}},
+        ]
+        return model
+
+    with patch('nimem.core.text_processing._load_gliner_model', side_effect=fake_model):
+        report = text_processing.check_gliner_parity(["t1", "t2"]).unwrap()
+
+    assert report["agreement"] == pytest.approx(0.75)
+
+def test_pipeline_uses_extraction_cache(mock_spacy, tmp_path):
+    text_processing.ExtractionCache.configure(path=str(tmp_path / "cache.sqlite"))
+    try:
+        first = text_processing.process_text_pipeline("Alice works at Google").unwrap()
+        batch = text_processing.process_texts_pipeline(
+            ["Alice works at Google", "Alice works at Google"]
+        ).unwrap()
+        stats = text_processing.ExtractionCache.current().stats()
+    finally:
+        text_processing.ExtractionCache.reset()
+
+    assert mock_spacy.call_count == 1
+    mock_spacy.pipe.assert_not_called()
+    assert batch == [first, first]
+    assert stats["hits"] == 2
@@ -0,0 +1,44 @@
+import threading
+import pytest
+from unittest.mock import patch
+from nimem import warmup
+
+
+@pytest.fixture
+def fake_components():
+    gate = threading.Event()
+    components = {
+        "fast": lambda: None,
+        "slow": gate.wait,
+        "broken": lambda: 1 / 0,
+    }
+    with patch.dict(warmup.COMPONENTS, components, clear=True), \
+         patch.object(warmup, "_current", None):
+        yield gate
+
+
+def test_preload_loads_concurrently(fake_components):
+    ready = []
+    handle = warmup.preload(["fast", "slow"], on_ready=ready.append)
+
+    assert not warmup.is_ready()
+    fake_components.set()
+    assert handle.wait(timeout=5)
+
+    assert warmup.is_ready()
+    assert ready == [handle]
+    assert set(warmup.load_timings()) == {"fast", "slow"}
+
+
+def test_preload_reports_failures(fake_components):
+    handle = warmup.preload(["fast", "broken"], wait=True)
+
+    assert handle.done and not handle.is_ready()
+    assert isinstance(handle.errors["broken"], ZeroDivisionError)
+    assert warmup.load_timings() == {"fast": pytest.approx(0, abs=1)}
+
+
+def test_preload_rejects_unknown_component(fake_components):
+    with pytest.raises(ValueError):
+        warmup.preload(["nope"])
+    assert not warmup.is_ready()
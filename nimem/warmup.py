@@ -0,0 +1,170 @@
+"""
+Model warm-up for nimem.
+
+Every model is loaded lazily on first use, which puts seconds of loading (and
+possibly a spaCy model download) in the path of the first request. ``preload``
+loads the selected models concurrently in background threads, so a process can
+be warmed before it takes traffic.
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable
+
+logger = logging.getLogger(__name__)
+
+
+def _load_spacy():
+    from .core import text_processing
+
+    return text_processing.get_spacy_model()
+
+
+def _load_gliner2():
+    from .core import text_processing
+
+    return text_processing.get_gliner_model()
+
+
+def _load_coref():
+    from .core import text_processing
+
+    return text_processing.get_fastcoref_model()
+
+
+def _load_embeddings():
+    from .core.embeddings import EmbeddingService
+
+    return EmbeddingService.get_instance()
+
+
+COMPONENTS: Dict[str, Callable[[], Any]] = {
+    "spacy": _load_spacy,
+    "gliner2": _load_gliner2,
+    "coref": _load_coref,
+    "embeddings": _load_embeddings,
+}
+
+# What the default ingest_text / consolidate_topics path needs.
+DEFAULT_COMPONENTS = ("spacy", "embeddings")
+
+
+class Warmup:
+    """
+    Loads components on one background thread each.
+
+    Attributes:
+        timings: Seconds each successfully loaded component took
+        errors: Exception raised by each component that failed to load
+    """
+
+    def __init__(
+        self,
+        components: Iterable[str],
+        on_ready: Callable[["Warmup"], None] | None = None,
+    ):
+        self.components = tuple(dict.fromkeys(components))
+        unknown = [name for name in self.components if name not in COMPONENTS]
+        if unknown:
+            raise ValueError(
+                f"Unknown components {unknown}; expected some of {list(COMPONENTS)}"
+            )
+        self.on_ready = on_ready
+        self.timings: Dict[str, float] = {}
+        self.errors: Dict[str, Exception] = {}
+        self._lock = threading.Lock()
+        self._remaining = len(self.components)
+        self._done = threading.Event()
+        if not self.components:
+            self._finish()
+
+    def start(self) -> "Warmup":
+        for name in self.components:
+            threading.Thread(
+                target=self._load, args=(name,), name=f"nimem-warmup-{name}", daemon=True
+            ).start()
+        return self
+
+    def _load(self, name: str) -> None:
+        start = time.perf_counter()
+        try:
+            COMPONENTS[name]()
+            elapsed = time.perf_counter() - start
+            logger.info(f"Loaded {name} in {elapsed:.2f}s")
+            with self._lock:
+                self.timings[name] = elapsed
+        except Exception as e:
+            logger.warning(f"Failed to load {name}: {e}")
+            with self._lock:
+                self.errors[name] = e
+        finally:
+            with self._lock:
+                self._remaining -= 1
+                last = self._remaining == 0
+            if last:
+                self._finish()
+
+    def _finish(self) -> None:
+        self._done.set()
+        if self.on_ready is not None:
+            try:
+                self.on_ready(self)
+            except Exception as e:
+                logger.warning(f"Readiness callback failed: {e}")
+
+    @property
+    def done(self) -> bool:
+        """True once every component has either loaded or failed."""
+        return self._done.is_set()
+
+    def is_ready(self) -> bool:
+        """True once every component has loaded without error."""
+        return self.done and not self.errors
+
+    def wait(self, timeout: float | None = None) -> bool:
+        """Blocks until loading finishes; returns is_ready()."""
+        self._done.wait(timeout)
+        return self.is_ready()
+
+
+_current: Warmup | None = None
+
+
+def preload(
+    components: Iterable[str] = DEFAULT_COMPONENTS,
+    on_ready: Callable[[Warmup], None] | None = None,
+    wait: bool = False,
+) -> Warmup:
+    """
+    Loads the selected models concurrently in background threads.
+
+    Args:
+        components: Any of "spacy", "gliner2", "coref" and "embeddings"
+        on_ready: Called with the Warmup once every component has finished
+            loading, whether or not all of them succeeded
+        wait: If True, block until loading finishes
+
+    Returns:
+        The Warmup, also consulted by is_ready() and load_timings()
+    """
+    global _current
+    warmup = Warmup(components, on_ready=on_ready)
+    _current = warmup
+    warmup.start()
+    if wait:
+        warmup.wait()
+    return warmup
+
+
+def is_ready() -> bool:
+    """True once the latest preload() has loaded all of its components."""
+    return _current is not None and _current.is_ready()
+
+
+def load_timings() -> Dict[str, float]:
+    """Seconds each component of the latest preload() took to load."""
+    if _current is None:
+        return {}
+    with _current._lock:
+        return dict(_current.timings)